@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+Modelo da Política de Manutenção Preventiva Oportuna em Três Fases (Política QST).
+
+Pacote sem interface: não importa o Streamlit nem faz E/S ao ser carregado, e
+pode ser usado em scripts, processos de lote e workers. A interface fica em sft.py.
+"""
+
+from .distribuicoes import fx, Rx, Fx, fh, Rh, Fh, fw, Rw, FW, Weibull, weibull
+from .cenarios import (
+    P1, EC1, EL1, P2, EC2, EL2, P3, EC3, EL3, P4, EC4, EL4,
+    P5, EC5, EL5, P6, EC6, EL6, P7, EC7, EL7, P8, EC8, EL8,
+    P9, EC9, EL9, P10, EC10, EL10, P11, EC11, EL11, P12, EC12, EL12,
+    P_total, P_falha, EC_ciclo, EL_ciclo, taxa_custo, MTBOF,
+)
+from .quadratura import (
+    N_NOS, nos_gauss_legendre, regra1, regra_weibull, regra2,
+    cenarios_lote, taxa_custo_lote, MTBOF_lote,
+    caudas_Rh, integrais_base_lote, integrais_base_derivadas_lote,
+)
+from .avaliacao import (
+    PARAMETROS, POSITIVOS, validar_parametros, ResultadoPolitica, IntegraisBase, integrais_base, precificar,
+    ciclos_lote, precificar_lote, avaliar_lote, gradiente_lote, avaliar_politica,
+)
+from .otimizacao import (
+    politica, jacobiana_politica, objetivo, objetivo_lote, objetivo_gradiente, ObjetivoParalelo,
+    taxa_nivel, ObjetivoMultiFidelidade, limites,
+    polir_politica, aceitar_polimento, populacao_inicial, otimizar_politica, otimizar_politica_dinkelbach,
+)
+from .sensibilidade import (
+    analise_sensibilidade, sortear_perturbacoes, analise_sensibilidade_lote, pontos_varredura, varredura_uma_a_uma,
+)
+from .cache import canonico, chave, chave_otimizacao, CacheResultados, cache_padrao, avaliar_politica_cache, otimizar_politica_cache
+from .indice import IndicePoliticas, partida_quente
+from .frota import ler_componentes, otimizar_componentes, otimizar_frota
+from .instrumentacao import Perfil, perfilar, secao, instrumentado
+from .simulacao import ResultadoSimulacao, simular_ciclos, simular_bloco, simular_politica
+from .superficie import (
+    COORDENADAS, faixa_padrao, politicas_grade, Superficie, avaliar_grade, carregar_superficie,
+    mapear_superficie, janela_tolerancia,
+)
+from .pareto import (
+    nao_dominados, camadas, aglomeracao, objetivos_lote, ArquivoAvaliacoes, FronteiraPareto, otimizar_pareto,
+)
+from .substituto import (
+    DISTRIBUICOES, GRANDEZAS, grandezas_lote, nos_chebyshev, coeficientes_chebyshev, vandermonde_chebyshev,
+    SubstitutoChebyshev, validar_substituto, ajustar_substituto, otimizar_politica_substituto,
+)
+from .estimacao import COLUNAS, blocos_arquivo, AjusteWeibull, ajustar_weibull, ajustar_historico
+from .servico import Metricas, Agrupador, validar_politicas, ServicoQST, criar_servidor, teste_carga
+from .tarefas import (
+    NA_FILA, EXECUTANDO, CONCLUIDA, CANCELADA, ERRO, TarefaCancelada, Progresso,
+    tarefa_otimizacao, tarefa_pareto, tarefa_sensibilidade, GerenciadorTarefas,
+)
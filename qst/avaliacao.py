@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+Avaliação fundida da política: integrais de base em cache e precificação.
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+from .distribuicoes import Rh, fw, Rw, weibull
+from .cenarios import P1, P2, P3, P4, P5, P6, P7, P8, P9, P10, P11, P12
+from .cenarios import EL5, EL6, EL7, EL8, EL9, EL10, EL11, EL12, quad_densidade, dblquad_densidades
+from .quadratura import integrais_base_lote, integrais_base_derivadas_lote
+from .instrumentacao import instrumentado, secao
+from . import compilado
+
+# =============================================================================
+# AVALIAÇÃO FUNDIDA DA POLÍTICA
+# =============================================================================
+# Nomes dos 11 parâmetros do modelo, na ordem usada pelas funções de cenário
+PARAMETROS = ('betax', 'etax', 'betah', 'etah', 'lambd', 'Ci', 'Co', 'Cp', 'Cf', 'Dp', 'Df')
+# Forma e escala das Weibull são positivas; λ, custos e tempos de parada podem ser nulos
+POSITIVOS = ('betax', 'etax', 'betah', 'etah')
+
+def validar_parametros(parametros):
+    """Os 11 parâmetros como floats; ValueError se algum não for finito ou sair do domínio (KeyError se faltar)"""
+    valores = {p: float(parametros[p]) for p in PARAMETROS}
+    for p, v in valores.items():
+        if not np.isfinite(v) or v < 0 or (v == 0 and p in POSITIVOS):
+            raise ValueError(f"{p} = {v}: deve ser finito e {'> 0' if p in POSITIVOS else '>= 0'}")
+    return valores
+
+@dataclass
+class ResultadoPolitica:
+    """Desempenho de uma política (Q, S, T); a posição k-1 dos arrays corresponde ao cenário k"""
+    Q: float
+    S: float
+    T: float
+    P: np.ndarray
+    EC: np.ndarray
+    EL: np.ndarray
+    EC_ciclo: float
+    EL_ciclo: float
+    taxa_custo: float
+    P_falha: float
+    MTBOF: float
+    P_total: float
+
+@dataclass(frozen=True)
+class IntegraisBase:
+    """Integrais dos cenários que não dependem de custos nem de tempos de parada.
+
+    P: probabilidades; A: integrais do tempo sob inspeção oportuna, (x - Q) ou (S - Q);
+    L: integrais da duração do ciclo sem a parada. A posição k-1 corresponde ao cenário k.
+    """
+    Q: float
+    S: float
+    T: float
+    lambd: float
+    P: np.ndarray
+    A: np.ndarray
+    L: np.ndarray
+
+@lru_cache(maxsize=4096)
+@instrumentado
+def integrais_base(Q, S, T, betax,  etax, betah, etah, lambd, metodo='quad'):
+    """Integrais de base da política, calculadas uma única vez por conjunto de argumentos.
+
+    metodo='quad' usa quad/dblquad adaptativos; metodo='compilado' faz o mesmo com o
+    integrando compilado pelo Numba (e recai em 'quad' se ele não estiver instalado);
+    metodo='reduzido' usa o caminho unidimensional de integrais_base_lote.
+    """
+    if metodo == 'reduzido' or (metodo == 'compilado' and compilado.DISPONIVEL):
+        if metodo == 'reduzido':
+            P, A, L = (v[0] for v in integrais_base_lote(Q, S, T, betax, etax, betah, etah, lambd))
+        else:
+            P, A, L = compilado.integrais_base_compiladas(Q, S, T, betax, etax, betah, etah, lambd)
+        for v in (P, A, L):
+            v.setflags(write=False)
+        return IntegraisBase(Q, S, T, lambd, P, A, L)
+
+    sem_custos = dict(betax=betax, etax=etax, betah=betah, etah=etah, lambd=lambd, Ci=0, Co=0, Cp=0, Cf=0, Dp=0, Df=0)
+    P = np.array([Pk(Q, S, T, **sem_custos) for Pk in (P1, P2, P3, P4, P5, P6, P7, P8, P9, P10, P11, P12)])
+
+    A = np.zeros(12)
+    A[[0, 1, 4, 5, 8]] = (S - Q) * P[[0, 1, 4, 5, 8]]
+    with secao('A3'):
+        A[2], _ = quad_densidade(lambda x: (x - Q) * Rh((T - x), betah, etah) * Rw((T - x), lambd), Q, S, weibull(betax, etax))
+    with secao('A7'):
+        A[6], _ = dblquad_densidades(
+            lambda w, x: (x - Q) * fw(w, lambd) * Rh(w, betah, etah),
+            Q, S,
+            lambda x: 0,
+            lambda x: T - x,
+            externa=weibull(betax, etax)
+        )
+    with secao('A10'):
+        A[9], _ = dblquad_densidades(
+            lambda h, x: (x - Q) * Rw(h, lambd),
+            Q, S,
+            lambda x: 0,
+            lambda x: T - x,
+            externa=weibull(betax, etax), interna=weibull(betah, etah)
+        )
+
+    # Com Dp = Df = 0, EL5–EL12 são exatamente as integrais da duração sem parada
+    L = np.concatenate([
+        T * P[:4],
+        [ELk(Q, S, T, **sem_custos) for ELk in (EL5, EL6, EL7, EL8, EL9, EL10, EL11, EL12)],
+    ])
+    for v in (P, A, L):
+        v.setflags(write=False)
+    return IntegraisBase(Q, S, T, lambd, P, A, L)
+
+def precificar(base, Ci, Co, Cp, Cf, Dp, Df):
+    """Custos e durações esperadas dos cenários a partir das integrais de base (só multiplicações)"""
+    C = np.repeat([Cp, Co, Cf], 4)
+    D = np.repeat([Dp, Df], [8, 4])
+    EC = C * base.P + base.lambd * Ci * base.A
+    EL = base.L + D * base.P
+    EC_ = EC.sum()
+    EL_ = EL.sum()
+    pf_ = base.P[8:].sum()
+    return ResultadoPolitica(base.Q, base.S, base.T, base.P, EC, EL, EC_, EL_, EC_ / EL_, pf_, EL_ / pf_, base.P.sum())
+
+def ciclos_lote(P, A, L, lambd, Ci, Co, Cp, Cf, Dp, Df):
+    """Custo e duração esperados do ciclo de um lote a partir das integrais de base (arrays (..., 12)).
+
+    Como a precificação é linear, aplicada às derivadas das integrais de base dá as derivadas de EC e EL.
+    """
+    EC_ = Cp * P[..., :4].sum(axis=-1) + Co * P[..., 4:8].sum(axis=-1) + Cf * P[..., 8:].sum(axis=-1) + lambd * Ci * A.sum(axis=-1)
+    EL_ = L.sum(axis=-1) + Dp * P[..., :8].sum(axis=-1) + Df * P[..., 8:].sum(axis=-1)
+    return EC_, EL_
+
+def precificar_lote(P, A, L, lambd, Ci, Co, Cp, Cf, Dp, Df):
+    """Taxa de custo e MTBOF de um lote a partir das integrais de base (arrays (lote, 12))"""
+    EC_, EL_ = ciclos_lote(P, A, L, lambd, Ci, Co, Cp, Cf, Dp, Df)
+    return EC_ / EL_, EL_ / P[:, 8:].sum(axis=-1)
+
+@instrumentado
+def avaliar_lote(Q, S, T, parametros):
+    """Taxa de custo e MTBOF de um lote de políticas pelo caminho reduzido"""
+    P, A, L = integrais_base_lote(Q, S, T, *(parametros[p] for p in PARAMETROS[:5]))
+    return precificar_lote(P, A, L, *(parametros[p] for p in PARAMETROS[4:]))
+
+@instrumentado
+def gradiente_lote(Q, S, T, parametros):
+    """EC e EL do ciclo (lote,) e seus gradientes em relação a (Q, S, T) (lote, 3), pelo caminho reduzido"""
+    P, A, L, dP, dA, dL = integrais_base_derivadas_lote(Q, S, T, *(parametros[p] for p in PARAMETROS[:5]))
+    custos = [parametros[p] for p in PARAMETROS[4:]]
+    EC_, EL_ = ciclos_lote(P, A, L, *custos)
+    dEC, dEL = ciclos_lote(dP, dA, dL, *custos)
+    return EC_, EL_, dEC, dEL
+
+@instrumentado
+def avaliar_politica(Q, S, T, parametros, metodo='quad'):
+    """Avalia a política calculando cada integral de cenário uma única vez"""
+    base = integrais_base(Q, S, T, *(parametros[p] for p in PARAMETROS[:5]), metodo=metodo)
+    return precificar(base, *(parametros[p] for p in PARAMETROS[5:]))
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark reprodutível das funções de cenário, da taxa de custo, da otimização
+e da análise de sensibilidade, com histórico em arquivo e detecção de regressões.
+
+Uso pela linha de comando:
+    python -m qst.benchmark --historico benchmark.jsonl
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+import warnings
+
+import numpy as np
+import scipy
+
+from . import cenarios
+from .avaliacao import PARAMETROS, integrais_base, avaliar_politica, avaliar_lote
+from .otimizacao import otimizar_politica, otimizar_politica_dinkelbach
+from .sensibilidade import analise_sensibilidade, analise_sensibilidade_lote
+from .simulacao import simular_politica
+
+# =============================================================================
+# CASOS DE TESTE
+# =============================================================================
+# Conjuntos de parâmetros realistas e casos difíceis para a quadratura: densidade
+# de X singular em 0 (betax < 1), fh singular em 0 (betah < 1), quase sem
+# oportunidades (λ pequeno) e T perto do limite superior da busca (etax + etah).
+# Cada caso traz os 11 parâmetros, na ordem de PARAMETROS, e uma política (Q, S, T).
+CASOS = {
+    'referencia': ((3.0, 5.0, 2.0, 1.0, 2.0, 0.05, 0.8, 1.0, 10.0, 0.01, 0.1), (2.0, 4.0, 5.0)),
+    'betax<1': ((0.7, 5.0, 2.0, 1.0, 2.0, 0.05, 0.8, 1.0, 10.0, 0.01, 0.1), (0.5, 1.5, 3.0)),
+    'betah<1': ((2.5, 4.0, 0.8, 2.0, 0.5, 0.05, 0.8, 1.0, 10.0, 0.01, 0.1), (1.0, 2.5, 3.5)),
+    'lambda_pequeno': ((3.0, 5.0, 2.0, 1.0, 0.01, 0.05, 0.8, 1.0, 10.0, 0.01, 0.1), (2.0, 4.0, 5.0)),
+    'T_no_limite': ((3.0, 5.0, 2.0, 1.0, 2.0, 0.05, 0.8, 1.0, 10.0, 0.01, 0.1), (3.0, 5.0, 5.88)),
+}
+
+FUNCOES_CENARIO = [f'{prefixo}{k}' for k in range(1, 13) for prefixo in ('P', 'EL')]
+
+def tarefas(caso):
+    """Pares (nome, função sem argumentos, avaliações da política por chamada) de um caso"""
+    valores, (Q, S, T) = CASOS[caso]
+    parametros = dict(zip(PARAMETROS, valores))
+    args = (Q, S, T, *valores)
+    rng = np.random.default_rng(0)
+    lote = rng.random((3, 1024))
+    T_lote = lote[2] * (parametros['etax'] + parametros['etah'])
+    S_lote = T_lote * lote[1]
+
+    def sem_cache(metodo):
+        def avaliar():
+            integrais_base.cache_clear()
+            return avaliar_politica(Q, S, T, parametros, metodo=metodo)
+        return avaliar
+
+    lista = [(f'cenarios.{nome}', (lambda f=getattr(cenarios, nome): f(*args)), 1) for nome in FUNCOES_CENARIO]
+    lista += [
+        ('cenarios.taxa_custo', lambda: cenarios.taxa_custo(*args), 1),
+        ('cenarios.MTBOF', lambda: cenarios.MTBOF(*args), 1),
+        ('avaliar_politica[quad]', sem_cache('quad'), 1),
+        ('avaliar_politica[compilado]', sem_cache('compilado'), 1),
+        ('avaliar_politica[reduzido]', sem_cache('reduzido'), 1),
+        ('avaliar_lote[1024]', lambda: avaliar_lote(S_lote * lote[0], S_lote, T_lote, parametros), 1024),
+        ('otimizar_politica', lambda: otimizar_politica(parametros, popsize=6, maxiter=20, vetorizado=True, seed=0), 1),
+        ('otimizar_politica_dinkelbach', lambda: otimizar_politica_dinkelbach(parametros), 1),
+        ('analise_sensibilidade[5]', lambda: analise_sensibilidade(Q, S, T, parametros, 5), 5),
+        ('analise_sensibilidade_lote[4096]', lambda: analise_sensibilidade_lote(Q, S, T, parametros, 4096, seed=0), 4096),
+        ('simular_politica[10^6]', lambda: simular_politica(Q, S, T, parametros, n_ciclos=10**6, seed=0), 10**6),
+    ]
+    return lista
+
+# =============================================================================
+# MEDIÇÃO
+# =============================================================================
+def medir(funcao, repeticoes=5, orcamento=2.0):
+    """Mediana do tempo (s) e pico de memória alocada (MB) de uma função.
+
+    A primeira chamada aquece caches e compilação e não entra na mediana, a menos
+    que passe de `orcamento` segundos: aí ela é a única medida. O pico de memória
+    vem de uma chamada separada sob tracemalloc, que não entra na contagem de tempo.
+    """
+    inicio = time.perf_counter()
+    funcao()
+    primeira = time.perf_counter() - inicio
+    tempos = [primeira] if primeira > orcamento else []
+    repeticoes = 0 if tempos else repeticoes
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    tracemalloc.start()
+    try:
+        funcao()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return float(np.median(tempos)), pico / 2**20
+
+def maquina():
+    """Identificação do ambiente; só registros da mesma máquina são comparados entre si"""
+    return {'sistema': platform.platform(), 'processador': platform.processor() or platform.machine(),
+            'nucleos': os.cpu_count(), 'python': platform.python_version(),
+            'numpy': np.__version__, 'scipy': scipy.__version__}
+
+def commit_atual():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(__file__), timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def executar_benchmark(casos=None, filtro=None, repeticoes=5):
+    """Mede todas as tarefas dos casos escolhidos; devolve uma lista de registros por (tarefa, caso)"""
+    resultados = []
+    for caso in casos or CASOS:
+        for nome, funcao, avaliacoes in tarefas(caso):
+            if filtro and filtro not in nome:
+                continue
+            with warnings.catch_warnings():
+                # Avisos de convergência da quadratura nos casos difíceis não interessam aqui
+                warnings.simplefilter('ignore')
+                mediana, pico = medir(funcao, repeticoes)
+            resultados.append({'tarefa': nome, 'caso': caso, 'mediana_s': mediana,
+                               'avaliacoes_por_s': avaliacoes / mediana, 'pico_memoria_mb': pico})
+    return resultados
+
+# =============================================================================
+# HISTÓRICO E REGRESSÕES
+# =============================================================================
+def ler_historico(caminho):
+    """Registros já gravados no histórico (JSON Lines), do mais antigo ao mais recente"""
+    if not os.path.exists(caminho):
+        return []
+    with open(caminho, encoding='utf-8') as f:
+        return [json.loads(linha) for linha in f if linha.strip()]
+
+def regressoes(resultados, historico, ambiente, tolerancia=0.25, minimo=1e-3):
+    """Tarefas cuja mediana passou de (1 + tolerancia) vezes a última medida na mesma máquina.
+
+    Diferenças abaixo de `minimo` segundos são tratadas como ruído.
+    """
+    anteriores = {}
+    for registro in historico:
+        if registro.get('maquina') == ambiente:
+            for r in registro['resultados']:
+                anteriores[r['tarefa'], r['caso']] = r['mediana_s']
+    lentas = []
+    for r in resultados:
+        antes = anteriores.get((r['tarefa'], r['caso']))
+        if antes and r['mediana_s'] > (1 + tolerancia) * antes and r['mediana_s'] - antes > minimo:
+            lentas.append(dict(r, mediana_anterior_s=antes, razao=r['mediana_s'] / antes))
+    return lentas
+
+def gravar_historico(caminho, resultados, ambiente):
+    registro = {'data': datetime.datetime.now().isoformat(timespec='seconds'), 'commit': commit_atual(),
+                'maquina': ambiente, 'resultados': resultados}
+    with open(caminho, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(registro, ensure_ascii=False) + '\n')
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark do modelo da política QST")
+    parser.add_argument('--historico', default='benchmark.jsonl', help="arquivo JSON Lines com o histórico das medidas")
+    parser.add_argument('--casos', nargs='+', choices=list(CASOS), help="casos a medir (padrão: todos)")
+    parser.add_argument('--filtro', help="mede só as tarefas cujo nome contém este texto")
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--tolerancia', type=float, default=0.25, help="aumento relativo que conta como regressão")
+    parser.add_argument('--nao-gravar', action='store_true', help="não acrescenta as medidas ao histórico")
+    parser.add_argument('--falhar-em-regressao', action='store_true', help="termina com código 1 se houver regressão")
+    args = parser.parse_args(argv)
+
+    ambiente = maquina()
+    historico = ler_historico(args.historico)
+    resultados = executar_benchmark(args.casos, args.filtro, args.repeticoes)
+    lentas = regressoes(resultados, historico, ambiente, args.tolerancia)
+
+    print(f"{'tarefa':<36}{'caso':<16}{'mediana (ms)':>14}{'aval./s':>14}{'pico (MB)':>11}")
+    for r in resultados:
+        print(f"{r['tarefa']:<36}{r['caso']:<16}{1e3 * r['mediana_s']:>14.3f}"
+              f"{r['avaliacoes_por_s']:>14.4g}{r['pico_memoria_mb']:>11.2f}")
+    for r in lentas:
+        print(f"REGRESSÃO: {r['tarefa']} [{r['caso']}] {1e3 * r['mediana_anterior_s']:.3f} ms -> "
+              f"{1e3 * r['mediana_s']:.3f} ms ({r['razao']:.2f}x)", file=sys.stderr)
+    if not args.nao_gravar:
+        gravar_historico(args.historico, resultados, ambiente)
+    if lentas and args.falhar_em_regressao:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
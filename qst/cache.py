@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""
+Cache de avaliações de políticas e de otimizações, com despejo LRU em memória
+e persistência opcional em SQLite (reaproveitada entre execuções e sessões).
+"""
+
+import hashlib
+import json
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from .avaliacao import PARAMETROS, avaliar_politica
+from .otimizacao import otimizar_politica, otimizar_politica_dinkelbach
+
+OTIMIZADORES = {'de': otimizar_politica, 'dinkelbach': otimizar_politica_dinkelbach}
+
+# =============================================================================
+# CHAVE CANÔNICA
+# =============================================================================
+def canonico(v):
+    """Forma JSON estável de uma opção: números como float, listas, tuplas e arrays como listas, dicionários ordenados.
+
+    Outros tipos (que float() não converte) levantam TypeError ou ValueError.
+    """
+    if isinstance(v, (str, bool, type(None))):
+        return v
+    if isinstance(v, dict):
+        return sorted((str(k), canonico(x)) for k, x in v.items())
+    if isinstance(v, (list, tuple, np.ndarray)):
+        return [canonico(x) for x in v]
+    return float(v)
+
+def chave(tipo, parametros, politica=None, **opcoes):
+    """Hash canônico de (tipo, política (Q, S, T), 11 parâmetros do modelo e opções)"""
+    conteudo = [
+        tipo,
+        None if politica is None else [float(v) for v in politica],
+        [float(parametros[p]) for p in PARAMETROS],
+        canonico(opcoes),
+    ]
+    return hashlib.sha256(json.dumps(conteudo).encode()).hexdigest()
+
+# =============================================================================
+# CACHE LRU (MEMÓRIA + SQLITE)
+# =============================================================================
+class CacheResultados:
+    """Cache chave -> resultado com LRU em memória e, se `caminho` for dado, em SQLite"""
+
+    def __init__(self, capacidade=1024, caminho=None, capacidade_disco=100000):
+        self.capacidade = capacidade
+        self.capacidade_disco = capacidade_disco
+        self.memoria = OrderedDict()
+        self.trava = threading.Lock()
+        self.acertos_memoria = 0
+        self.acertos_disco = 0
+        self.faltas = 0
+        self.banco = None
+        if caminho is not None:
+            self.banco = sqlite3.connect(caminho, check_same_thread=False)
+            self.banco.execute("CREATE TABLE IF NOT EXISTS resultados (chave TEXT PRIMARY KEY, valor BLOB, acesso REAL)")
+            self.banco.execute("CREATE INDEX IF NOT EXISTS resultados_acesso ON resultados (acesso)")
+            self.banco.commit()
+
+    def obter(self, k):
+        """Resultado guardado em `k`, ou None"""
+        with self.trava:
+            if k in self.memoria:
+                self.memoria.move_to_end(k)
+                self.acertos_memoria += 1
+                return self.memoria[k]
+            if self.banco is not None:
+                linha = self.banco.execute("SELECT valor FROM resultados WHERE chave = ?", (k,)).fetchone()
+                if linha is not None:
+                    self.banco.execute("UPDATE resultados SET acesso = ? WHERE chave = ?", (time.time(), k))
+                    self.banco.commit()
+                    self.acertos_disco += 1
+                    valor = pickle.loads(linha[0])
+                    self._guardar_memoria(k, valor)
+                    return valor
+            self.faltas += 1
+            return None
+
+    def guardar(self, k, valor):
+        with self.trava:
+            self._guardar_memoria(k, valor)
+            if self.banco is not None:
+                self.banco.execute("INSERT OR REPLACE INTO resultados VALUES (?, ?, ?)",
+                                   (k, pickle.dumps(valor), time.time()))
+                # Despejo LRU no disco: remove os acessados há mais tempo
+                self.banco.execute("DELETE FROM resultados WHERE chave IN (SELECT chave FROM resultados "
+                                   "ORDER BY acesso DESC LIMIT -1 OFFSET ?)", (self.capacidade_disco,))
+                self.banco.commit()
+
+    def _guardar_memoria(self, k, valor):
+        self.memoria[k] = valor
+        self.memoria.move_to_end(k)
+        while len(self.memoria) > self.capacidade:
+            self.memoria.popitem(last=False)
+
+    def limpar(self):
+        with self.trava:
+            self.memoria.clear()
+            if self.banco is not None:
+                self.banco.execute("DELETE FROM resultados")
+                self.banco.commit()
+
+    def estatisticas(self):
+        """Acertos, faltas e ocupação, para dimensionar o cache"""
+        with self.trava:
+            consultas = self.acertos_memoria + self.acertos_disco + self.faltas
+            return {
+                'acertos_memoria': self.acertos_memoria,
+                'acertos_disco': self.acertos_disco,
+                'faltas': self.faltas,
+                'taxa_acerto': (self.acertos_memoria + self.acertos_disco) / consultas if consultas else 0.0,
+                'itens_memoria': len(self.memoria),
+                'itens_disco': (self.banco.execute("SELECT COUNT(*) FROM resultados").fetchone()[0]
+                                if self.banco is not None else 0),
+            }
+
+cache_padrao = CacheResultados()
+
+# =============================================================================
+# AVALIAÇÃO E OTIMIZAÇÃO MEMORIZADAS
+# =============================================================================
+def avaliar_politica_cache(Q, S, T, parametros, metodo='quad', cache=None):
+    """avaliar_politica com memorização em `cache` (cache_padrao se omitido)"""
+    cache = cache_padrao if cache is None else cache
+    k = chave('avaliacao', parametros, (Q, S, T), metodo=metodo)
+    resultado = cache.obter(k)
+    if resultado is None:
+        resultado = avaliar_politica(Q, S, T, parametros, metodo=metodo)
+        cache.guardar(k, resultado)
+    return resultado
+
+def chave_otimizacao(parametros, algoritmo='de', **opcoes):
+    """Chave de uma otimização; o número de processos não faz parte dela"""
+    return chave('otimizacao', parametros, algoritmo=algoritmo, **{o: v for o, v in opcoes.items() if o != 'workers'})
+
+def otimizar_politica_cache(parametros, cache=None, algoritmo='de', **opcoes):
+    """Otimização ('de' ou 'dinkelbach') com memorização; o número de processos não faz parte da chave"""
+    cache = cache_padrao if cache is None else cache
+    k = chave_otimizacao(parametros, algoritmo, **opcoes)
+    resultado = cache.obter(k)
+    if resultado is None:
+        resultado = OTIMIZADORES[algoritmo](parametros, **opcoes)
+        cache.guardar(k, resultado)
+    return resultado
@@ -0,0 +1,470 @@
+# -*- coding: utf-8 -*-
+"""
+Probabilidades, custos e durações esperadas dos doze cenários da política QST
+(integração adaptativa com quad/dblquad).
+"""
+
+from .distribuicoes import Rx, Rh, fw, Rw, weibull
+from .instrumentacao import quad, dblquad, instrumentado
+
+# =============================================================================
+# INTEGRAIS CONTRA AS DENSIDADES DE X E H
+# =============================================================================
+# Quando fx ou fh multiplica o integrando, a integral é feita na variável de
+# integração da Weibull correspondente (qst.distribuicoes.Weibull), que elimina a
+# singularidade da densidade em 0 com β < 1; `func` continua recebendo os tempos.
+class _SemDensidade:
+    """Variável sem densidade no integrando, integrada diretamente"""
+
+    @staticmethod
+    def limite(t):
+        return t
+
+    tempo = limite
+
+    @staticmethod
+    def ponto(t):
+        return t, 1.0
+
+SEM_DENSIDADE = _SemDensidade()
+
+def quad_densidade(func, a, b, dist):
+    """∫_a^b f(t) func(t) dt, com f a densidade de `dist`"""
+    ponto = dist.ponto
+
+    def g(u):
+        t, peso = ponto(u)
+        return peso * func(t)
+    return quad(g, dist.limite(a), dist.limite(b))
+
+def dblquad_densidades(func, a, b, gfun, hfun, externa=SEM_DENSIDADE, interna=SEM_DENSIDADE):
+    """∫_a^b f_e(x) ∫_{gfun(x)}^{hfun(x)} f_i(y) func(y, x) dy dx, com f_e e f_i as densidades de `externa` e `interna`"""
+    ponto_x, ponto_y = externa.ponto, interna.ponto
+    # Uma chamada a menos por avaliação quando só uma das variáveis tem densidade
+    if interna is SEM_DENSIDADE:
+        def g(v, u):
+            x, peso_x = ponto_x(u)
+            return peso_x * func(v, x)
+    elif externa is SEM_DENSIDADE:
+        def g(v, u):
+            y, peso_y = ponto_y(v)
+            return peso_y * func(y, u)
+    else:
+        def g(v, u):
+            x, peso_x = ponto_x(u)
+            y, peso_y = ponto_y(v)
+            return peso_x * peso_y * func(y, x)
+    return dblquad(g, externa.limite(a), externa.limite(b),
+                   lambda u: interna.limite(gfun(externa.tempo(u))),
+                   lambda u: interna.limite(hfun(externa.tempo(u))))
+
+# =============================================================================
+# FUNÇÕES DOS CENÁRIOS
+# =============================================================================
+#cenário1
+@instrumentado
+def P1(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
+    """Probabilidade de ocorrência do Cenário 1"""
+    return Rx(T, betax, etax) * Rw((T - S), lambd)
+
+@instrumentado
+def EC1(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
+    """Cálculo do custo esperado do Cenário 1"""
+    prob = P1(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
+    return prob * (Cp + lambd * (S-Q) * Ci)
+
+@instrumentado
+def EL1(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
+    """Cálculo da duração esperada do ciclo do Cenário 1"""
+    prob = P1(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
+    return prob * (T + Dp)
+
+#cenário2
+@instrumentado
+def P2(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
+    """Probabilidade de ocorrência do Cenário 2"""
+    integral, _ = quad_densidade(lambda x: Rh((T - x), betah, etah) * Rw((T - S), lambd), S, T, weibull(betax, etax))
+    return integral
+
+@instrumentado
+def EC2(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
+    """Custo esperado do Cenário 2"""
+    prob = P2(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
+    return prob * (Cp + lambd * (S-Q) * Ci)
+
+@instrumentado
+def EL2(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
+    """Duração esperada do ciclo do Cenário 2"""
+    prob = P2(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
+    return prob * (T + Dp)
+
+#cenário3
+@instrumentado
+def P3(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
+    """Probabilidade de ocorrência do Cenário 3"""
+    integral, _ = quad_densidade(lambda x: Rh((T - x), betah, etah) * Rw((T - x), lambd), Q, S, weibull(betax, etax))
+    return integral
+
+@instrumentado
+def EC3(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
+    """Custo esperado do Cenário 3"""
+    integral, _ = quad_densidade(lambda x: (Cp + lambd * (x-Q) * Ci) * Rh((T - x), betah, etah) * Rw((T - x), lambd), Q, S, weibull(betax, etax))
+    return integral
+
+@instrumentado
+def EL3(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
+    """Duração esperada do ciclo do Cenário 3"""
+    prob = P3(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
+    return prob*(T + Dp)
+
+#cenário4
+@instrumentado
+def P4(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
+    """Probabilidade de ocorrência do Cenário 4 (novo)"""
+    integral, _ = quad_densidade(lambda x: Rh((T - x), betah, etah) * Rw((T - Q), lambd), 0, Q, weibull(betax, etax))
+    return integral
+
+@instrumentado
+def EC4(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
+    """Custo esperado do Cenário 4 (novo)"""
+    prob = P4(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
+    return prob*Cp
+
+@instrumentado
+def EL4(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
+    """Duração esperada do ciclo do Cenário 4(novo)"""
+    prob = P4(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
+    return prob*(T + Dp)
+
+#cenário5
+@instrumentado
+def P5(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
+    """Probabilidade de ocorrência do Cenário 5"""
+    integral, _ = quad(lambda w: fw(w, lambd) * Rx((S + w), betax, etax), 0, T - S)
+    return integral
+
+@instrumentado
+def EC5(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
+    """Custo esperado do Cenário 5"""
+    prob = P5(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
+    return prob * (Co + lambd * (S-Q) * Ci)
+
+@instrumentado
+def EL5(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
+    """Duração esperada do ciclo do Cenário 5"""
+    integral, _ = quad(lambda w: fw(w, lambd) * Rx((S + w), betax, etax) * (S + w + Dp), 0, T - S)
+    return integral
+
+## CENÁRIO 6 (antigo cenário 5)
+
+@instrumentado
+def P6(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
+    """Probabilidade de ocorrência do Cenário 6"""
+    integral, _ = dblquad_densidades(
+        lambda x, w: fw(w, lambd) * Rh((S + w - x), betah, etah),
+        0, T - S,
+        lambda w: S,
+        lambda w: S + w,
+        interna=weibull(betax, etax)
+    )
+    return integral
+
+@instrumentado
+def EC6(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
+    """Custo esperado do Cenário 6"""
+    prob = P6(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
+    return prob * (Co + lambd * (S-Q) * Ci)
+
+@instrumentado
+def EL6(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
+    """Duração esperada do ciclo do Cenário 6"""
+    integral, _ = dblquad_densidades(
+        lambda x, w: (S + w + Dp) * fw(w, lambd) * Rh((S + w - x), betah, etah),
+        0, T - S,
+        lambda w: S,
+        lambda w: S + w,
+        interna=weibull(betax, etax)
+    )
+    return integral
+
+# CENÁRIO 7 (antigo cenário 6)
+
+@instrumentado
+def P7(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
+    """Probabilidade de ocorrência do Cenário 7"""
+    integral, _ = dblquad_densidades(
+        lambda w, x: fw(w, lambd) * Rh(w, betah, etah),
+        Q, S,
+        lambda x: 0,
+        lambda x: T - x,
+        externa=weibull(betax, etax)
+    )
+    return integral
+
+@instrumentado
+def EC7(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
+    """Custo esperado do Cenário 7"""
+    integral, _ = dblquad_densidades(
+        lambda w, x: (Co + lambd * (x-Q) * Ci) * fw(w, lambd) * Rh(w, betah, etah),
+        Q, S,
+        lambda x: 0,
+        lambda x: T - x,
+        externa=weibull(betax, etax)
+    )
+    return integral
+
+@instrumentado
+def EL7(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
+    """Duração esperada do ciclo do Cenário 6"""
+    integral, _ = dblquad_densidades(
+        lambda w, x: (x + w + Dp) * fw(w, lambd) * Rh(w, betah, etah),
+        Q, S,
+        lambda x: 0,
+        lambda x: T - x,
+        externa=weibull(betax, etax)
+    )
+    return integral
+
+########################################
+# CENÁRIO 8 (NOVO)
+
+@instrumentado
+def P8(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
+    """Probabilidade de ocorrência do Cenário 8"""
+    integral, _ = dblquad_densidades(
+        lambda w, x: fw(w, lambd) * Rh((Q+w-x), betah, etah),
+        0, Q,
+        lambda x: 0,
+        lambda x: T-Q,
+        externa=weibull(betax, etax)
+    )
+    return integral
+
+@instrumentado
+def EC8(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
+    prob = P8(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
+    return prob*Co
+
+@instrumentado
+def EL8(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
+    """Duração esperada do ciclo do Cenário 8"""
+    integral, _ = dblquad_densidades(
+        lambda w, x: (Q + w + Dp) * fw(w, lambd) * Rh((Q+w-x), betah, etah),
+        0, Q,
+        lambda x: 0,
+        lambda x: T-Q,
+        externa=weibull(betax, etax)
+    )
+    return integral
+
+##############################
+# CENÁRIO 9 (antigo cenário 7)
+
+@instrumentado
+def P9(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
+    """Probabilidade de ocorrência do Cenário 7"""
+    integral, _ = dblquad_densidades(
+        lambda h, x: Rw(x + h - S, lambd),
+        S, T,
+        lambda x: 0,
+        lambda x: T - x,
+        externa=weibull(betax, etax), interna=weibull(betah, etah)
+    )
+    return integral
+
+@instrumentado
+def EC9(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
+    """Custo esperado do Cenário 7"""
+    prob = P9(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
+    return prob * (Cf + lambd * (S-Q) * Ci)
+
+@instrumentado
+def EL9(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
+    """Duração esperada do ciclo do Cenário 7"""
+    integral, _ = dblquad_densidades(
+        lambda h, x: (x + h + Df) * Rw(x + h - S, lambd),
+        S, T,
+        lambda x: 0,
+        lambda x: T - x,
+        externa=weibull(betax, etax), interna=weibull(betah, etah)
+    )
+    return integral
+
+########################
+# CENÁRIO 10 - antigo cenário 8
+
+
+@instrumentado
+def P10(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
+    """Probabilidade de ocorrência do Cenário 8"""
+    integral, _ = dblquad_densidades(
+        lambda h, x: Rw(h, lambd),
+        Q, S,
+        lambda x: 0,
+        lambda x: T - x,
+        externa=weibull(betax, etax), interna=weibull(betah, etah)
+    )
+    return integral
+
+@instrumentado
+def EC10(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
+    """Custo esperado do Cenário 8"""
+    integral, _ = dblquad_densidades(
+        lambda h, x: (Cf + lambd * (x-Q) * Ci) * Rw(h, lambd),
+        Q, S,
+        lambda x: 0,
+        lambda x: T - x,
+        externa=weibull(betax, etax), interna=weibull(betah, etah)
+    )
+    return integral
+
+@instrumentado
+def EL10(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
+    """Duração esperada do ciclo do Cenário 8"""
+    integral, _ = dblquad_densidades(
+        lambda h, x: (x + h + Df) * Rw(h, lambd),
+        Q, S,
+        lambda x: 0,
+        lambda x: T - x,
+        externa=weibull(betax, etax), interna=weibull(betah, etah)
+    )
+    return integral
+
+################################################
+###### CENÁRIO 11 (NOVO)
+
+@instrumentado
+def P11(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
+    """Probabilidade de ocorrência do Cenário 8"""
+    integral, _ = dblquad_densidades(
+        lambda h, x: Rw((x+h-Q), lambd),
+        0, Q,
+        lambda x: Q - x,
+        lambda x: T - x,
+        externa=weibull(betax, etax), interna=weibull(betah, etah)
+    )
+    return integral
+
+@instrumentado
+def EC11(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
+    prob = P11(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
+    return Cf*prob
+
+@instrumentado
+def EL11(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
+    """Duração esperada do ciclo do Cenário 8"""
+    integral, _ = dblquad_densidades(
+        lambda h, x: (x + h + Df) * Rw((x+h-Q), lambd),
+        0, Q,
+        lambda x: Q - x,
+        lambda x: T - x,
+        externa=weibull(betax, etax), interna=weibull(betah, etah)
+    )
+    return integral
+
+##############################################
+# CENÁRIO 12 (NOVO)
+
+@instrumentado
+def P12(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
+    """Probabilidade de ocorrência do Cenário 8"""
+    integral, _ = dblquad_densidades(
+        lambda h, x: 1.0,
+        0, Q,
+        lambda x: 0,
+        lambda x: Q - x,
+        externa=weibull(betax, etax), interna=weibull(betah, etah)
+    )
+    return integral
+
+@instrumentado
+def EC12(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
+    prob = P12(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
+    return Cf*prob
+
+@instrumentado
+def EL12(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
+    """Duração esperada do ciclo do Cenário 8"""
+    integral, _ = dblquad_densidades(
+        lambda h, x: x + h + Df,
+        0, Q,
+        lambda x: 0,
+        lambda x: Q - x,
+        externa=weibull(betax, etax), interna=weibull(betah, etah)
+    )
+    return integral
+
+# =============================================================================
+# CÁLCULOS
+# =============================================================================
+@instrumentado
+def P_total (Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
+    p_total = 0
+    p_total = p_total + P1(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
+    p_total = p_total + P2(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
+    p_total = p_total + P3(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
+    p_total = p_total + P4(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
+    p_total = p_total + P5(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
+    p_total = p_total + P6(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
+    p_total = p_total + P7(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
+    p_total = p_total + P8(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
+    p_total = p_total + P9(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
+    p_total = p_total + P10(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
+    p_total = p_total + P11(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
+    p_total = p_total + P12(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
+    return p_total
+
+@instrumentado
+def P_falha(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
+    p_falha = 0
+    p_falha = p_falha + P9(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
+    p_falha = p_falha + P10(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
+    p_falha = p_falha + P11(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
+    p_falha = p_falha + P12(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
+    return p_falha
+    
+@instrumentado
+def EC_ciclo (Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
+    EC = 0
+    EC = EC + EC1(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
+    EC = EC + EC2(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
+    EC = EC + EC3(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
+    EC = EC + EC4(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
+    EC = EC + EC5(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
+    EC = EC + EC6(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
+    EC = EC + EC7(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
+    EC = EC + EC8(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
+    EC = EC + EC9(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
+    EC = EC + EC10(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
+    EC = EC + EC11(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
+    EC = EC + EC12(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
+    return EC
+
+@instrumentado
+def EL_ciclo (Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
+    EL = 0
+    EL = EL + EL1(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
+    EL = EL + EL2(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
+    EL = EL + EL3(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
+    EL = EL + EL4(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
+    EL = EL + EL5(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
+    EL = EL + EL6(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
+    EL = EL + EL7(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
+    EL = EL + EL8(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
+    EL = EL + EL9(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
+    EL = EL + EL10(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
+    EL = EL + EL11(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
+    EL = EL + EL12(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
+    return EL
+
+@instrumentado
+def taxa_custo(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
+    EC_ = EC_ciclo (Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
+    EL_ = EL_ciclo (Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
+    return (EC_/EL_)
+
+@instrumentado
+def MTBOF(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
+    EL_ = EL_ciclo (Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
+    pf_ = P_falha(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
+    return (EL_/pf_)
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+Integrandos compilados (Numba) para quad/dblquad via scipy.LowLevelCallable.
+
+O integrando de todos os cenários é compilado uma única vez e chamado direto
+pelo código C do QUADPACK; os parâmetros da distribuição, a política, o cenário
+e o tipo de integral chegam pelo ponteiro de dados do usuário. Sem o Numba
+instalado, DISPONIVEL é False e integrais_base recai no caminho em Python.
+"""
+
+import ctypes
+import importlib.util
+from functools import lru_cache
+
+import numpy as np
+from scipy import LowLevelCallable
+
+from .distribuicoes import Rx, Rw, weibull
+from .instrumentacao import quad, dblquad, secao
+
+DISPONIVEL = importlib.util.find_spec('numba') is not None
+
+# Tipo de integral pedido ao integrando: probabilidade, termo de inspeção (x - Q) ou duração
+PROBABILIDADE, INSPECAO, DURACAO = 0, 1, 2
+# Prefixo de cada modo nas seções do perfil (qst.instrumentacao)
+PREFIXOS = {PROBABILIDADE: 'P', INSPECAO: 'A', DURACAO: 'L'}
+
+# =============================================================================
+# INTEGRANDO COMPILADO
+# =============================================================================
+@lru_cache(maxsize=None)
+def integrando_compilado():
+    """Compila (na primeira chamada) o integrando de todos os cenários e devolve o ponteiro ctypes"""
+    import math
+    from numba import carray, cfunc, njit, types
+
+    @njit(cache=True)
+    def Rx(t, betax, etax):
+        return math.exp(-((t / etax) ** betax))
+
+    @njit(cache=True)
+    def Rh(t, betah, etah):
+        return math.exp(-((t / etah) ** betah))
+
+    @njit(cache=True)
+    def ponto(u, beta, eta):
+        # Troca de variável de qst.distribuicoes.Weibull: devolve t e o peso f(t) dt/du
+        if beta < 1.0:
+            return eta * u ** (1.0 / beta), math.exp(-u)
+        log_t = math.log(u / eta)
+        return u, math.exp(math.log(beta / eta) + (beta - 1) * log_t - math.exp(beta * log_t))
+
+    @njit(cache=True)
+    def fw(t, lambd):
+        return lambd * math.exp(-lambd * t)
+
+    @njit(cache=True)
+    def Rw(t, lambd):
+        return math.exp(-lambd * t)
+
+    assinatura = types.double(types.intc, types.CPointer(types.double), types.CPointer(types.double))
+
+    @cfunc(assinatura, cache=True)
+    def integrando(n, xx, dados_usuario):
+        # xx[0]: variável de integração (interna, nas integrais duplas); xx[1]: variável externa.
+        # As variáveis de X e H chegam na escala de integração da Weibull e são convertidas por ponto()
+        v = carray(xx, n)
+        d = carray(dados_usuario, 10)
+        betax, etax, betah, etah, lambd, Q, S, T = d[0], d[1], d[2], d[3], d[4], d[5], d[6], d[7]
+        cenario, modo = int(d[8]), int(d[9])
+        peso_x = 0.0
+        duracao = 0.0
+        if cenario == 2:
+            x, px = ponto(v[0], betax, etax)
+            g = px * Rh(T - x, betah, etah)
+        elif cenario == 3:
+            x, px = ponto(v[0], betax, etax)
+            g = px * Rh(T - x, betah, etah) * Rw(T - x, lambd)
+            peso_x = x - Q
+        elif cenario == 4:
+            x, px = ponto(v[0], betax, etax)
+            g = px * Rh(T - x, betah, etah)
+        elif cenario == 5:
+            w = v[0]
+            g = fw(w, lambd) * Rx(S + w, betax, etax)
+            duracao = S + w
+        elif cenario == 6:
+            (x, px), w = ponto(v[0], betax, etax), v[1]
+            g = fw(w, lambd) * px * Rh(S + w - x, betah, etah)
+            duracao = S + w
+        elif cenario == 7:
+            w, (x, px) = v[0], ponto(v[1], betax, etax)
+            g = px * fw(w, lambd) * Rh(w, betah, etah)
+            peso_x = x - Q
+            duracao = x + w
+        elif cenario == 8:
+            w, (x, px) = v[0], ponto(v[1], betax, etax)
+            g = px * fw(w, lambd) * Rh(Q + w - x, betah, etah)
+            duracao = Q + w
+        else:
+            (h, ph), (x, px) = ponto(v[0], betah, etah), ponto(v[1], betax, etax)
+            g = px * ph
+            if cenario == 9:
+                g *= Rw(x + h - S, lambd)
+            elif cenario == 10:
+                g *= Rw(h, lambd)
+                peso_x = x - Q
+            elif cenario == 11:
+                g *= Rw(x + h - Q, lambd)
+            duracao = x + h
+        if modo == 1:
+            return peso_x * g
+        if modo == 2:
+            return duracao * g
+        return g
+
+    # O QUADPACK espera "double (int, double *, void *)"; o ABI é o mesmo de double *
+    prototipo = ctypes.CFUNCTYPE(ctypes.c_double, ctypes.c_int, ctypes.POINTER(ctypes.c_double), ctypes.c_void_p)
+    return ctypes.cast(integrando.address, prototipo), integrando
+
+# =============================================================================
+# INTEGRAIS DE BASE COM O INTEGRANDO COMPILADO
+# =============================================================================
+def integrais_base_compiladas(Q, S, T, betax,  etax, betah, etah, lambd):
+    """Integrais de base (P, A, L) com quad/dblquad adaptativos e integrando compilado"""
+    funcao, _ = integrando_compilado()
+
+    def integral(cenario, modo, *dominio):
+        dados = np.array([betax, etax, betah, etah, lambd, Q, S, T, cenario, modo], dtype=float)
+        f = LowLevelCallable(funcao, dados.ctypes.data_as(ctypes.c_void_p))
+        with secao(f'{PREFIXOS[modo]}{cenario}'):
+            valor, _ = (quad if len(dominio) == 2 else dblquad)(f, *dominio)
+        return valor
+
+    # Domínios na mesma ordem de integração de qst.cenarios, com os limites de x e h
+    # levados à escala de integração da Weibull (ux, uh); x(u) desfaz a troca
+    X, H = weibull(betax, etax), weibull(betah, etah)
+    ux, uh, x = X.limite, H.limite, X.tempo
+    dominios = {
+        2: (ux(S), ux(T)),
+        3: (ux(Q), ux(S)),
+        4: (0, ux(Q)),
+        5: (0, T - S),
+        6: (0, T - S, lambda w: ux(S), lambda w: ux(S + w)),
+        7: (ux(Q), ux(S), lambda u: 0, lambda u: T - x(u)),
+        8: (0, ux(Q), lambda u: 0, lambda u: T - Q),
+        9: (ux(S), ux(T), lambda u: 0, lambda u: uh(T - x(u))),
+        10: (ux(Q), ux(S), lambda u: 0, lambda u: uh(T - x(u))),
+        11: (0, ux(Q), lambda u: uh(Q - x(u)), lambda u: uh(T - x(u))),
+        12: (0, ux(Q), lambda u: 0, lambda u: uh(Q - x(u))),
+    }
+    P = np.zeros(12)
+    A = np.zeros(12)
+    L = np.zeros(12)
+    P[0] = Rx(T, betax, etax) * Rw(T - S, lambd)
+    for k, dominio in dominios.items():
+        P[k - 1] = integral(k, PROBABILIDADE, *dominio)
+        if k in (3, 7, 10):
+            A[k - 1] = integral(k, INSPECAO, *dominio)
+        if k >= 5:
+            L[k - 1] = integral(k, DURACAO, *dominio)
+    P[1] *= Rw(T - S, lambd)
+    P[3] *= Rw(T - Q, lambd)
+    A[[0, 1, 4, 5, 8]] = (S - Q) * P[[0, 1, 4, 5, 8]]
+    L[:4] = T * P[:4]
+    return P, A, L
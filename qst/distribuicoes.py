@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+Distribuições de Weibull (X, H) e exponencial (W) do modelo QST.
+"""
+
+import math
+from functools import lru_cache
+
+import numpy as np
+
+# =============================================================================
+# FUNÇÕES DE DISTRIBUIÇÃO
+# =============================================================================
+def fx(t, betax, etax):
+    return ((betax / etax) * ((t / etax) ** (betax - 1))) * np.exp(-((t / etax) ** betax))
+
+def Rx(t, betax, etax):
+    return np.exp(-((t / etax) ** betax))
+
+def Fx(t, betax, etax):
+    return 1 - Rx(t, betax, etax)
+
+def fh(t, betah, etah):
+    return ((betah / etah) * ((t / etah) ** (betah - 1))) * np.exp(-((t / etah) ** betah))
+
+def Rh(t, betah, etah):
+    return np.exp(-((t / etah) ** betah))
+
+def Fh(t, betah, etah):
+    return 1 - Rh(t, betah, etah)
+
+def fw(t, lambd):
+    return lambd * np.exp(-lambd * t)
+
+def Rw(t,lambd):
+    return np.exp(-lambd * t)
+
+def FW(t, lambd):
+    return 1 - Rw(t, lambd)
+
+# =============================================================================
+# WEIBULL EM ESCALA LOG E TROCA DE VARIÁVEL
+# =============================================================================
+# Com β < 1 a densidade (t/η)^(β-1) é infinita em t = 0, limite inferior de várias
+# integrais dos cenários, e o quad subdivide o intervalo centenas de vezes perto
+# dele. A troca u = (t/η)^β elimina a singularidade, pois f(t) dt = e^{-u} du; com
+# β >= 1 a densidade já é regular e a integral continua em t (a troca criaria uma
+# derivada infinita em u = 0). Densidade e sobrevivência são calculadas em escala
+# log, com 1/η e log η calculados uma vez por conjunto de parâmetros.
+
+class Weibull:
+    """Weibull(β, η) com constantes pré-calculadas; aceita escalares ou arrays (t > 0 na densidade)"""
+
+    def __init__(self, beta, eta):
+        # Parâmetros escalares (integrandos do quad) usam floats e math, bem mais rápidos que numpy num ponto só
+        escalar = np.ndim(beta) == np.ndim(eta) == 0
+        if escalar:
+            beta, eta = float(beta), float(eta)
+        self._log, self._exp = (math.log, math.exp) if escalar else (np.log, np.exp)
+        self.beta = beta
+        self.eta = eta
+        self.inv_beta = 1 / beta
+        self.inv_eta = 1 / eta
+        self.log_eta = self._log(eta)
+        self.log_beta_eta = self._log(beta) - self.log_eta
+        self.singular = bool(np.all(np.asarray(beta) < 1))
+        # Variável de integração: u = (t/η)^β se a densidade é singular em 0, o próprio t se não;
+        # limite(t) leva t a u e ponto(u) devolve t e o peso f(t) dt/du
+        self.limite = self.acumulada if self.singular else _identidade
+        self.ponto = self._ponto_acumulada if self.singular else self._ponto_tempo
+
+    def acumulada(self, t):
+        """Taxa de falha acumulada (t/η)^β"""
+        return (t * self.inv_eta) ** self.beta
+
+    def logsf(self, t):
+        return -self.acumulada(t)
+
+    def logpdf(self, t):
+        log_t = self._log(t) - self.log_eta
+        return self.log_beta_eta + (self.beta - 1) * log_t - self._exp(self.beta * log_t)
+
+    def sf(self, t):
+        return self._exp(self.logsf(t))
+
+    def pdf(self, t):
+        return self._exp(self.logpdf(t))
+
+    def tempo(self, u):
+        """Instante t correspondente ao ponto u da variável de integração"""
+        return self.eta * u ** self.inv_beta if self.singular else u
+
+    def _ponto_acumulada(self, u):
+        return self.eta * u ** self.inv_beta, self._exp(-u)
+
+    def _ponto_tempo(self, t):
+        # logpdf em linha: é chamado a cada avaliação do integrando
+        log_t = self._log(t) - self.log_eta
+        return t, self._exp(self.log_beta_eta + (self.beta - 1) * log_t - self._exp(self.beta * log_t))
+
+def _identidade(t):
+    return t
+
+@lru_cache(maxsize=256)
+def weibull(beta, eta):
+    """Weibull(β, η) de parâmetros escalares, construída uma vez por par (β, η)"""
+    return Weibull(beta, eta)
@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+"""
+Estimação de (betax, etax) e (betah, etah) por máxima verossimilhança com
+censura à direita, lendo históricos de manutenção em blocos (memória limitada).
+
+Uso pela linha de comando:
+    python -m qst.estimacao historico.parquet
+"""
+
+import argparse
+import math
+from dataclasses import dataclass
+
+import numpy as np
+from scipy.stats import norm
+
+# Colunas padrão do histórico, uma linha por componente:
+#   X: idade em que o defeito foi encontrado (defeito_observado = 1) ou em que o
+#      componente saiu sem defeito (defeito_observado = 0, censura);
+#   H: atraso do defeito até a falha (falha_observada = 1) ou até a substituição
+#      antes da falha (falha_observada = 0); vazio se não houve defeito.
+COLUNAS = {'X': ('tempo_defeito', 'defeito_observado'), 'H': ('atraso_falha', 'falha_observada')}
+
+# =============================================================================
+# LEITURA EM BLOCOS
+# =============================================================================
+def blocos_arquivo(origem, colunas=None, tamanho_bloco=2**17):
+    """Gera DataFrames de até tamanho_bloco linhas de um CSV ou Parquet (caminho ou arquivo aberto)"""
+    import pandas as pd  # sob demanda: carregar o pacote não exige o pandas
+
+    nome = str(getattr(origem, 'name', origem))
+    if hasattr(origem, 'seek'):
+        origem.seek(0)
+    if nome.endswith(('.parquet', '.pq')):
+        import pyarrow.parquet as pq
+
+        for lote in pq.ParquetFile(origem).iter_batches(batch_size=tamanho_bloco, columns=colunas):
+            yield lote.to_pandas()
+    else:
+        yield from pd.read_csv(origem, usecols=colunas, chunksize=tamanho_bloco)
+
+def _tempos(bloco, coluna_tempo, coluna_evento):
+    # Linhas sem tempo positivo (p. ex. H de componente sem defeito) não entram no ajuste
+    t = bloco[coluna_tempo].to_numpy(dtype=float)
+    evento = bloco[coluna_evento].to_numpy(dtype=float)
+    validas = (t > 0) & np.isfinite(t) & np.isfinite(evento)
+    return t[validas], evento[validas] > 0
+
+# =============================================================================
+# VEROSSIMILHANÇA PERFILADA
+# =============================================================================
+# Com r eventos, L = Σ_eventos ln t e Sk(β) = Σ_todos t^β (ln t)^k, o η ótimo para
+# β fixo é η^β = S0/r, e a log-verossimilhança perfilada é
+#     ℓ(β) = r ln β - r ln(S0/r) + (β - 1) L - r,
+# côncava em β, com ℓ' = r/β + L - r S1/S0 e ℓ'' = -r/β² - r (S2/S0 - (S1/S0)²).
+# Cada passagem pelos dados soma S0, S1 e S2 para alguns valores de β (o primeiro
+# passo usa uma grade, os seguintes o ponto de Newton); os tempos são divididos pelo
+# maior deles para que t^β não transborde.
+GRADE_BETA = np.geomspace(0.05, 50, 25)
+
+class _Acumulador:
+    """Somas de uma variável (X ou H) numa passagem pelos dados"""
+
+    def __init__(self, betas, escala):
+        self.betas = np.atleast_1d(betas)
+        self.escala = escala
+        self.S = np.zeros((3, len(self.betas)))
+
+    def somar(self, t, evento):
+        lt = np.log(t / self.escala)
+        potencias = np.exp(np.outer(self.betas, lt))
+        self.S += [potencias.sum(axis=1), potencias @ lt, potencias @ (lt * lt)]
+
+def _perfilada(beta, S, r, L):
+    S0, S1, S2 = S
+    m1, m2 = S1 / S0, S2 / S0
+    return (r * np.log(beta) - r * np.log(S0 / r) + (beta - 1) * L - r,
+            r / beta + L - r * m1,
+            -r / beta**2 - r * (m2 - m1**2))
+
+@dataclass
+class AjusteWeibull:
+    """Estimativas de máxima verossimilhança (β, η), erros-padrão e covariância assintótica"""
+    beta: float
+    eta: float
+    ep_beta: float
+    ep_eta: float
+    covariancia: np.ndarray
+    n: int
+    eventos: int
+    log_verossimilhanca: float
+    passagens: int
+    convergiu: bool
+
+    def intervalo(self, confianca=0.95):
+        """Intervalos de Wald ((β inf, β sup), (η inf, η sup))"""
+        z = norm.ppf(0.5 + confianca / 2)
+        return ((self.beta - z * self.ep_beta, self.beta + z * self.ep_beta),
+                (self.eta - z * self.ep_eta, self.eta + z * self.ep_eta))
+
+    def imprecisao(self, confianca=0.95):
+        """Meia-largura relativa dos intervalos (β, η), no formato das variações da análise de sensibilidade"""
+        z = norm.ppf(0.5 + confianca / 2)
+        return float(z * self.ep_beta / self.beta), float(z * self.ep_eta / self.eta)
+
+def _informacao(beta, eta, S, escala, r):
+    # Matriz de informação observada em (β, η), com Ak = Σ z^β (ln z)^k e z = t/η
+    d = math.log(escala / eta)
+    k = (escala / eta) ** beta
+    S0, S1, S2 = S
+    A0, A1, A2 = k * S0, k * (S1 + d * S0), k * (S2 + 2 * d * S1 + d * d * S0)
+    return np.array([[r / beta**2 + A2, (r - A0 - beta * A1) / eta],
+                     [(r - A0 - beta * A1) / eta, (beta * (beta + 1) * A0 - r * beta) / eta**2]])
+
+# =============================================================================
+# AJUSTE
+# =============================================================================
+def ajustar_weibull(blocos, variaveis=None, tol=1e-8, max_passagens=50):
+    """Ajusta uma Weibull com censura à direita para cada variável, em passagens pelos dados.
+
+    blocos: função sem argumentos que devolve um iterável de DataFrames (relida a cada
+    passagem; ver blocos_arquivo). variaveis: nome -> (coluna do tempo, coluna do evento
+    (1 = observado, 0 = censurado)); por padrão COLUNAS. O custo é linear no número de
+    registros (tipicamente 5 a 10 passagens) e a memória, a de um bloco.
+    Devolve nome -> AjusteWeibull.
+    """
+    variaveis = variaveis or COLUNAS
+
+    # Passagem inicial: contagens, soma dos logs dos eventos e maior tempo (escala)
+    r, L, n, escala = ({v: 0 for v in variaveis} for _ in range(4))
+    for bloco in blocos():
+        for v, colunas in variaveis.items():
+            t, evento = _tempos(bloco, *colunas)
+            r[v] += int(evento.sum())
+            L[v] += float(np.log(t[evento]).sum())
+            n[v] += len(t)
+            escala[v] = max(escala[v], float(t.max(initial=0)))
+    for v in variaveis:
+        if r[v] == 0:
+            raise ValueError(f"Sem eventos observados para {v}: a verossimilhança não tem máximo")
+    # Com os tempos divididos pela escala, L também passa a ser de ln(t/escala)
+    L = {v: L[v] - r[v] * math.log(escala[v]) for v in variaveis}
+
+    betas = {v: GRADE_BETA for v in variaveis}
+    passo = {v: None for v in variaveis}
+    melhor = {}
+    pendentes = set(variaveis)
+    passagens = 1
+    while pendentes and passagens < max_passagens:
+        acumuladores = {v: _Acumulador(betas[v], escala[v]) for v in pendentes}
+        for bloco in blocos():
+            for v in pendentes:
+                acumuladores[v].somar(*_tempos(bloco, *variaveis[v]))
+        passagens += 1
+
+        for v in list(pendentes):
+            S = acumuladores[v].S
+            ell, d1, d2 = _perfilada(acumuladores[v].betas, S, r[v], L[v])
+            k = int(np.argmax(ell))
+            beta = float(acumuladores[v].betas[k])
+            if v in melhor and ell[k] < melhor[v][1] - 1e-12 * abs(melhor[v][1]):
+                # Newton passou do máximo (além do arredondamento): meio passo a partir do melhor ponto
+                beta_anterior = melhor[v][0]
+                passo[v] /= 2
+                betas[v] = np.array([beta_anterior * math.exp(passo[v])])
+                if abs(passo[v]) < tol:
+                    pendentes.discard(v)
+                continue
+            melhor[v] = (beta, float(ell[k]), S[:, k].copy())
+            # Newton em ln β (ℓ em função de u = ln β tem ℓ_u = β ℓ' e ℓ_uu = β² ℓ'' + β ℓ')
+            curvatura = beta**2 * d2[k] + beta * d1[k]
+            du = -beta * d1[k] / curvatura if curvatura < 0 else math.copysign(1.0, d1[k])
+            passo[v] = float(np.clip(du, -2, 2))
+            if abs(passo[v]) < tol:
+                pendentes.discard(v)
+            else:
+                betas[v] = np.array([beta * math.exp(passo[v])])
+
+    ajustes = {}
+    for v in variaveis:
+        beta, ell, S = melhor[v]
+        eta = escala[v] * float(S[0] / r[v]) ** (1 / beta)
+        covariancia = np.linalg.inv(_informacao(beta, eta, S, escala[v], r[v]))
+        ajustes[v] = AjusteWeibull(beta, eta, math.sqrt(covariancia[0, 0]), math.sqrt(covariancia[1, 1]), covariancia,
+                                   n[v], r[v], ell, passagens, v not in pendentes)
+    return ajustes
+
+def ajustar_historico(origem, colunas=None, tamanho_bloco=2**17, **opcoes):
+    """ajustar_weibull sobre um histórico CSV ou Parquet lido em blocos de tamanho_bloco linhas.
+
+    Devolve os ajustes e os parâmetros do modelo (betax, etax, betah, etah) correspondentes.
+    """
+    colunas = colunas or COLUNAS
+    usadas = sorted({c for par in colunas.values() for c in par})
+    ajustes = ajustar_weibull(lambda: blocos_arquivo(origem, usadas, tamanho_bloco), colunas, **opcoes)
+    parametros = {}
+    for v, sufixo in (('X', 'x'), ('H', 'h')):
+        if v in ajustes:
+            parametros[f'beta{sufixo}'], parametros[f'eta{sufixo}'] = ajustes[v].beta, ajustes[v].eta
+    return ajustes, parametros
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ajuste de X e H (Weibull com censura) a um histórico de manutenção")
+    parser.add_argument('historico', help="histórico (CSV ou Parquet), uma linha por componente")
+    parser.add_argument('--tamanho-bloco', type=int, default=2**17, help="linhas lidas por vez")
+    for v, (tempo, evento) in COLUNAS.items():
+        parser.add_argument(f'--colunas-{v.lower()}', nargs=2, default=[tempo, evento], metavar=('TEMPO', 'EVENTO'),
+                            help=f"colunas de {v} (padrão: {tempo} {evento})")
+    args = parser.parse_args(argv)
+    ajustes, _ = ajustar_historico(args.historico, {'X': tuple(args.colunas_x), 'H': tuple(args.colunas_h)},
+                                   args.tamanho_bloco)
+    for v, a in ajustes.items():
+        (b_inf, b_sup), (e_inf, e_sup) = a.intervalo()
+        print(f"{v}: beta = {a.beta:.6g} (EP {a.ep_beta:.3g}; IC 95% {b_inf:.6g} a {b_sup:.6g}), "
+              f"eta = {a.eta:.6g} (EP {a.ep_eta:.3g}; IC 95% {e_inf:.6g} a {e_sup:.6g}); "
+              f"{a.eventos} eventos em {a.n} registros, {a.passagens} passagens")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""
+Otimização em lote de um cadastro de componentes (frota), com gravação
+contínua dos resultados e retomada após interrupção.
+
+Uso pela linha de comando:
+    python -m qst.frota componentes.csv resultados.csv --workers 8
+"""
+
+import argparse
+import csv
+import io
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from .avaliacao import PARAMETROS, validar_parametros
+from .indice import IndicePoliticas, partida_quente
+from .otimizacao import otimizar_politica
+
+COLUNAS_SAIDA = ('id', 'Q', 'S', 'T', 'taxa_custo', 'MTBOF')
+# Componentes que não puderam ser otimizados (parâmetros inválidos ou erro na otimização)
+# vão para `saida` + SUFIXO_ERROS, com a mensagem; a retomada também os pula
+COLUNAS_ERROS = ('id', 'erro')
+SUFIXO_ERROS = '.erros'
+
+# =============================================================================
+# LEITURA DO CADASTRO E DO PONTO DE CONTROLE
+# =============================================================================
+def ler_componentes(origem):
+    """Lê o cadastro (CSV ou Parquet), com uma coluna por parâmetro do modelo e um 'id' opcional"""
+    import pandas as pd  # sob demanda: carregar o pacote não exige o pandas
+
+    nome = str(getattr(origem, 'name', origem))
+    componentes = pd.read_parquet(origem) if nome.endswith(('.parquet', '.pq')) else pd.read_csv(origem)
+    faltando = [p for p in PARAMETROS if p not in componentes.columns]
+    if faltando:
+        raise ValueError(f"Colunas ausentes no cadastro: {', '.join(faltando)}")
+    if 'id' not in componentes.columns:
+        componentes.insert(0, 'id', range(len(componentes)))
+    componentes['id'] = componentes['id'].astype(str)
+    # Células vazias ou não numéricas viram NaN e o componente é recusado em otimizar_componentes
+    componentes[list(PARAMETROS)] = componentes[list(PARAMETROS)].apply(pd.to_numeric, errors='coerce')
+    return componentes
+
+def ler_concluidos(saida, colunas=COLUNAS_SAIDA):
+    """Ids já gravados em `saida` (CSV com `colunas`); linhas incompletas (interrupção durante a escrita) são descartadas.
+
+    Uma última linha sem quebra de linha foi interrompida no meio e é descartada mesmo
+    que tenha todas as colunas (o último número pode estar cortado). Se algo for
+    descartado, `saida` é regravado só com as linhas completas, pronto para receber mais.
+    """
+    if not os.path.exists(saida) or os.path.getsize(saida) == 0:
+        return set()
+    with open(saida, newline='') as arquivo:
+        texto = arquivo.read()
+    leitor = csv.DictReader(io.StringIO(texto))
+    linhas = list(leitor)
+    if not texto.endswith('\n') and linhas:
+        linhas.pop()
+    # Campos a mais (chave None) vêm de uma linha colada a outra que ficou sem quebra de linha
+    completas = [l for l in linhas if None not in l and all(l.get(c) not in (None, '') for c in colunas)]
+    if len(completas) != len(linhas) or not texto.endswith('\n') or tuple(leitor.fieldnames or ()) != colunas:
+        temporario = saida + '.tmp'
+        with open(temporario, 'w', newline='') as arquivo:
+            escritor = csv.DictWriter(arquivo, fieldnames=colunas, extrasaction='ignore')
+            escritor.writeheader()
+            escritor.writerows(completas)
+        os.replace(temporario, saida)
+    return {l['id'] for l in completas}
+
+# =============================================================================
+# OTIMIZAÇÃO DISTRIBUÍDA
+# =============================================================================
+def otimizar_componente(identificador, parametros, opcoes):
+    """Otimiza um componente; executado nos processos do pool"""
+    busca, otimo = otimizar_politica(parametros, **opcoes)
+    return {'id': identificador, 'Q': otimo.Q, 'S': otimo.S, 'T': otimo.T,
+            'taxa_custo': otimo.taxa_custo, 'MTBOF': otimo.MTBOF}, busca.x
+
+def otimizar_componentes(componentes, workers=1, concluidos=(), indice=None, **opcoes):
+    """Otimiza (Q, S, T) de cada linha ainda não concluída; gera os resultados à medida que terminam.
+
+    Com um IndicePoliticas, cada componente parte dos ótimos dos vizinhos já resolvidos
+    (indice.partida_quente) e cada resultado é acrescentado ao índice ao terminar.
+    Um componente com parâmetros inválidos (validar_parametros) ou cuja otimização
+    falhe não interrompe o lote: gera {'id': ..., 'erro': mensagem}.
+    """
+    opcoes.setdefault('vetorizado', True)
+    n_processos = os.cpu_count() if workers == -1 else workers
+
+    def entregar(tarefa, identificador, parametros):
+        try:
+            resultado, x = tarefa.result()
+        except Exception as erro:
+            return {'id': identificador, 'erro': f"{type(erro).__name__}: {erro}"}
+        if indice is not None:
+            indice.adicionar(parametros, x, resultado['taxa_custo'])
+        return resultado
+
+    with ProcessPoolExecutor(max_workers=n_processos) as executor:
+        # Poucas tarefas em voo por processo: a memória não cresce com o tamanho do cadastro
+        em_andamento = {}
+        for _, linha in componentes.iterrows():
+            identificador = linha['id']
+            if identificador in concluidos:
+                continue
+            try:
+                parametros = validar_parametros(linha)
+            except ValueError as erro:
+                yield {'id': identificador, 'erro': f"parâmetro inválido: {erro}"}
+                continue
+            tarefa = executor.submit(otimizar_componente, identificador, parametros,
+                                     dict(opcoes, **partida_quente(indice, parametros)))
+            em_andamento[tarefa] = identificador, parametros
+            if len(em_andamento) >= 4 * n_processos:
+                feitos, _ = wait(em_andamento, return_when=FIRST_COMPLETED)
+                for tarefa in feitos:
+                    yield entregar(tarefa, *em_andamento.pop(tarefa))
+        for tarefa in wait(em_andamento).done:
+            yield entregar(tarefa, *em_andamento[tarefa])
+
+def otimizar_frota(entrada, saida, workers=1, indice=None, **opcoes):
+    """Otimiza todo o cadastro, gravando cada resultado em `saida` (CSV) assim que fica pronto.
+
+    Os componentes que falham vão para `saida` + SUFIXO_ERROS (id, erro). Se os arquivos
+    já existirem, os componentes neles registrados não são refeitos (para tentar de novo
+    os que falharam, corrija o cadastro e apague o arquivo de erros).
+    indice (um IndicePoliticas) dá partida quente a partir de otimizações anteriores.
+    Devolve o número de componentes otimizados nesta execução.
+    """
+    componentes = ler_componentes(entrada)
+    erros = saida + SUFIXO_ERROS
+    concluidos = ler_concluidos(saida) | ler_concluidos(erros, COLUNAS_ERROS)
+    novo = not os.path.exists(saida) or os.path.getsize(saida) == 0
+    n = 0
+    with open(saida, 'a', newline='') as arquivo:
+        escritor = csv.DictWriter(arquivo, fieldnames=COLUNAS_SAIDA)
+        if novo:
+            escritor.writeheader()
+        for resultado in otimizar_componentes(componentes, workers, concluidos, indice, **opcoes):
+            if 'erro' in resultado:
+                registrar_erro(erros, resultado)
+                continue
+            escritor.writerow(resultado)
+            arquivo.flush()
+            n += 1
+    return n
+
+def registrar_erro(caminho, resultado):
+    """Acrescenta (id, erro) ao arquivo de erros, criado com cabeçalho no primeiro erro"""
+    novo = not os.path.exists(caminho) or os.path.getsize(caminho) == 0
+    with open(caminho, 'a', newline='') as arquivo:
+        escritor = csv.DictWriter(arquivo, fieldnames=COLUNAS_ERROS)
+        if novo:
+            escritor.writeheader()
+        escritor.writerow(resultado)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Otimização da política QST para um cadastro de componentes")
+    parser.add_argument('entrada', help="cadastro de componentes (CSV ou Parquet)")
+    parser.add_argument('saida', help="arquivo CSV de resultados (retomado se já existir)")
+    parser.add_argument('--workers', type=int, default=-1, help="número de processos (-1 = todos os núcleos)")
+    parser.add_argument('--popsize', type=int, default=10)
+    parser.add_argument('--maxiter', type=int, default=50)
+    parser.add_argument('--tol', type=float, default=0.1)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--indice', help="índice SQLite de otimizações anteriores, para partida quente (criado se não existir)")
+    args = parser.parse_args(argv)
+    indice = IndicePoliticas(args.indice) if args.indice else None
+    n = otimizar_frota(args.entrada, args.saida, workers=args.workers, indice=indice, popsize=args.popsize,
+                       maxiter=args.maxiter, tol=args.tol, seed=args.seed)
+    print(f"{n} componentes otimizados; resultados em {args.saida}", file=sys.stderr)
+    if os.path.exists(args.saida + SUFIXO_ERROS):
+        print(f"Componentes com erro em {args.saida + SUFIXO_ERROS}", file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+Índice persistente das otimizações já feitas (parâmetros do modelo -> política
+ótima), com busca dos vizinhos mais próximos para dar partida quente ao DE.
+"""
+
+import json
+import sqlite3
+import threading
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+from .avaliacao import PARAMETROS
+from .cache import chave
+from .otimizacao import limites
+
+# =============================================================================
+# ÍNDICE DE POLÍTICAS ÓTIMAS
+# =============================================================================
+# Cada registro guarda os 11 parâmetros e o ótimo em x = [pQ, pS, T/(etax + etah)]:
+# com T relativo ao limite da busca, a solução de um vizinho de outra escala de
+# tempo ainda cai no lugar certo. A distância entre conjuntos de parâmetros é
+# euclidiana em asinh(p / mediana do parâmetro no índice), quase logarítmica para
+# valores grandes e linear perto de zero (Ci ou λ nulos não atrapalham).
+class IndicePoliticas:
+    """Otimizações anteriores com busca por vizinhos (KD-tree); persistido em SQLite se `caminho` for dado"""
+
+    def __init__(self, caminho=None):
+        self.trava = threading.Lock()
+        self.posicoes = {}
+        self.parametros = []
+        self.x = []
+        self.taxas = []
+        self._arvore = None
+        self.banco = None
+        if caminho is not None:
+            self.banco = sqlite3.connect(caminho, check_same_thread=False)
+            self.banco.execute("CREATE TABLE IF NOT EXISTS politicas (chave TEXT PRIMARY KEY, parametros TEXT, "
+                               "x TEXT, taxa REAL)")
+            self.banco.commit()
+            for k, parametros, x, taxa in self.banco.execute("SELECT chave, parametros, x, taxa FROM politicas"):
+                self._inserir(k, json.loads(parametros), json.loads(x), taxa)
+
+    def __len__(self):
+        return len(self.taxas)
+
+    def _inserir(self, k, parametros, x, taxa):
+        if k in self.posicoes:
+            i = self.posicoes[k]
+            self.x[i], self.taxas[i] = x, taxa
+        else:
+            self.posicoes[k] = len(self.taxas)
+            self.parametros.append(parametros)
+            self.x.append(x)
+            self.taxas.append(taxa)
+        self._arvore = None
+
+    def adicionar(self, parametros, x, taxa):
+        """Registra o ótimo x = [pQ, pS, T] dos parâmetros (substitui o registro anterior dos mesmos parâmetros)"""
+        valores = [float(parametros[p]) for p in PARAMETROS]
+        relativo = [float(x[0]), float(x[1]), float(x[2]) / (parametros['etax'] + parametros['etah'])]
+        k = chave('indice', parametros)
+        with self.trava:
+            self._inserir(k, valores, relativo, float(taxa))
+            if self.banco is not None:
+                self.banco.execute("INSERT OR REPLACE INTO politicas VALUES (?, ?, ?, ?)",
+                                   (k, json.dumps(valores), json.dumps(relativo), float(taxa)))
+                self.banco.commit()
+
+    def _construir(self):
+        # A árvore e as escalas são refeitas só depois de inserções
+        P = np.array(self.parametros)
+        self._escala = np.maximum(np.median(np.abs(P), axis=0), 1e-12)
+        self._arvore = cKDTree(np.arcsinh(P / self._escala))
+
+    def vizinhos(self, parametros, k=5, distancia_max=1.0):
+        """Até k registros mais próximos, a no máximo distancia_max: lista de (distância, x, taxa).
+
+        x = [pQ, pS, T] já com T na escala dos limites de `parametros`.
+        """
+        with self.trava:
+            if not self.taxas:
+                return []
+            if self._arvore is None:
+                self._construir()
+            ponto = np.arcsinh(np.array([parametros[p] for p in PARAMETROS], dtype=float) / self._escala)
+            distancias, indices = self._arvore.query(ponto, k=min(k, len(self.taxas)), distance_upper_bound=distancia_max)
+            encontrados = [(d, self.x[i], self.taxas[i]) for d, i in zip(np.atleast_1d(distancias), np.atleast_1d(indices))
+                           if np.isfinite(d)]
+        T_max = parametros['etax'] + parametros['etah']
+        return [(d, np.array([x[0], x[1], x[2] * T_max]), taxa) for d, x, taxa in encontrados]
+
+    def limpar(self):
+        with self.trava:
+            self.posicoes.clear()
+            self.parametros.clear()
+            self.x.clear()
+            self.taxas.clear()
+            self._arvore = None
+            if self.banco is not None:
+                self.banco.execute("DELETE FROM politicas")
+                self.banco.commit()
+
+def partida_quente(indice, parametros, k=5, distancia_max=1.0, margem=0.1):
+    """Opções de otimizar_politica (iniciais, limites_busca) a partir dos vizinhos já resolvidos.
+
+    Os ótimos dos vizinhos entram na população inicial do DE, e a busca global fica
+    restrita à caixa que os contém, alargada por `margem` da faixa completa de cada
+    coordenada (o polimento continua com os limites completos). Sem vizinhos, devolve {}.
+    """
+    encontrados = indice.vizinhos(parametros, k, distancia_max) if indice is not None else []
+    if not encontrados:
+        return {}
+    X = np.array([x for _, x, _ in encontrados])
+    completos = np.array(limites(parametros), dtype=float)
+    folga = margem * (completos[:, 1] - completos[:, 0])
+    inferior = np.maximum(X.min(axis=0) - folga, completos[:, 0])
+    superior = np.minimum(X.max(axis=0) + folga, completos[:, 1])
+    return {'iniciais': X, 'limites_busca': list(zip(inferior, superior))}
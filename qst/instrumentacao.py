@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+Instrumentação opcional do caminho quente: tempo, chamadas, avaliações do
+integrando, abserr e avisos de integração por cenário.
+"""
+
+import functools
+import json
+import time
+import warnings
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+
+from scipy import integrate
+from scipy.integrate import IntegrationWarning
+
+# =============================================================================
+# PERFIL DE DESEMPENHO
+# =============================================================================
+# Desligada, a instrumentação custa uma consulta a uma ContextVar por chamada.
+# Dentro de `with perfilar() as perfil:`, as funções marcadas com @instrumentado
+# (ou os trechos em `with secao(nome):`) acumulam tempo de parede inclusivo e
+# número de chamadas, e as integrais feitas por quad/dblquad deste módulo somam as
+# avaliações do integrando, o abserr e os avisos na seção mais interna ativa.
+# O perfil vale para a thread (ou tarefa) que o abriu; processos auxiliares não entram.
+_perfil = ContextVar('perfil_qst', default=None)
+
+class Perfil:
+    """Medidas acumuladas por seção (nome de cenário ou de função)"""
+
+    def __init__(self):
+        self.secoes = {}
+        self.pilha = []
+
+    def _registro(self, nome):
+        return self.secoes.setdefault(nome, dict(chamadas=0, tempo_s=0.0, integracoes=0, avaliacoes_integrando=0,
+                                                 abserr_max=0.0, abserr_soma=0.0, avisos=[]))
+
+    @contextmanager
+    def secao(self, nome):
+        registro = self._registro(nome)
+        self.pilha.append(nome)
+        inicio = time.perf_counter()
+        try:
+            yield registro
+        finally:
+            registro['tempo_s'] += time.perf_counter() - inicio
+            registro['chamadas'] += 1
+            self.pilha.pop()
+
+    def integral(self, avaliacoes, abserr=None, aviso=None):
+        """Contabiliza uma integração na seção corrente"""
+        registro = self._registro(self.pilha[-1] if self.pilha else '(fora de cenário)')
+        registro['avaliacoes_integrando'] += avaliacoes
+        if abserr is not None:
+            registro['integracoes'] += 1
+            registro['abserr_max'] = max(registro['abserr_max'], abserr)
+            registro['abserr_soma'] += abserr
+        if aviso:
+            registro['avisos'].append(aviso)
+
+    def como_dict(self):
+        return {nome: dict(r, avisos=sorted(set(r['avisos'])), n_avisos=len(r['avisos']))
+                for nome, r in sorted(self.secoes.items(), key=lambda item: -item[1]['tempo_s'])}
+
+    def para_json(self, caminho=None):
+        """Perfil em JSON; grava em `caminho` se for dado"""
+        texto = json.dumps(self.como_dict(), indent=2, ensure_ascii=False)
+        if caminho is not None:
+            with open(caminho, 'w', encoding='utf-8') as f:
+                f.write(texto)
+        return texto
+
+    def tabela(self):
+        """Perfil como DataFrame, uma linha por seção, da mais demorada para a menos"""
+        import pandas as pd  # sob demanda: carregar o pacote não exige o pandas
+
+        dados = self.como_dict()
+        return pd.DataFrame.from_dict(dados, orient='index').drop(columns='avisos', errors='ignore')
+
+@contextmanager
+def perfilar():
+    """Ativa a coleta de um Perfil no bloco `with`"""
+    perfil = Perfil()
+    token = _perfil.set(perfil)
+    try:
+        yield perfil
+    finally:
+        _perfil.reset(token)
+
+def secao(nome):
+    """Contexto que atribui o trecho à seção `nome` do perfil ativo (nada faz sem perfil)"""
+    perfil = _perfil.get()
+    return nullcontext() if perfil is None else perfil.secao(nome)
+
+def instrumentado(funcao):
+    """Registra cada chamada de `funcao` como uma seção com o nome dela"""
+    @functools.wraps(funcao)
+    def envolvida(*args, **kwargs):
+        perfil = _perfil.get()
+        if perfil is None:
+            return funcao(*args, **kwargs)
+        with perfil.secao(funcao.__name__):
+            return funcao(*args, **kwargs)
+    return envolvida
+
+# =============================================================================
+# QUAD E DBLQUAD CONTABILIZADOS
+# =============================================================================
+def _quad_contado(perfil, func, a, b, args=(), interna=False, externa=False, **opcoes):
+    # Em dblquad, as avaliações contam na integral interna e o abserr na externa
+    valor, abserr, info, *mensagem = integrate.quad(func, a, b, args=args, full_output=1, **opcoes)
+    aviso = mensagem[0] if mensagem else None
+    perfil.integral(0 if externa else info['neval'], None if interna else abserr, aviso)
+    if aviso:
+        # Com full_output o quad não emite o aviso; ele é reemitido como de costume
+        warnings.warn(aviso, IntegrationWarning, stacklevel=3)
+    return valor, abserr
+
+def quad(func, a, b, **opcoes):
+    """scipy.integrate.quad; com perfil ativo, contabiliza avaliações, abserr e avisos"""
+    perfil = _perfil.get()
+    if perfil is None:
+        return integrate.quad(func, a, b, **opcoes)
+    return _quad_contado(perfil, func, a, b, **opcoes)
+
+def dblquad(func, a, b, gfun, hfun, epsabs=1.49e-8, epsrel=1.49e-8):
+    """scipy.integrate.dblquad; com perfil ativo, é feito como quad aninhado para contar as avaliações"""
+    perfil = _perfil.get()
+    if perfil is None:
+        return integrate.dblquad(func, a, b, gfun, hfun, epsabs=epsabs, epsrel=epsrel)
+    limite = lambda g: g if callable(g) else (lambda x: g)
+    g, h = limite(gfun), limite(hfun)
+
+    def interna(x):
+        return _quad_contado(perfil, func, g(x), h(x), args=(x,), interna=True, epsabs=epsabs, epsrel=epsrel)[0]
+    return _quad_contado(perfil, interna, a, b, externa=True, epsabs=epsabs, epsrel=epsrel)
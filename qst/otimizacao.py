@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+"""
+Otimização da política QST (Q, S, T) por evolução diferencial.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy.optimize import OptimizeResult, differential_evolution, minimize
+from scipy.stats import qmc
+
+from .avaliacao import PARAMETROS, avaliar_politica, avaliar_lote, ciclos_lote, precificar_lote, gradiente_lote
+from .quadratura import N_NOS, integrais_base_lote
+
+# =============================================================================
+# OTIMIZAÇÃO COM DIFFERENTIAL EVOLUTION
+# =============================================================================
+def politica(x):
+    """Mapeia x = [pQ, pS, T] para a política (Q, S, T), garantindo Q <= S <= T"""
+    pQ, pS, T = x
+    S = T * pS
+    return S * pQ, S, T
+
+def jacobiana_politica(x):
+    """Derivadas de (Q, S, T) em relação a x = [pQ, pS, T]; linha i é a variável i da política"""
+    pQ, pS, T = x
+    return np.array([[pS * T, pQ * T, pQ * pS],
+                     [0, T, pS],
+                     [0, 0, 1]])
+
+def objetivo(x, parametros, metodo='reduzido'):
+    """Taxa de custo da política codificada em x = [pQ, pS, T]"""
+    return avaliar_politica(*politica(x), parametros, metodo=metodo).taxa_custo
+
+def objetivo_lote(x, parametros):
+    """Taxa de custo de uma população inteira, x com forma (3, tamanho da população)"""
+    taxa, _ = avaliar_lote(*politica(x), parametros)
+    return taxa
+
+def objetivo_gradiente(x, parametros):
+    """Taxa de custo e seu gradiente analítico em x = [pQ, pS, T] (regra do quociente e regra da cadeia)"""
+    EC_, EL_, dEC, dEL = (v[0] for v in gradiente_lote(*politica(x), parametros))
+    taxa = EC_ / EL_
+    return taxa, jacobiana_politica(x).T @ ((dEC - taxa * dEL) / EL_)
+
+class ObjetivoParalelo:
+    """Divide cada geração do DE entre os processos de um pool; cada parte é avaliada em lote"""
+
+    def __init__(self, executor, n_processos, parametros):
+        self.executor = executor
+        self.n_processos = n_processos
+        self.parametros = parametros
+
+    def __call__(self, x):
+        partes = [p for p in np.array_split(x, self.n_processos, axis=1) if p.shape[1]]
+        return np.concatenate(list(self.executor.map(objetivo_lote, partes, [self.parametros] * len(partes))))
+
+def taxa_nivel(Q, S, T, parametros, n):
+    """Taxa de custo de um lote com quadratura de ordem n e o desvio |P_total - 1| de cada política"""
+    P, A, L = integrais_base_lote(Q, S, T, *(parametros[p] for p in PARAMETROS[:5]), n=n)
+    taxa, _ = precificar_lote(P, A, L, *(parametros[p] for p in PARAMETROS[4:]))
+    return taxa, np.abs(P.sum(axis=-1) - 1)
+
+class ObjetivoMultiFidelidade:
+    """Taxa de custo com fidelidade crescente: quadratura grosseira na exploração, fina perto do melhor.
+
+    Cada candidato é avaliado com a ordem niveis[0] e só passa à ordem seguinte se a
+    taxa grosseira estiver a menos de `margem` (relativa) da melhor taxa já obtida na
+    ordem mais fina, ou se a conservação de probabilidade falhar (|P_total - 1| acima de
+    tol_conservacao, sinal de que a quadratura não resolveu os integrandos). Aceita um
+    candidato (3,) ou uma população (3, tamanho); com executor, cada nível é dividido
+    entre os processos. avaliacoes conta as avaliações feitas em cada ordem.
+    """
+
+    def __init__(self, parametros, executor=None, n_processos=1, niveis=(8, N_NOS), margem=0.01,
+                 tol_conservacao=1e-3):
+        self.parametros = parametros
+        self.executor = executor
+        self.n_processos = n_processos
+        self.niveis = niveis
+        self.margem = margem
+        self.tol_conservacao = tol_conservacao
+        self.melhor = np.inf
+        self.avaliacoes = dict.fromkeys(niveis, 0)
+
+    def __getstate__(self):
+        # O executor não vai para os processos do DE (workers sem vetorização)
+        return dict(self.__dict__, executor=None)
+
+    def _nivel(self, Q, S, T, n):
+        if self.executor is None or len(Q) < 2 * self.n_processos:
+            return taxa_nivel(Q, S, T, self.parametros, n)
+        partes = np.array_split(np.arange(len(Q)), self.n_processos)
+        feitos = list(self.executor.map(taxa_nivel, *zip(*((Q[i], S[i], T[i]) for i in partes)),
+                                        [self.parametros] * len(partes), [n] * len(partes)))
+        return tuple(np.concatenate(v) for v in zip(*feitos))
+
+    def __call__(self, x):
+        x = np.asarray(x, dtype=float)
+        Q, S, T = politica(x.reshape(3, -1))
+        taxa = np.empty(Q.shape)
+        pendentes = np.arange(len(Q))
+        for i, n in enumerate(self.niveis):
+            taxa[pendentes], desvio = self._nivel(Q[pendentes], S[pendentes], T[pendentes], n)
+            self.avaliacoes[n] += len(pendentes)
+            if i == len(self.niveis) - 1:
+                if np.isfinite(taxa[pendentes]).any():
+                    self.melhor = min(self.melhor, np.nanmin(taxa[pendentes]))
+                break
+            escalar = (taxa[pendentes] <= self.melhor * (1 + self.margem)) | (desvio > self.tol_conservacao)
+            pendentes = pendentes[escalar]
+            if not len(pendentes):
+                break
+        return taxa[0] if x.ndim == 1 else taxa
+
+def limites(parametros):
+    """Limites da busca: pQ e pS entre 0 e 1; T entre 0 e (etax + etah)"""
+    return [(0, 1), (0, 1), (0, parametros['etax'] + parametros['etah'])]
+
+def polir_politica(x0, parametros, ftol=1e-12, gtol=1e-9, maxiter=200):
+    """Refinamento local por L-BFGS-B com limites, usando o gradiente analítico da taxa de custo"""
+    return minimize(objetivo_gradiente, np.asarray(x0, dtype=float), args=(parametros,), jac=True,
+                    method='L-BFGS-B', bounds=limites(parametros),
+                    options={'ftol': ftol, 'gtol': gtol, 'maxiter': maxiter})
+
+def aceitar_polimento(resultado, busca, parametros):
+    """Fica com o ponto polido se ele for finito e a taxa exata melhorar.
+
+    As taxas de resultado.x e de busca.x são recalculadas pelo caminho reduzido: resultado.fun
+    pode vir da quadratura grosseira (multifidelidade) ou de um substituto, e busca.fun do
+    último ponto tentado. busca.success não é exigido: com ftol pequeno a busca em linha
+    costuma terminar como ABNORMAL já no mínimo. resultado.fun passa a ser a taxa exata
+    do ponto escolhido.
+    """
+    resultado.fun = objetivo(resultado.x, parametros)
+    if not np.all(np.isfinite(busca.x)):
+        return resultado
+    taxa = objetivo(busca.x, parametros)
+    if np.isfinite(taxa) and (taxa <= resultado.fun or not np.isfinite(resultado.fun)):
+        resultado.x, resultado.fun, resultado.jac = busca.x, taxa, busca.jac
+    return resultado
+
+def populacao_inicial(bounds, popsize, iniciais, rng=None):
+    """População inicial do DE (popsize·3, 3): hipercubo latino em bounds, com os pontos `iniciais` nas primeiras linhas"""
+    bounds = np.array(bounds, dtype=float)
+    populacao = qmc.scale(qmc.LatinHypercube(d=3, seed=rng).random(popsize * 3), bounds[:, 0], bounds[:, 1])
+    iniciais = np.clip(np.atleast_2d(iniciais), bounds[:, 0], bounds[:, 1])[:len(populacao)]
+    populacao[:len(iniciais)] = iniciais
+    return populacao
+
+def otimizar_politica(parametros, popsize=10, maxiter=50, tol=0.1, vetorizado=False, workers=1, polimento=True,
+                      multifidelidade=False, iniciais=None, limites_busca=None, **opcoes):
+    """Otimiza (Q, S, T); devolve o resultado do DE e a avaliação adaptativa da política ótima.
+
+    vetorizado=True avalia cada geração inteira numa só operação com arrays.
+    workers > 1 (ou -1 para todos os núcleos) distribui a avaliação entre processos:
+    com vetorizado=True cada processo recebe uma fatia da população e a avalia em
+    lote; sem ele, o DE distribui as avaliações escalares (updating='deferred').
+    polimento=True substitui o polimento por diferenças finitas do DE por polir_politica
+    (gradiente analítico): a busca global só precisa achar a bacia do ótimo, e popsize e
+    maxiter pequenos já dão uma política precisa e reprodutível.
+    multifidelidade=True avalia a busca global com ObjetivoMultiFidelidade (resultado.avaliacoes
+    traz as avaliações por ordem de quadratura); o polimento e o resultado final seguem com
+    a precisão completa. Sem vetorização e com workers > 1, cada processo guarda sua própria
+    melhor taxa e as contagens não voltam ao processo principal.
+    iniciais (pontos x = [pQ, pS, T], (k, 3)) entram na população inicial e limites_busca
+    restringe a busca global (ver indice.partida_quente); o polimento usa os limites completos.
+    """
+    n_processos = os.cpu_count() if workers == -1 else workers
+    bounds = limites_busca or limites(parametros)
+    if iniciais is not None:
+        opcoes['init'] = populacao_inicial(bounds, popsize, iniciais, opcoes.get('rng', opcoes.get('seed')))
+    if polimento:
+        opcoes['polish'] = False
+    if vetorizado and n_processos > 1:
+        with ProcessPoolExecutor(max_workers=n_processos) as executor:
+            f = (ObjetivoMultiFidelidade(parametros, executor, n_processos) if multifidelidade
+                 else ObjetivoParalelo(executor, n_processos, parametros))
+            resultado = differential_evolution(f, bounds=bounds, popsize=popsize, maxiter=maxiter, tol=tol,
+                                               vectorized=True, updating='deferred', **opcoes)
+    elif vetorizado:
+        f, args = (ObjetivoMultiFidelidade(parametros), ()) if multifidelidade else (objetivo_lote, (parametros,))
+        resultado = differential_evolution(f, bounds=bounds, args=args,
+                                           popsize=popsize, maxiter=maxiter, tol=tol,
+                                           vectorized=True, updating='deferred', **opcoes)
+    else:
+        if n_processos > 1:
+            opcoes.update(workers=n_processos, updating='deferred')
+        f, args = (ObjetivoMultiFidelidade(parametros), ()) if multifidelidade else (objetivo, (parametros,))
+        resultado = differential_evolution(f, bounds=bounds, args=args,
+                                           popsize=popsize, maxiter=maxiter, tol=tol, **opcoes)
+    if multifidelidade:
+        resultado.avaliacoes = dict(f.avaliacoes)
+    if polimento:
+        busca = polir_politica(resultado.x, parametros)
+        resultado.nfev += busca.nfev
+        aceitar_polimento(resultado, busca, parametros)
+    return resultado, avaliar_politica(*politica(resultado.x), parametros, metodo='compilado')
+
+# =============================================================================
+# OTIMIZAÇÃO FRACIONÁRIA (DINKELBACH)
+# =============================================================================
+# A taxa de custo é a razão de recompensa-renovação EC/EL. Para r fixo, o mínimo
+# de F_r(x) = EC(x) - r·EL(x) é negativo se r está acima da taxa ótima r* e zero
+# em r = r*. O método de Dinkelbach alterna a minimização de F_r com a
+# atualização r <- EC/EL no minimizador, convergindo de forma superlinear para r*.
+def otimizar_politica_dinkelbach(parametros, tol=1e-9, max_iter=30, grade=(2, 2, 2), callback=None):
+    """Otimiza (Q, S, T) pelo método de Dinkelbach com busca determinística em [pQ, pS, T].
+
+    Uma grade inicial pequena (grade[i] centros de células iguais em cada eixo, avaliada em
+    lote) fornece o primeiro r e o ponto de partida; cada F_r é minimizada por L-BFGS-B dentro
+    dos limites, com o gradiente analítico. Devolve um OptimizeResult
+    (x, fun = taxa ótima, historico_r, nit, nfev) e a avaliação adaptativa da política ótima.
+    callback, como no DE, recebe um OptimizeResult (x, fun = r, nit) ao fim de cada iteração;
+    se devolver True, as iterações param. Se a minimização de F_r devolver valores não finitos,
+    ou falhar sem baixar F_r a zero ou menos, as iterações param com success=False e o último
+    ponto válido.
+    """
+    bounds = limites(parametros)
+    custos = [parametros[p] for p in PARAMETROS[4:]]
+    nfev = 0
+
+    def ciclo(x):
+        nonlocal nfev
+        nfev += 1
+        EC_x, EL_x, dEC, dEL = (v[0] for v in gradiente_lote(*politica(x), parametros))
+        J = jacobiana_politica(x).T
+        return EC_x, EL_x, J @ dEC, J @ dEL
+
+    # Centros de células: a partida fica no interior, longe das políticas degeneradas da borda
+    eixos = [lo + (hi - lo) * (np.arange(n) + 0.5) / n for (lo, hi), n in zip(bounds, grade)]
+    X = np.array(np.meshgrid(*eixos, indexing='ij')).reshape(3, -1)
+    P, A, L = integrais_base_lote(*politica(X), *(parametros[p] for p in PARAMETROS[:5]))
+    EC_grade, EL_grade = ciclos_lote(P, A, L, *custos)
+    nfev += X.shape[1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        razoes = np.where(EL_grade > 0, EC_grade / EL_grade, np.inf)
+    x = X[:, np.argmin(razoes)]
+    EC_, EL_, _, _ = ciclo(x)
+    r = EC_ / EL_
+    historico_r = [r]
+    convergiu = False
+    falha = None
+
+    def F(x):
+        EC_x, EL_x, dEC, dEL = ciclo(x)
+        return EC_x - r * EL_x, dEC - r * dEL
+
+    for nit in range(1, max_iter + 1):
+        # Parte do melhor ponto entre o minimizador anterior e a grade para o r atual
+        F_grade = EC_grade - r * EL_grade
+        inicio = x if EC_ - r * EL_ <= F_grade.min() else X[:, np.argmin(F_grade)]
+        busca = minimize(F, inicio, jac=True, method='L-BFGS-B', bounds=bounds, options={'ftol': 1e-15, 'gtol': 1e-12})
+        # Com ftol tão pequeno a busca em linha costuma terminar como ABNORMAL já no mínimo: o passo vale
+        # se tudo for finito e F_r <= 0 (r não aumenta); senão, para no último ponto válido
+        if not (np.isfinite(busca.fun) and np.all(np.isfinite(busca.jac)) and np.all(np.isfinite(busca.x))
+                and (busca.success or busca.fun <= 0)):
+            falha = f"Minimização de F_r falhou: {busca.message}"
+            break
+        EC_novo, EL_novo, _, _ = ciclo(busca.x)
+        if not (np.isfinite(EC_novo) and np.isfinite(EL_novo) and EL_novo > 0):
+            falha = "Ciclo não finito no minimizador de F_r"
+            break
+        x, EC_, EL_ = busca.x, EC_novo, EL_novo
+        r_novo = EC_ / EL_
+        historico_r.append(r_novo)
+        if abs(r_novo - r) <= tol * abs(r):
+            r = r_novo
+            convergiu = True
+            break
+        r = r_novo
+        if callback is not None and callback(intermediate_result=OptimizeResult(x=x, fun=r, nit=nit)):
+            break
+
+    mensagem = "r convergiu" if convergiu else falha or "Número máximo de iterações atingido"
+    resultado = OptimizeResult(x=x, fun=r, historico_r=historico_r, nit=nit, nfev=nfev, success=convergiu,
+                               message=mensagem)
+    return resultado, avaliar_politica(*politica(x), parametros, metodo='compilado')
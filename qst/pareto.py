@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""
+Otimização biobjetivo da política QST: fronteira de Pareto entre a taxa de
+custo (a minimizar) e o MTBOF (a maximizar).
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+from scipy.optimize import OptimizeResult
+from scipy.stats import qmc
+
+from .avaliacao import avaliar_lote
+from .otimizacao import limites, politica
+
+# =============================================================================
+# DOMINÂNCIA
+# =============================================================================
+# Os dois objetivos são minimizados como (taxa de custo, -MTBOF). Com dois
+# objetivos, a fronteira sai de uma ordenação: em ordem crescente de custo, um
+# ponto é não dominado se tem MTBOF maior que o de todos os anteriores.
+def nao_dominados(F):
+    """Índices dos pontos não dominados de F (n, 2), em ordem crescente do primeiro objetivo"""
+    ordem = np.lexsort((F[:, 1], F[:, 0]))
+    melhor_anterior = np.minimum.accumulate(np.concatenate([[np.inf], F[ordem, 1]]))[:-1]
+    return ordem[F[ordem, 1] < melhor_anterior]
+
+def camadas(F):
+    """Nível de não dominância de cada ponto (0 = fronteira), retirando uma fronteira por vez.
+
+    Pontos com objetivo infinito (política sem resultado finito) ficam no último nível.
+    """
+    nivel = np.full(len(F), len(F))
+    restantes = np.flatnonzero(np.isfinite(F).all(axis=1))
+    k = 0
+    while len(restantes):
+        frente = restantes[nao_dominados(F[restantes])]
+        nivel[frente] = k
+        restantes = np.setdiff1d(restantes, frente, assume_unique=True)
+        k += 1
+    return nivel
+
+def aglomeracao(F):
+    """Distância de aglomeração (NSGA-II) dos pontos de uma mesma camada; os extremos recebem infinito"""
+    distancia = np.zeros(len(F))
+    for objetivo in F.T:
+        ordem = np.argsort(objetivo)
+        amplitude = objetivo[ordem[-1]] - objetivo[ordem[0]]
+        distancia[ordem[[0, -1]]] = np.inf
+        if amplitude > 0 and len(F) > 2:
+            distancia[ordem[1:-1]] += (objetivo[ordem[2:]] - objetivo[ordem[:-2]]) / amplitude
+    return distancia
+
+# =============================================================================
+# AVALIAÇÃO COM ARQUIVO
+# =============================================================================
+def objetivos_lote(x, parametros):
+    """(taxa de custo, -MTBOF) de um lote x (3, n) numa só avaliação; inf onde o resultado não é finito"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        taxa, mtbof = avaliar_lote(*politica(x), parametros)
+    F = np.column_stack([taxa, -mtbof])
+    F[~np.isfinite(F).all(axis=1)] = np.inf
+    return F
+
+class ArquivoAvaliacoes:
+    """Guarda (taxa de custo, -MTBOF) por candidato: um ponto já visto nunca é reavaliado.
+
+    Os candidatos são identificados por x arredondado a `decimais` casas; os novos de
+    cada lote são avaliados juntos, divididos entre os processos de `executor`, se houver.
+    """
+
+    def __init__(self, parametros, executor=None, n_processos=1, decimais=10):
+        self.parametros = parametros
+        self.executor = executor
+        self.n_processos = n_processos
+        self.decimais = decimais
+        self.pontos = {}
+
+    def __len__(self):
+        return len(self.pontos)
+
+    def __call__(self, x):
+        """Objetivos F (n, 2) do lote x (3, n)"""
+        chaves = [tuple(c) for c in np.round(x, self.decimais).T]
+        novos = list(dict.fromkeys(c for c in chaves if c not in self.pontos))
+        if novos:
+            X = np.array(novos).T
+            if self.executor is not None and self.n_processos > 1:
+                partes = [p for p in np.array_split(X, self.n_processos, axis=1) if p.shape[1]]
+                F = np.concatenate(list(self.executor.map(objetivos_lote, partes, [self.parametros] * len(partes))))
+            else:
+                F = objetivos_lote(X, self.parametros)
+            self.pontos.update(zip(novos, F))
+        return np.array([self.pontos[c] for c in chaves])
+
+    def fronteira(self):
+        """x (3, n) e F (n, 2) dos pontos não dominados entre todos os avaliados"""
+        X = np.array(list(self.pontos)).T
+        F = np.array(list(self.pontos.values()))
+        finitos = np.isfinite(F).all(axis=1)
+        X, F = X[:, finitos], F[finitos]
+        indices = nao_dominados(F)
+        return X[:, indices], F[indices]
+
+# =============================================================================
+# BUSCA EVOLUTIVA (NSGA-II COM VARIAÇÃO DO DE)
+# =============================================================================
+@dataclass
+class FronteiraPareto:
+    """Políticas não dominadas em ordem crescente de taxa de custo (e de MTBOF)"""
+    x: np.ndarray
+    Q: np.ndarray
+    S: np.ndarray
+    T: np.ndarray
+    taxa_custo: np.ndarray
+    MTBOF: np.ndarray
+    avaliacoes: int
+    geracoes: int
+
+    def tabela(self):
+        import pandas as pd  # sob demanda: carregar o pacote não exige o pandas
+
+        return pd.DataFrame({'Q': self.Q, 'S': self.S, 'T': self.T, 'pQ': self.x[0], 'pS': self.x[1],
+                             'taxa_custo': self.taxa_custo, 'MTBOF': self.MTBOF})
+
+    def escolher(self, mtbof_alvo):
+        """Índice da política de menor custo com MTBOF >= mtbof_alvo (None se nenhuma chega lá)"""
+        atende = np.flatnonzero(self.MTBOF >= mtbof_alvo)
+        return int(atende[0]) if len(atende) else None
+
+def otimizar_pareto(parametros, tamanho=100, geracoes=100, F=0.5, CR=0.7, workers=1, seed=None, iniciais=None,
+                    callback=None):
+    """Fronteira de Pareto (taxa de custo, MTBOF) sobre x = [pQ, pS, T] por NSGA-II.
+
+    Cada geração cria `tamanho` filhos pela mutação do DE (rand/1/bin, F e CR) e mantém
+    os melhores de pais e filhos por nível de não dominância e distância de aglomeração.
+    Cada candidato é avaliado uma única vez para os dois objetivos (ArquivoAvaliacoes),
+    em lote e, com workers > 1 (ou -1 para todos os núcleos), em paralelo. A fronteira
+    devolvida é a dos pontos não dominados entre todos os avaliados.
+    iniciais, se dado, são pontos x = [pQ, pS, T] (3, k) postos na população inicial,
+    por exemplo a política de custo mínimo já otimizada.
+    callback, como no DE, recebe um OptimizeResult (x, fun = objetivos da fronteira
+    corrente, nit) ao fim de cada geração; se devolver True, a busca para.
+    """
+    rng = np.random.default_rng(seed)
+    bounds = np.array(limites(parametros), dtype=float)
+    inferior, superior = bounds[:, 0, None], bounds[:, 1, None]
+    n_processos = os.cpu_count() if workers == -1 else workers
+    executor = ProcessPoolExecutor(max_workers=n_processos) if n_processos > 1 else None
+    try:
+        arquivo = ArquivoAvaliacoes(parametros, executor, n_processos)
+        pais = qmc.scale(qmc.LatinHypercube(d=3, seed=rng).random(tamanho), bounds[:, 0], bounds[:, 1]).T
+        if iniciais is not None:
+            iniciais = np.clip(np.asarray(iniciais, dtype=float).reshape(3, -1)[:, :tamanho], inferior, superior)
+            pais[:, :iniciais.shape[1]] = iniciais
+        F_pais = arquivo(pais)
+        nit = 0
+        for nit in range(1, geracoes + 1):
+            # Mutação rand/1 com três pais distintos e recombinação binomial
+            r = np.argsort(rng.random((tamanho, tamanho)), axis=1)[:, :3]
+            mutante = np.clip(pais[:, r[:, 0]] + F * (pais[:, r[:, 1]] - pais[:, r[:, 2]]), inferior, superior)
+            cruza = rng.random((3, tamanho)) < CR
+            cruza[rng.integers(3, size=tamanho), np.arange(tamanho)] = True
+            filhos = np.where(cruza, mutante, pais)
+
+            X = np.concatenate([pais, filhos], axis=1)
+            F_X = np.concatenate([F_pais, arquivo(filhos)])
+            nivel = camadas(F_X)
+            distancia = np.zeros(len(F_X))
+            for k in np.unique(nivel):
+                membros = np.flatnonzero(nivel == k)
+                distancia[membros] = aglomeracao(np.where(np.isfinite(F_X[membros]), F_X[membros], 0))
+            escolhidos = np.lexsort((-distancia, nivel))[:tamanho]
+            pais, F_pais = X[:, escolhidos], F_X[escolhidos]
+
+            if callback is not None and callback(intermediate_result=OptimizeResult(
+                    x=pais[:, nivel[escolhidos] == 0], fun=F_pais[nivel[escolhidos] == 0], nit=nit)):
+                break
+        x, F_fronteira = arquivo.fronteira()
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    Q, S, T = politica(x)
+    return FronteiraPareto(x, Q, S, T, F_fronteira[:, 0], -F_fronteira[:, 1], len(arquivo), nit)
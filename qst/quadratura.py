@@ -0,0 +1,439 @@
+# -*- coding: utf-8 -*-
+"""
+Quadratura vetorizada de Gauss–Legendre para lotes de políticas e caminho
+reduzido (unidimensional) dos cenários 6 a 12.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+from scipy.special import gamma, gammainc
+
+from .distribuicoes import fx, Rx, fh, Rh, Fh, fw, Rw, Weibull
+from .instrumentacao import instrumentado
+
+# =============================================================================
+# QUADRATURA VETORIZADA (GAUSS–LEGENDRE EM LOTE)
+# =============================================================================
+# Avalia os doze cenários para um lote inteiro de políticas (Q, S, T) numa só
+# operação com arrays, usando tabelas fixas de nós e pesos de Gauss–Legendre.
+# Os domínios triangulares (cenários 6 a 12) são integrados por produto
+# tensorial, com o limite interno mapeado a partir da variável externa.
+# Todos os argumentos aceitam escalares ou arrays (difundidos para o lote).
+N_NOS = 32
+
+@lru_cache(maxsize=None)
+def nos_gauss_legendre(n):
+    """Nós e pesos de Gauss–Legendre de ordem n no intervalo [-1, 1]"""
+    return np.polynomial.legendre.leggauss(n)
+
+def regra1(a, b, n=N_NOS):
+    """Nós e pesos para integrar em [a, b], uma linha por política do lote"""
+    t, p = nos_gauss_legendre(n)
+    meia = (b - a)[:, None] / 2
+    return a[:, None] + meia * (t + 1), meia * p
+
+def regra_weibull(a, b, beta, eta, n=N_NOS):
+    """Nós t em [a, b] e pesos que já incluem a densidade f(t) dt da Weibull(β, η), uma linha por política.
+
+    A integração é feita em u = (t/η)^m. Com β < 1, m = β é a troca de
+    qst.distribuicoes.Weibull, que remove a singularidade de f em 0 (f dt = e^{-u} du);
+    com 1 <= β < 2, m = 1/2 suaviza o termo t^{β-1} de f perto de 0 (f dt ∝ u^{2β-1} du),
+    que em t limitaria a convergência de Gauss–Legendre quando a = 0; com β >= 2, m = 1.
+    """
+    m = np.where(beta < 1, beta, np.where(beta < 2, 0.5, 1.0))[:, None]
+    dist = Weibull(beta[:, None], eta[:, None])
+    u, p = regra1((a / eta) ** m[:, 0], (b / eta) ** m[:, 0], n)
+    # A volta u -> t pode passar dos extremos por arredondamento (e T - t < 0 não tem Rh definida)
+    t = np.clip(dist.eta * u ** (1 / m), a[:, None], b[:, None])
+    # Intervalos vazios (Q = 0) têm nós em t = 0, onde a densidade em escala log não é definida
+    densidade = dist.pdf(np.maximum(t, np.finfo(float).tiny)) * dist.eta / m * u ** (1 / m - 1)
+    return t, p * np.where(dist.beta < 1, np.exp(-u), densidade)
+
+def regra2(a, b, c, d, n=N_NOS):
+    """Nós e pesos para integrar em a <= u <= b, c(u) <= v <= d(u), uma linha por política"""
+    t, p = nos_gauss_legendre(n)
+    u, pu = regra1(a, b, n)
+    c_u = np.broadcast_to(c(u), u.shape)
+    d_u = np.broadcast_to(d(u), u.shape)
+    meia = (d_u - c_u)[..., None] / 2
+    v = c_u[..., None] + meia * (t + 1)
+    pv = pu[..., None] * meia * p
+    N = u.shape[0]
+    return np.broadcast_to(u[..., None], v.shape).reshape(N, -1), v.reshape(N, -1), pv.reshape(N, -1)
+
+def cenarios_lote(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df, n=N_NOS):
+    """Probabilidades, custos e durações esperadas dos doze cenários para um lote de políticas"""
+    Q, S, T, betax, etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df = np.broadcast_arrays(
+        *(np.atleast_1d(np.asarray(v, dtype=float)) for v in (Q, S, T, betax, etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)))
+    # Parâmetros como colunas, para difundir sobre os nós de cada política
+    Q_, S_, T_, bx, ex, bh, eh, lb, Ci_, Co_, Cp_, Cf_, Dp_, Df_ = (
+        v[:, None] for v in (Q, S, T, betax, etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df))
+    r = {}
+
+    # Cenários 1 e 2
+    r['P1'] = Rx(T, betax, etax) * Rw(T - S, lambd)
+    x, p = regra1(S, T, n)
+    r['P2'] = np.sum(p * fx(x, bx, ex) * Rh(T_ - x, bh, eh), axis=-1) * Rw(T - S, lambd)
+    for k in (1, 2):
+        r[f'EC{k}'] = r[f'P{k}'] * (Cp + lambd * (S - Q) * Ci)
+        r[f'EL{k}'] = r[f'P{k}'] * (T + Dp)
+
+    # Cenário 3
+    x, p = regra1(Q, S, n)
+    g = p * fx(x, bx, ex) * Rh(T_ - x, bh, eh) * Rw(T_ - x, lb)
+    r['P3'] = np.sum(g, axis=-1)
+    r['EC3'] = np.sum(g * (Cp_ + lb * (x - Q_) * Ci_), axis=-1)
+    r['EL3'] = r['P3'] * (T + Dp)
+
+    # Cenário 4
+    x, p = regra1(np.zeros_like(Q), Q, n)
+    r['P4'] = np.sum(p * fx(x, bx, ex) * Rh(T_ - x, bh, eh), axis=-1) * Rw(T - Q, lambd)
+    r['EC4'] = r['P4'] * Cp
+    r['EL4'] = r['P4'] * (T + Dp)
+
+    # Cenário 5
+    w, p = regra1(np.zeros_like(S), T - S, n)
+    g = p * fw(w, lb) * Rx(S_ + w, bx, ex)
+    r['P5'] = np.sum(g, axis=-1)
+    r['EC5'] = r['P5'] * (Co + lambd * (S - Q) * Ci)
+    r['EL5'] = np.sum(g * (S_ + w + Dp_), axis=-1)
+
+    # Cenário 6
+    w, x, p = regra2(np.zeros_like(S), T - S, lambda w: S_, lambda w: S_ + w, n)
+    g = p * fw(w, lb) * fx(x, bx, ex) * Rh(S_ + w - x, bh, eh)
+    r['P6'] = np.sum(g, axis=-1)
+    r['EC6'] = r['P6'] * (Co + lambd * (S - Q) * Ci)
+    r['EL6'] = np.sum(g * (S_ + w + Dp_), axis=-1)
+
+    # Cenário 7
+    x, w, p = regra2(Q, S, lambda x: 0, lambda x: T_ - x, n)
+    g = p * fx(x, bx, ex) * fw(w, lb) * Rh(w, bh, eh)
+    r['P7'] = np.sum(g, axis=-1)
+    r['EC7'] = np.sum(g * (Co_ + lb * (x - Q_) * Ci_), axis=-1)
+    r['EL7'] = np.sum(g * (x + w + Dp_), axis=-1)
+
+    # Cenário 8
+    x, w, p = regra2(np.zeros_like(Q), Q, lambda x: 0, lambda x: T_ - Q_, n)
+    g = p * fx(x, bx, ex) * fw(w, lb) * Rh(Q_ + w - x, bh, eh)
+    r['P8'] = np.sum(g, axis=-1)
+    r['EC8'] = r['P8'] * Co
+    r['EL8'] = np.sum(g * (Q_ + w + Dp_), axis=-1)
+
+    # Cenário 9
+    x, h, p = regra2(S, T, lambda x: 0, lambda x: T_ - x, n)
+    g = p * fx(x, bx, ex) * fh(h, bh, eh) * Rw(x + h - S_, lb)
+    r['P9'] = np.sum(g, axis=-1)
+    r['EC9'] = r['P9'] * (Cf + lambd * (S - Q) * Ci)
+    r['EL9'] = np.sum(g * (x + h + Df_), axis=-1)
+
+    # Cenário 10
+    x, h, p = regra2(Q, S, lambda x: 0, lambda x: T_ - x, n)
+    g = p * fx(x, bx, ex) * fh(h, bh, eh) * Rw(h, lb)
+    r['P10'] = np.sum(g, axis=-1)
+    r['EC10'] = np.sum(g * (Cf_ + lb * (x - Q_) * Ci_), axis=-1)
+    r['EL10'] = np.sum(g * (x + h + Df_), axis=-1)
+
+    # Cenário 11
+    x, h, p = regra2(np.zeros_like(Q), Q, lambda x: Q_ - x, lambda x: T_ - x, n)
+    g = p * fx(x, bx, ex) * fh(h, bh, eh) * Rw(x + h - Q_, lb)
+    r['P11'] = np.sum(g, axis=-1)
+    r['EC11'] = Cf * r['P11']
+    r['EL11'] = np.sum(g * (x + h + Df_), axis=-1)
+
+    # Cenário 12
+    x, h, p = regra2(np.zeros_like(Q), Q, lambda x: 0, lambda x: Q_ - x, n)
+    g = p * fx(x, bx, ex) * fh(h, bh, eh)
+    r['P12'] = np.sum(g, axis=-1)
+    r['EC12'] = Cf * r['P12']
+    r['EL12'] = np.sum(g * (x + h + Df_), axis=-1)
+    return r
+
+def _soma_cenarios(r, prefixo, cenarios=range(1, 13)):
+    return sum(r[f'{prefixo}{k}'] for k in cenarios)
+
+def taxa_custo_lote(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df, n=N_NOS):
+    """Taxa de custo para um lote de políticas e estimativa do erro de quadratura (ordem n contra n/2)"""
+    args = (Q, S, T, betax, etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
+    taxas = []
+    for ordem in (n, n // 2):
+        r = cenarios_lote(*args, n=ordem)
+        taxas.append(_soma_cenarios(r, 'EC') / _soma_cenarios(r, 'EL'))
+    return taxas[0], np.abs(taxas[0] - taxas[1])
+
+def MTBOF_lote(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df, n=N_NOS):
+    """MTBOF para um lote de políticas e estimativa do erro de quadratura (ordem n contra n/2)"""
+    args = (Q, S, T, betax, etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
+    valores = []
+    for ordem in (n, n // 2):
+        r = cenarios_lote(*args, n=ordem)
+        valores.append(_soma_cenarios(r, 'EL') / _soma_cenarios(r, 'P', range(9, 13)))
+    return valores[0], np.abs(valores[0] - valores[1])
+
+# =============================================================================
+# CAMINHO REDUZIDO: CENÁRIOS 6 A 12 COMO INTEGRAIS UNIDIMENSIONAIS
+# =============================================================================
+# Com fw exponencial, a integral interna de cada cenário 6 a 12 depende de x só
+# por meio de um intervalo [a, b] e se escreve com
+#   D0(a, b) = ∫_a^b Rh(v) e^{-λ(v-a)} dv    e    D1(a, b) = ∫_a^b v Rh(v) e^{-λ(v-a)} dv.
+# Nos cenários 6 a 8 a troca de variável v = (instante da oportunidade) - x leva
+# direto a D0/D1; nos cenários 9 a 11 a integral ponderada por fh é reescrita via
+# Rh por integração por partes; no cenário 12 a integral interna é a própria Fh.
+# D0 e D1 vêm das caudas J(u) = ∫_u^∞ Rh(v) e^{-λ(v-u)} dv (e de v Rh), obtidas em
+# todos os nós de uma vez por uma recorrência regressiva:
+#   D(a, b) = J(a) - e^{-λ(b-a)} J(b),
+# que não perde precisão quando λ(b-a) é grande.
+
+def caudas_Rh(u, betah, etah, lambd, n=N_NOS, k=8):
+    """Caudas J0(u) e J1(u) de Rh amortecida por e^{-λ(v-u)} em todos os pontos u de cada linha"""
+    m = u.shape[1]
+    # Além de L o integrando fica abaixo de e^{-40} e é desprezado
+    L = etah * 40.0 ** (1 / betah)
+    L = np.where(lambd > 0, np.minimum(L, 40 / np.where(lambd > 0, lambd, 1)), L)
+    cauda = u.max(axis=-1, keepdims=True) + L[:, None] * np.arange(1, n + 1) / n
+    pontos = np.concatenate([u, cauda], axis=-1)
+    ordem = np.argsort(pontos, axis=-1)
+    v0 = np.take_along_axis(pontos, ordem, axis=-1)
+
+    # Integral de cada segmento entre pontos consecutivos, com k nós
+    t, p = nos_gauss_legendre(k)
+    a, b = v0[:, :-1, None], v0[:, 1:, None]
+    meia = (b - a) / 2
+    v = a + meia * (t + 1)
+    g = meia * p * Rh(v, betah[:, None, None], etah[:, None, None]) * np.exp(-lambd[:, None, None] * (v - a))
+    seg0, seg1 = g.sum(axis=-1), (g * v).sum(axis=-1)
+    decai = np.exp(-lambd[:, None] * (v0[:, 1:] - v0[:, :-1]))
+
+    J0 = np.zeros_like(v0)
+    J1 = np.zeros_like(v0)
+    for j in range(v0.shape[1] - 2, -1, -1):
+        J0[:, j] = seg0[:, j] + decai[:, j] * J0[:, j + 1]
+        J1[:, j] = seg1[:, j] + decai[:, j] * J1[:, j + 1]
+    np.put_along_axis(J0, ordem, J0.copy(), axis=-1)
+    np.put_along_axis(J1, ordem, J1.copy(), axis=-1)
+    return J0[:, :m], J1[:, :m]
+
+@instrumentado
+def integrais_base_lote(Q, S, T, betax,  etax, betah, etah, lambd, n=N_NOS):
+    """Integrais de base (P, A, L) de um lote de políticas pelo caminho reduzido; arrays (lote, 12)"""
+    Q, S, T, betax, etax, betah, etah, lambd = np.broadcast_arrays(
+        *(np.atleast_1d(np.asarray(v, dtype=float)) for v in (Q, S, T, betax, etax, betah, etah, lambd)))
+    Q_, S_, T_, bx, ex, bh, eh, lb = (v[:, None] for v in (Q, S, T, betax, etax, betah, etah, lambd))
+    P = np.zeros(Q.shape + (12,))
+    A = np.zeros_like(P)
+    L = np.zeros_like(P)
+
+    # Os três trechos de x: [S, T], [Q, S] e [0, Q]
+    # (pesos com fx já incluída, sem a singularidade de fx em 0 quando betax < 1)
+    x_ST, f_ST = regra_weibull(S, T, betax, etax, n)
+    x_QS, f_QS = regra_weibull(Q, S, betax, etax, n)
+    x_0Q, f_0Q = regra_weibull(np.zeros_like(Q), Q, betax, etax, n)
+
+    # Cenários 1 a 5 (já unidimensionais)
+    P[:, 0] = Rx(T, betax, etax) * Rw(T - S, lambd)
+    P[:, 1] = np.sum(f_ST * Rh(T_ - x_ST, bh, eh), axis=-1) * Rw(T - S, lambd)
+    g = f_QS * Rh(T_ - x_QS, bh, eh) * Rw(T_ - x_QS, lb)
+    P[:, 2] = np.sum(g, axis=-1)
+    A[:, 2] = np.sum(g * (x_QS - Q_), axis=-1)
+    P[:, 3] = np.sum(f_0Q * Rh(T_ - x_0Q, bh, eh), axis=-1) * Rw(T - Q, lambd)
+    w, p = regra1(np.zeros_like(S), T - S, n)
+    g = p * fw(w, lb) * Rx(S_ + w, bx, ex)
+    P[:, 4] = np.sum(g, axis=-1)
+    L[:, 4] = np.sum(g * (S_ + w), axis=-1)
+
+    # Caudas em T - x (três trechos), em Q - x (trecho [0, Q]) e em 0
+    J0, J1 = caudas_Rh(np.concatenate([T_ - x_ST, T_ - x_QS, T_ - x_0Q, Q_ - x_0Q, np.zeros_like(Q_)], axis=-1),
+                       betah, etah, lambd, n)
+    J0_ST, J0_QS, J0_0Q, J0_Q, J0_zero = np.split(J0, [n, 2 * n, 3 * n, 4 * n], axis=-1)
+    J1_ST, J1_QS, J1_0Q, J1_Q, J1_zero = np.split(J1, [n, 2 * n, 3 * n, 4 * n], axis=-1)
+
+    def internas(a, b, J0a, J1a, J0b, J1b):
+        """D0, D1 e as integrais em fh (via Rh) no intervalo [a, b]"""
+        E = Rw(b - a, lb)
+        D0 = J0a - E * J0b
+        D1 = J1a - E * J1b
+        G0 = Rh(a, bh, eh) - E * Rh(b, bh, eh) - lb * D0
+        G1 = a * Rh(a, bh, eh) - E * b * Rh(b, bh, eh) + D0 - lb * D1
+        return D0, D1, G0, G1
+
+    # Trecho [S, T]: cenários 6 e 9
+    D0, D1, G0, G1 = internas(0, T_ - x_ST, J0_zero, J1_zero, J0_ST, J1_ST)
+    E = Rw(x_ST - S_, lb)
+    P[:, 5] = np.sum(f_ST * lb * E * D0, axis=-1)
+    L[:, 5] = np.sum(f_ST * lb * E * (x_ST * D0 + D1), axis=-1)
+    P[:, 8] = np.sum(f_ST * E * G0, axis=-1)
+    L[:, 8] = np.sum(f_ST * E * (x_ST * G0 + G1), axis=-1)
+
+    # Trecho [Q, S]: cenários 7 e 10
+    D0, D1, G0, G1 = internas(0, T_ - x_QS, J0_zero, J1_zero, J0_QS, J1_QS)
+    P[:, 6] = np.sum(f_QS * lb * D0, axis=-1)
+    A[:, 6] = np.sum(f_QS * lb * (x_QS - Q_) * D0, axis=-1)
+    L[:, 6] = np.sum(f_QS * lb * (x_QS * D0 + D1), axis=-1)
+    P[:, 9] = np.sum(f_QS * G0, axis=-1)
+    A[:, 9] = np.sum(f_QS * (x_QS - Q_) * G0, axis=-1)
+    L[:, 9] = np.sum(f_QS * (x_QS * G0 + G1), axis=-1)
+
+    # Trecho [0, Q]: cenários 8, 11 e 12
+    D0, D1, G0, G1 = internas(Q_ - x_0Q, T_ - x_0Q, J0_Q, J1_Q, J0_0Q, J1_0Q)
+    P[:, 7] = np.sum(f_0Q * lb * D0, axis=-1)
+    L[:, 7] = np.sum(f_0Q * lb * (x_0Q * D0 + D1), axis=-1)
+    P[:, 10] = np.sum(f_0Q * G0, axis=-1)
+    L[:, 10] = np.sum(f_0Q * (x_0Q * G0 + G1), axis=-1)
+    u = Q_ - x_0Q
+    media_parcial_h = eh * gamma(1 + 1 / bh) * gammainc(1 + 1 / bh, (u / eh) ** bh)
+    P[:, 11] = np.sum(f_0Q * Fh(u, bh, eh), axis=-1)
+    L[:, 11] = np.sum(f_0Q * (x_0Q * Fh(u, bh, eh) + media_parcial_h), axis=-1)
+
+    # Termos de inspeção (S - Q) e duração T dos cenários com probabilidade já pronta
+    A[:, [0, 1, 4, 5, 8]] = (S - Q)[:, None] * P[:, [0, 1, 4, 5, 8]]
+    L[:, :4] = T[:, None] * P[:, :4]
+    return P, A, L
+
+# =============================================================================
+# DERIVADAS DAS INTEGRAIS DE BASE EM RELAÇÃO A (Q, S, T)
+# =============================================================================
+# Regra de Leibniz aplicada às formas reduzidas acima: cada derivada é a soma dos
+# termos de fronteira (integrando avaliado no limite que se move) com a integral
+# da derivada do integrando. Com
+#   ∂D/∂b = Rh(b) e^{-λ(b-a)},  ∂D/∂a = -Rh(a) + λD   (e o análogo para K = ∫ fh e^{-λ(h-a)}),
+# sobram poucas integrais unidimensionais novas (de fx·Rh e fx·fh), calculadas
+# com os mesmos nós de Gauss–Legendre. A soma das derivadas das probabilidades é nula.
+
+def densidade_limite(t, beta, eta):
+    """Densidade da Weibull num limite de integração, com 0 no lugar do infinito de t = 0 quando β < 1.
+
+    Nas derivadas, os termos de fronteira em fx(Q), fx(S) e fx(T) só transferem
+    probabilidade entre cenários de mesmos custos e durações (3↔4, 7↔8 e 10↔11 em Q;
+    2↔3, 6↔7 e 9↔10 em S; 1↔2 em T) ou vêm multiplicados por S - Q = 0: em EC e EL
+    eles se cancelam. Em t = 0 com β < 1 cada um é infinito (a derivada de cada
+    cenário não existe ali) e eles são omitidos, para que EC e EL fiquem finitas.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        f = fx(t, beta, eta)
+    return np.where(np.isfinite(f), f, 0.0)
+
+def convolucao_lote(a, b, c, betax, etax, betah, etah, funcoes, n=N_NOS):
+    """∫_a^b fx(x) fh(c - x) g(x) dx para cada g de `funcoes`, com 0 <= a <= b <= c; arrays (lote,).
+
+    Com β < 1, fx é singular em x = 0 e fh em c - x = 0, possivelmente nos dois
+    extremos. O intervalo é dividido ao meio e cada metade é integrada na variável
+    cuja densidade pode ser singular nela (x na primeira, h = c - x na segunda), com
+    os pesos de regra_weibull; a outra densidade fica longe do seu zero.
+    """
+    c_ = c[:, None]
+    m = (a + b) / 2
+    minimo = np.finfo(float).tiny
+    x1, p1 = regra_weibull(a, m, betax, etax, n)
+    v1 = p1 * fh(np.maximum(c_ - x1, minimo), betah[:, None], etah[:, None])
+    h2, p2 = regra_weibull(c - b, c - m, betah, etah, n)
+    x2 = c_ - h2
+    v2 = p2 * fx(np.maximum(x2, minimo), betax[:, None], etax[:, None])
+    return [np.sum(v1 * g(x1), axis=-1) + np.sum(v2 * g(x2), axis=-1) for g in funcoes]
+
+def integrais_base_derivadas_lote(Q, S, T, betax,  etax, betah, etah, lambd, n=N_NOS):
+    """Integrais de base (P, A, L), arrays (lote, 12), e suas derivadas, arrays (lote, 3, 12) na ordem (Q, S, T)"""
+    P, A, L = integrais_base_lote(Q, S, T, betax, etax, betah, etah, lambd, n)
+    Q, S, T, betax, etax, betah, etah, lambd = np.broadcast_arrays(
+        *(np.atleast_1d(np.asarray(v, dtype=float)) for v in (Q, S, T, betax, etax, betah, etah, lambd)))
+    Q_, S_, T_, bx, ex, bh, eh, lb = (v[:, None] for v in (Q, S, T, betax, etax, betah, etah, lambd))
+    dP = np.zeros(Q.shape + (3, 12))
+    dA = np.zeros_like(dP)
+    dL = np.zeros_like(dP)
+
+    # Densidade de X e exponenciais de W nos limites
+    fQ, fS, fT = (densidade_limite(v, betax, etax) for v in (Q, S, T))
+    E_TS, E_TQ = Rw(T - S, lambd), Rw(T - Q, lambd)
+    Rh_TS, Rh_TQ = Rh(T - S, betah, etah), Rh(T - Q, betah, etah)
+
+    # D e K no intervalo [0, b], com b = T - S e b = T - Q
+    # (uma grade uniforme em [0, T] garante a resolução da recorrência entre esses pontos)
+    grade = T_ * np.linspace(0, 1, n)
+    J0, J1 = caudas_Rh(np.concatenate([np.stack([np.zeros_like(Q), T - S, T - Q], axis=-1), grade], axis=-1),
+                       betah, etah, lambd, n)
+    D0_S, D1_S = J0[:, 0] - E_TS * J0[:, 1], J1[:, 0] - E_TS * J1[:, 1]
+    D0_Q, D1_Q = J0[:, 0] - E_TQ * J0[:, 2], J1[:, 0] - E_TQ * J1[:, 2]
+    K0_S = 1 - E_TS * Rh_TS - lambd * D0_S
+    K1_S = -E_TS * (T - S) * Rh_TS + D0_S - lambd * D1_S
+    K0_Q = 1 - E_TQ * Rh_TQ - lambd * D0_Q
+    K1_Q = -E_TQ * (T - Q) * Rh_TQ + D0_Q - lambd * D1_Q
+
+    # Integrais unidimensionais novas: em x contra Rh e em h = (limite - x) contra fh
+    x, f = regra_weibull(np.zeros_like(Q), Q, betax, etax, n)
+    IQ = np.sum(f * Rh(Q_ - x, bh, eh), axis=-1)
+    # Convoluções de fx e fh, escritas em x = T - h (ou Q - h): F2 em [S, T], F3 em [Q, S], F4 e F5 em [0, Q]
+    um = lambda x: 1
+    F2, = convolucao_lote(S, T, T, betax, etax, betah, etah, [um], n)
+    F3, F3A = convolucao_lote(Q, S, T, betax, etax, betah, etah,
+                              [lambda x: Rw(T_ - x, lb), lambda x: Rw(T_ - x, lb) * (x - Q_)], n)
+    F4, = convolucao_lote(np.zeros_like(Q), Q, T, betax, etax, betah, etah, [um], n)
+    F5, = convolucao_lote(np.zeros_like(Q), Q, Q, betax, etax, betah, etah, [um], n)
+
+    # Cenários 1 a 4
+    dP[:, 1, 0] = lambd * P[:, 0]
+    dP[:, 2, 0] = -fT * E_TS - lambd * P[:, 0]
+    dP[:, 1, 1] = lambd * P[:, 1] - E_TS * fS * Rh_TS
+    dP[:, 2, 1] = -lambd * P[:, 1] + E_TS * (fT - F2)
+    dP[:, 0, 2] = -fQ * Rh_TQ * E_TQ
+    dP[:, 1, 2] = fS * Rh_TS * E_TS
+    dP[:, 2, 2] = -F3 - lambd * P[:, 2]
+    dA[:, 0, 2] = -P[:, 2]
+    dA[:, 1, 2] = (S - Q) * fS * Rh_TS * E_TS
+    dA[:, 2, 2] = -F3A - lambd * A[:, 2]
+    dP[:, 0, 3] = lambd * P[:, 3] + E_TQ * fQ * Rh_TQ
+    dP[:, 2, 3] = -lambd * P[:, 3] - E_TQ * F4
+
+    # Cenários 5 e 6
+    dP[:, 1, 4] = lambd * (P[:, 4] - Rx(S, betax, etax))
+    dP[:, 2, 4] = lambd * E_TS * Rx(T, betax, etax)
+    dL[:, 1, 4] = lambd * (L[:, 4] - S * Rx(S, betax, etax))
+    dL[:, 2, 4] = T * dP[:, 2, 4]
+    dP[:, 1, 5] = lambd * (P[:, 5] - fS * D0_S)
+    dP[:, 2, 5] = lambd * P[:, 1]
+    dL[:, 1, 5] = lambd * (L[:, 5] - fS * (S * D0_S + D1_S))
+    dL[:, 2, 5] = T * lambd * P[:, 1]
+
+    # Cenários 7 e 8
+    dP[:, 0, 6] = -fQ * lambd * D0_Q
+    dP[:, 1, 6] = fS * lambd * D0_S
+    dP[:, 2, 6] = lambd * P[:, 2]
+    dA[:, 0, 6] = -P[:, 6]
+    dA[:, 1, 6] = (S - Q) * dP[:, 1, 6]
+    dA[:, 2, 6] = lambd * A[:, 2]
+    dL[:, 0, 6] = -fQ * lambd * (Q * D0_Q + D1_Q)
+    dL[:, 1, 6] = fS * lambd * (S * D0_S + D1_S)
+    dL[:, 2, 6] = T * lambd * P[:, 2]
+    dP[:, 0, 7] = lambd * (fQ * D0_Q - IQ + P[:, 7])
+    dP[:, 2, 7] = lambd * P[:, 3]
+    dL[:, 0, 7] = lambd * (fQ * (Q * D0_Q + D1_Q) - Q * IQ + L[:, 7])
+    dL[:, 2, 7] = T * lambd * P[:, 3]
+
+    # Cenários 9 a 12 (falha)
+    dP[:, 1, 8] = lambd * P[:, 8] - fS * K0_S
+    dP[:, 2, 8] = E_TS * F2
+    dL[:, 1, 8] = lambd * L[:, 8] - fS * (S * K0_S + K1_S)
+    dL[:, 2, 8] = T * E_TS * F2
+    dP[:, 0, 9] = -fQ * K0_Q
+    dP[:, 1, 9] = fS * K0_S
+    dP[:, 2, 9] = F3
+    dA[:, 0, 9] = -P[:, 9]
+    dA[:, 1, 9] = (S - Q) * fS * K0_S
+    dA[:, 2, 9] = F3A
+    dL[:, 0, 9] = -fQ * (Q * K0_Q + K1_Q)
+    dL[:, 1, 9] = fS * (S * K0_S + K1_S)
+    dL[:, 2, 9] = T * F3
+    dP[:, 0, 10] = fQ * K0_Q - F5 + lambd * P[:, 10]
+    dP[:, 2, 10] = E_TQ * F4
+    dL[:, 0, 10] = fQ * (Q * K0_Q + K1_Q) - Q * F5 + lambd * L[:, 10]
+    dL[:, 2, 10] = T * E_TQ * F4
+    dP[:, 0, 11] = F5
+    dL[:, 0, 11] = Q * F5
+
+    # Termos (S - Q)·P e T·P dos cenários com fator fora da integral
+    for k in (0, 1, 4, 5, 8):
+        dA[:, :, k] = (S - Q)[:, None] * dP[:, :, k]
+        dA[:, 0, k] -= P[:, k]
+        dA[:, 1, k] += P[:, k]
+    for k in range(4):
+        dL[:, :, k] = T[:, None] * dP[:, :, k]
+        dL[:, 2, k] += P[:, k]
+    return P, A, L, dP, dA, dL
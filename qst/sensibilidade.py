@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+"""
+Análise de sensibilidade da política a imprecisões nos parâmetros do modelo.
+"""
+
+import os
+
+import numpy as np
+
+from .avaliacao import avaliar_politica, avaliar_lote
+
+# =============================================================================
+# FUNÇÃO DA ANÁLISE DE SENSIBILIDADE (com MTBOF incluído)
+# =============================================================================
+def analise_sensibilidade(Q, S, T, parametros_base, n_simulacoes, variacoes_parametros=None, parametros_alvo=None):
+    import pandas as pd  # sob demanda: carregar o pacote não exige o pandas
+
+    if parametros_alvo is None:
+        parametros_alvo = list(parametros_base.keys())
+
+    if variacoes_parametros is None:
+        variacoes_parametros = {param: 0.1 for param in parametros_alvo}
+
+    resultados = []
+    parametros_iniciais = {param: parametros_base[param] for param in parametros_alvo}
+    parametros_finais = {param: [] for param in parametros_alvo}
+
+    for _ in range(n_simulacoes):
+        parametros_simulados = parametros_base.copy()
+        for param in parametros_alvo:
+            variacao = variacoes_parametros.get(param, 0.1)
+            perturbacao = np.random.uniform(1 - variacao, 1 + variacao)
+            parametros_simulados[param] *= perturbacao
+            parametros_finais[param].append(parametros_simulados[param])
+
+        resultado = avaliar_politica(Q, S, T, parametros_simulados)
+
+        resultados.append({'Custo': resultado.taxa_custo, 'MTBOF': resultado.MTBOF})
+
+    df_resultados = pd.DataFrame(resultados)
+    estatisticas = df_resultados.agg(['mean', 'std']).T
+    estatisticas.columns = ['Média', 'Desvio Padrão']
+
+    parametros_finais = {param: np.mean(valores) for param, valores in parametros_finais.items()}
+
+    return df_resultados, estatisticas, parametros_iniciais, parametros_finais
+
+# =============================================================================
+# ANÁLISE DE SENSIBILIDADE EM LOTE (com parada adaptativa)
+# =============================================================================
+def sortear_perturbacoes(n, variacoes, amostragem='uniforme', seed=None):
+    """Fatores multiplicativos (n, parâmetros) em [1 - v, 1 + v], sorteados todos de uma vez.
+
+    amostragem: 'uniforme' (Monte Carlo), 'sobol' (quasi-Monte Carlo embaralhado)
+    ou 'lhs' (hipercubo latino).
+    """
+    from scipy.stats import qmc
+
+    d = len(variacoes)
+    if amostragem == 'uniforme':
+        u = np.random.default_rng(seed).uniform(size=(n, d))
+    elif amostragem == 'sobol':
+        # Sobol é balanceado em potências de 2; sorteia a próxima e usa o prefixo
+        u = qmc.Sobol(d, seed=seed).random_base2(int(np.ceil(np.log2(max(n, 1)))))[:n]
+    elif amostragem == 'lhs':
+        u = qmc.LatinHypercube(d, seed=seed).random(n)
+    else:
+        raise ValueError(f"Amostragem desconhecida: {amostragem}")
+    v = np.asarray(variacoes, dtype=float)
+    return 1 - v + 2 * v * u
+
+def analise_sensibilidade_lote(Q, S, T, parametros_base, n_max, variacoes_parametros=None, parametros_alvo=None,
+                               amostragem='uniforme', tamanho_lote=1024, largura_ic=None, confianca=0.95,
+                               workers=1, seed=None, callback=None):
+    """Análise de sensibilidade vetorizada, com as mesmas saídas de analise_sensibilidade.
+
+    As perturbações são sorteadas de uma vez e avaliadas em lotes (em paralelo se
+    workers > 1) pelo caminho reduzido. Se largura_ic for dado, a análise para assim
+    que o intervalo de confiança da média da taxa de custo e do MTBOF tiver largura
+    relativa (largura / |média|) menor ou igual a largura_ic. callback, se dado, recebe o
+    número de amostras avaliadas ao fim de cada rodada; se devolver True, a análise para
+    com as amostras já avaliadas.
+    """
+    import pandas as pd  # sob demanda: carregar o pacote não exige o pandas
+    from concurrent.futures import ProcessPoolExecutor
+    from scipy.stats import norm
+
+    if parametros_alvo is None:
+        parametros_alvo = list(parametros_base.keys())
+
+    if variacoes_parametros is None:
+        variacoes_parametros = {param: 0.1 for param in parametros_alvo}
+
+    fatores = sortear_perturbacoes(n_max, [variacoes_parametros.get(p, 0.1) for p in parametros_alvo], amostragem, seed)
+    lotes = []
+    for inicio in range(0, n_max, tamanho_lote):
+        parametros_lote = {p: np.full(min(tamanho_lote, n_max - inicio), float(v)) for p, v in parametros_base.items()}
+        for j, p in enumerate(parametros_alvo):
+            parametros_lote[p] = parametros_lote[p] * fatores[inicio:inicio + tamanho_lote, j]
+        lotes.append(parametros_lote)
+
+    z = norm.ppf(0.5 + confianca / 2)
+    custos, mtbofs = [], []
+    n_processos = os.cpu_count() if workers == -1 else workers
+    executor = ProcessPoolExecutor(max_workers=n_processos) if n_processos > 1 else None
+    try:
+        # Em paralelo, cada rodada avalia um lote por processo antes de testar a parada
+        passo = n_processos if executor else 1
+        for r in range(0, len(lotes), passo):
+            rodada = lotes[r:r + passo]
+            if executor:
+                avaliados = executor.map(avaliar_lote, [Q] * len(rodada), [S] * len(rodada), [T] * len(rodada), rodada)
+            else:
+                avaliados = (avaliar_lote(Q, S, T, parametros_lote) for parametros_lote in rodada)
+            for custo, mtbof in avaliados:
+                custos.append(custo)
+                mtbofs.append(mtbof)
+            n = sum(len(c) for c in custos)
+            if callback is not None and callback(n):
+                break
+            if largura_ic is not None:
+                if n > 1 and all(2 * z * np.std(np.concatenate(v), ddof=1) / np.sqrt(n)
+                                 <= largura_ic * abs(np.mean(np.concatenate(v))) for v in (custos, mtbofs)):
+                    break
+    finally:
+        if executor:
+            executor.shutdown(cancel_futures=True)
+
+    df_resultados = pd.DataFrame({'Custo': np.concatenate(custos), 'MTBOF': np.concatenate(mtbofs)})
+    n = len(df_resultados)
+    estatisticas = df_resultados.agg(['mean', 'std']).T
+    estatisticas.columns = ['Média', 'Desvio Padrão']
+    for q in (0.05, 0.25, 0.5, 0.75, 0.95):
+        estatisticas[f'Quantil {q:.0%}'] = df_resultados.quantile(q)
+    meia_largura = z * estatisticas['Desvio Padrão'] / np.sqrt(n)
+    estatisticas['IC inferior'] = estatisticas['Média'] - meia_largura
+    estatisticas['IC superior'] = estatisticas['Média'] + meia_largura
+
+    parametros_iniciais = {param: parametros_base[param] for param in parametros_alvo}
+    parametros_finais = {p: parametros_base[p] * np.mean(fatores[:n, j]) for j, p in enumerate(parametros_alvo)}
+
+    return df_resultados, estatisticas, parametros_iniciais, parametros_finais
+
+# =============================================================================
+# VARREDURA UM PARÂMETRO DE CADA VEZ (TORNADO E ELASTICIDADES)
+# =============================================================================
+# Colunas da tabela do tornado (também quando nenhum parâmetro varia)
+COLUNAS_TORNADO = [f'{prefixo}{medida}{sufixo}' for medida in ('Custo', 'MTBOF')
+                   for prefixo, sufixo in (('', ' no mínimo'), ('', ' no máximo'), ('Amplitude ', ''), ('Elasticidade ', ''))]
+
+def pontos_varredura(parametros_base, variacoes_parametros, parametros_alvo=None, n_pontos=5, passo_elasticidade=0.01):
+    """Parâmetros (arrays) de todos os pontos da varredura e a tabela que os descreve.
+
+    Cada parâmetro alvo percorre n_pontos fatores igualmente espaçados em [1 - v, 1 + v]
+    com os demais no valor base; somam-se o ponto base e, por parâmetro, os fatores
+    1 ± passo_elasticidade da derivada central usada nas elasticidades.
+    """
+    import pandas as pd  # sob demanda: carregar o pacote não exige o pandas
+
+    if parametros_alvo is None:
+        parametros_alvo = list(parametros_base.keys())
+    linhas = [(None, 'base', 1.0)]
+    for p in parametros_alvo:
+        v = variacoes_parametros.get(p, 0.1)
+        if v <= 0:
+            continue
+        linhas += [(p, 'varredura', float(f)) for f in np.linspace(1 - v, 1 + v, n_pontos)]
+        linhas += [(p, 'elasticidade', 1 - passo_elasticidade), (p, 'elasticidade', 1 + passo_elasticidade)]
+    linhas = [(p, tipo, f, parametros_base[p] * f if p is not None else np.nan) for p, tipo, f in linhas]
+    pontos = pd.DataFrame(linhas, columns=['parametro', 'tipo', 'fator', 'valor'])
+    parametros_lote = {p: np.where(pontos['parametro'] == p, pontos['valor'], float(valor))
+                       for p, valor in parametros_base.items()}
+    return parametros_lote, pontos
+
+def varredura_uma_a_uma(Q, S, T, parametros_base, variacoes_parametros, parametros_alvo=None, n_pontos=5,
+                        passo_elasticidade=0.01, workers=1):
+    """Sensibilidade determinística: cada parâmetro varia sozinho na sua faixa de imprecisão.
+
+    Todos os pontos (base, grades de cada parâmetro e pontos das elasticidades, cerca
+    de n_pontos + 2 por parâmetro) são avaliados num só lote pelo caminho reduzido,
+    dividido entre processos se workers > 1 (-1 = todos os núcleos).
+    Devolve (pontos, tornado):
+      pontos: parâmetro, fator, valor, Custo e MTBOF de cada ponto da varredura;
+      tornado: por parâmetro, Custo e MTBOF nos extremos da faixa (fator mínimo e
+      máximo), a amplitude entre o menor e o maior valor da grade e a elasticidade
+      no ponto base (d ln f / d ln p), em ordem decrescente de amplitude do custo;
+      vazio (com as mesmas colunas) se nenhum parâmetro alvo tiver variação positiva.
+    """
+    import pandas as pd  # sob demanda: carregar o pacote não exige o pandas
+    from concurrent.futures import ProcessPoolExecutor
+
+    parametros_lote, pontos = pontos_varredura(parametros_base, variacoes_parametros, parametros_alvo, n_pontos,
+                                               passo_elasticidade)
+    n_processos = os.cpu_count() if workers == -1 else workers
+    n = len(pontos)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if n_processos > 1 and n > 1:
+            partes = [indices for indices in np.array_split(np.arange(n), n_processos) if len(indices)]
+            with ProcessPoolExecutor(max_workers=len(partes)) as executor:
+                avaliados = list(executor.map(avaliar_lote, [Q] * len(partes), [S] * len(partes), [T] * len(partes),
+                                              [{p: v[i] for p, v in parametros_lote.items()} for i in partes]))
+            custo, mtbof = (np.concatenate(r) for r in zip(*avaliados))
+        else:
+            custo, mtbof = avaliar_lote(np.full(n, Q, dtype=float), np.full(n, S, dtype=float),
+                                        np.full(n, T, dtype=float), parametros_lote)
+    pontos['Custo'], pontos['MTBOF'] = custo, mtbof
+
+    base = pontos.iloc[0]
+    linhas = {}
+    for p, grupo in pontos[pontos['tipo'] != 'base'].groupby('parametro', sort=False):
+        grade = grupo[grupo['tipo'] == 'varredura']
+        baixo, alto = grupo[grupo['tipo'] == 'elasticidade'].sort_values('fator').iloc[[0, -1]].itertuples()
+        linha = {}
+        for medida in ('Custo', 'MTBOF'):
+            with np.errstate(divide='ignore', invalid='ignore'):
+                elasticidade = (getattr(alto, medida) - getattr(baixo, medida)) / (2 * passo_elasticidade * base[medida])
+            linha.update({f'{medida} no mínimo': grade[medida].iloc[0], f'{medida} no máximo': grade[medida].iloc[-1],
+                          f'Amplitude {medida}': grade[medida].max() - grade[medida].min(),
+                          f'Elasticidade {medida}': elasticidade})
+        linhas[p] = linha
+    tornado = pd.DataFrame.from_dict(linhas, orient='index', columns=COLUNAS_TORNADO)
+    tornado = tornado.sort_values('Amplitude Custo', ascending=False)
+    tornado.attrs['base'] = {'Custo': float(base['Custo']), 'MTBOF': float(base['MTBOF'])}
+    return pontos[pontos['tipo'] == 'varredura'].drop(columns='tipo').reset_index(drop=True), tornado
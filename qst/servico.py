@@ -0,0 +1,375 @@
+# -*- coding: utf-8 -*-
+"""
+Serviço HTTP/JSON local (127.0.0.1) de avaliação, otimização e análise de
+sensibilidade, com agrupamento de pedidos concorrentes em lotes e um pool de
+processos aquecido.
+
+Uso pela linha de comando:
+    python -m qst.servico --porta 8765 --workers 4
+    python -m qst.servico --teste-carga --porta 8765 --requisicoes 2000 --concorrencia 32
+"""
+
+import argparse
+import json
+import math
+import os
+import queue
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from .avaliacao import PARAMETROS, avaliar_lote, avaliar_politica, validar_parametros
+from .cache import CacheResultados, OTIMIZADORES, chave_otimizacao
+from .sensibilidade import analise_sensibilidade_lote
+
+HOST = '127.0.0.1'
+
+# =============================================================================
+# FUNÇÕES EXECUTADAS NOS PROCESSOS DO POOL
+# =============================================================================
+def _aquecer():
+    # Primeira avaliação do processo: importações e tabelas de quadratura ficam prontas
+    avaliar_lote(1.0, 2.0, 3.0, dict(zip(PARAMETROS, (3, 5, 2, 1, 2, 0.05, 0.8, 1, 10, 0.01, 0.1))))
+
+def avaliar_grupo(Q, S, T, parametros, metodo='reduzido'):
+    """Taxa de custo e MTBOF de um lote cujas políticas podem ter parâmetros diferentes (arrays por política)"""
+    if metodo == 'reduzido':
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return avaliar_lote(Q, S, T, parametros)
+    resultados = [avaliar_politica(Q[i], S[i], T[i], {p: parametros[p][i] for p in PARAMETROS}, metodo=metodo)
+                  for i in range(len(Q))]
+    return np.array([r.taxa_custo for r in resultados]), np.array([r.MTBOF for r in resultados])
+
+def otimizar_remoto(parametros, algoritmo, opcoes):
+    busca, otimo = OTIMIZADORES[algoritmo](parametros, **opcoes)
+    return dict(Q=otimo.Q, S=otimo.S, T=otimo.T, taxa_custo=otimo.taxa_custo, MTBOF=otimo.MTBOF,
+                x=list(busca.x), nfev=int(busca.nfev))
+
+def sensibilidade_remota(Q, S, T, parametros, n_max, opcoes):
+    df, estatisticas, _, _ = analise_sensibilidade_lote(Q, S, T, parametros, n_max, **opcoes)
+    return dict(n=len(df), estatisticas=estatisticas.to_dict(orient='index'))
+
+def _json(valor):
+    # NaN e infinito (MTBOF sem falhas) não existem em JSON estrito: viram null
+    if isinstance(valor, dict):
+        return {str(k): _json(v) for k, v in valor.items()}
+    if isinstance(valor, (list, tuple, np.ndarray)):
+        return [_json(v) for v in valor]
+    if isinstance(valor, (float, np.floating)):
+        return float(valor) if math.isfinite(valor) else None
+    if isinstance(valor, np.integer):
+        return int(valor)
+    return valor
+
+# =============================================================================
+# MÉTRICAS
+# =============================================================================
+class Metricas:
+    """Contagens, erros e latências (janela das últimas `janela` requisições) por rota, e tamanho dos lotes"""
+
+    def __init__(self, janela=10000):
+        self.trava = threading.Lock()
+        self.inicio = time.time()
+        self.latencias = defaultdict(lambda: deque(maxlen=janela))
+        self.contagens = defaultdict(int)
+        self.erros = defaultdict(int)
+        self.lotes = 0
+        self.politicas_em_lotes = 0
+        self.maior_lote = 0
+
+    def registrar(self, rota, latencia, erro=False):
+        with self.trava:
+            self.latencias[rota].append(latencia)
+            self.contagens[rota] += 1
+            self.erros[rota] += erro
+
+    def registrar_lote(self, tamanho):
+        with self.trava:
+            self.lotes += 1
+            self.politicas_em_lotes += tamanho
+            self.maior_lote = max(self.maior_lote, tamanho)
+
+    def como_dict(self):
+        with self.trava:
+            rotas = {}
+            for rota, amostra in self.latencias.items():
+                ms = 1e3 * np.array(amostra)
+                rotas[rota] = dict(requisicoes=self.contagens[rota], erros=self.erros[rota],
+                                   **{f'latencia_p{q}_ms': float(np.percentile(ms, q)) for q in (50, 95, 99)},
+                                   latencia_max_ms=float(ms.max()))
+            return dict(ativo_s=time.time() - self.inicio, rotas=rotas, lotes=self.lotes,
+                        politicas_por_lote=self.politicas_em_lotes / self.lotes if self.lotes else 0.0,
+                        maior_lote=self.maior_lote)
+
+# =============================================================================
+# AGRUPAMENTO DE PEDIDOS DE AVALIAÇÃO
+# =============================================================================
+# Pedidos pequenos que chegam juntos (de requisições concorrentes) são reunidos
+# por até `espera` segundos ou `lote_max` políticas e avaliados numa só chamada
+# em lote num processo do pool: avaliar_lote aceita parâmetros diferentes por
+# política, então pedidos de componentes diferentes entram no mesmo lote.
+class Agrupador:
+    """Junta pedidos de avaliação concorrentes em lotes e os despacha ao pool de processos"""
+
+    def __init__(self, executor, metricas, lote_max=4096, espera=0.002, max_lotes_em_voo=None):
+        self.executor = executor
+        self.metricas = metricas
+        self.lote_max = lote_max
+        self.espera = espera
+        self.fila = queue.Queue()
+        self.politicas_na_fila = 0
+        self.trava = threading.Lock()
+        # Lotes em voo limitados ao número de processos: o excesso espera na fila e cresce o próximo lote
+        self.em_voo = threading.BoundedSemaphore(max_lotes_em_voo or executor._max_workers)
+        threading.Thread(target=self._despachar, daemon=True).start()
+
+    def avaliar(self, parametros, Q, S, T, metodo='reduzido'):
+        """Future com (taxa de custo, MTBOF) das políticas Q, S, T (arrays) com os parâmetros dados"""
+        futuro = Future()
+        with self.trava:
+            self.politicas_na_fila += len(Q)
+        self.fila.put((parametros, Q, S, T, metodo, futuro))
+        return futuro
+
+    def _coletar(self):
+        pedidos = [self.fila.get()]
+        tamanho = len(pedidos[0][1])
+        limite = time.monotonic() + self.espera
+        while tamanho < self.lote_max:
+            restante = limite - time.monotonic()
+            try:
+                pedido = self.fila.get(timeout=restante) if restante > 0 else self.fila.get_nowait()
+            except queue.Empty:
+                break
+            pedidos.append(pedido)
+            tamanho += len(pedido[1])
+        with self.trava:
+            self.politicas_na_fila -= tamanho
+        return pedidos
+
+    def _despachar(self):
+        while True:
+            self.em_voo.acquire()
+            pedidos = self._coletar()
+            por_metodo = defaultdict(list)
+            for pedido in pedidos:
+                por_metodo[pedido[4]].append(pedido)
+            self.em_voo.release()
+            for metodo, grupo in por_metodo.items():
+                self.em_voo.acquire()
+                tamanhos = [len(p[1]) for p in grupo]
+                Q, S, T = (np.concatenate([p[i] for p in grupo]) for i in (1, 2, 3))
+                parametros = {k: np.concatenate([np.full(n, p[0][k], dtype=float) for p, n in zip(grupo, tamanhos)])
+                              for k in PARAMETROS}
+                self.metricas.registrar_lote(len(Q))
+                lote = self.executor.submit(avaliar_grupo, Q, S, T, parametros, metodo)
+                lote.add_done_callback(lambda lote, grupo=grupo, tamanhos=tamanhos: self._entregar(lote, grupo, tamanhos))
+
+    def _entregar(self, lote, grupo, tamanhos):
+        self.em_voo.release()
+        try:
+            taxa, mtbof = lote.result()
+        except Exception as erro:
+            for pedido in grupo:
+                pedido[5].set_exception(erro)
+            return
+        fim = np.cumsum(tamanhos)
+        for pedido, a, b in zip(grupo, fim - tamanhos, fim):
+            pedido[5].set_result((taxa[a:b], mtbof[a:b]))
+
+# =============================================================================
+# SERVIÇO
+# =============================================================================
+def validar_politicas(politicas):
+    """Array (n, 3) de políticas [Q, S, T]; ValueError se vazio, não finito ou fora de 0 <= Q <= S <= T"""
+    politicas = np.atleast_2d(np.asarray(politicas, dtype=float))
+    if politicas.ndim != 2 or politicas.shape[1] != 3 or len(politicas) == 0:
+        raise ValueError("politicas deve ser uma lista não vazia de [Q, S, T]")
+    Q, S, T = politicas.T
+    invalidas = ~(np.isfinite(politicas).all(axis=1) & (0 <= Q) & (Q <= S) & (S <= T))
+    if invalidas.any():
+        i = int(np.argmax(invalidas))
+        raise ValueError(f"política {i} = {politicas[i].tolist()}: exige valores finitos com 0 <= Q <= S <= T")
+    return politicas
+
+class ServicoQST:
+    """Pool aquecido, agrupador e cache das rotas do serviço"""
+
+    def __init__(self, workers=None, lote_max=4096, espera=0.002):
+        self.workers = workers or os.cpu_count()
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_aquecer)
+        # Aquece todos os processos antes de aceitar requisições
+        for futuro in [self.executor.submit(time.sleep, 0.05) for _ in range(self.workers)]:
+            futuro.result()
+        self.metricas = Metricas()
+        self.agrupador = Agrupador(self.executor, self.metricas, lote_max, espera)
+        self.cache = CacheResultados(capacidade=4096)
+        self.tarefas_longas = 0
+        self.trava = threading.Lock()
+
+    def avaliar(self, corpo):
+        parametros = validar_parametros(corpo['parametros'])
+        politicas = validar_politicas(corpo['politicas'] if 'politicas' in corpo
+                                      else [[corpo['Q'], corpo['S'], corpo['T']]])
+        metodo = corpo.get('metodo', 'reduzido')
+        if metodo not in ('reduzido', 'compilado', 'quad'):
+            raise ValueError(f"metodo desconhecido: {metodo}")
+        taxa, mtbof = self.agrupador.avaliar(parametros, *politicas.T.copy(), metodo=metodo).result()
+        return dict(taxa_custo=taxa, MTBOF=mtbof)
+
+    def _longa(self, funcao, *args):
+        with self.trava:
+            self.tarefas_longas += 1
+        try:
+            return self.executor.submit(funcao, *args).result()
+        finally:
+            with self.trava:
+                self.tarefas_longas -= 1
+
+    def otimizar(self, corpo):
+        parametros = validar_parametros(corpo['parametros'])
+        algoritmo = corpo.get('algoritmo', 'de')
+        if algoritmo not in OTIMIZADORES:
+            raise ValueError(f"algoritmo desconhecido: {algoritmo}")
+        opcoes = dict(corpo.get('opcoes', {}))
+        if algoritmo == 'de':
+            opcoes.setdefault('vetorizado', True)
+        k = chave_otimizacao(parametros, algoritmo, **opcoes)
+        resultado = self.cache.obter(k)
+        if resultado is None:
+            resultado = self._longa(otimizar_remoto, parametros, algoritmo, opcoes)
+            self.cache.guardar(k, resultado)
+        return resultado
+
+    def sensibilidade(self, corpo):
+        parametros = validar_parametros(corpo['parametros'])
+        (Q, S, T), = validar_politicas([[corpo['Q'], corpo['S'], corpo['T']]])
+        opcoes = {o: corpo[o] for o in ('variacoes_parametros', 'parametros_alvo', 'amostragem', 'largura_ic', 'seed')
+                  if o in corpo}
+        return self._longa(sensibilidade_remota, Q, S, T, parametros, int(corpo.get('n', 1000)), opcoes)
+
+    def estado(self):
+        return dict(self.metricas.como_dict(), workers=self.workers, fila_politicas=self.agrupador.politicas_na_fila,
+                    fila_pedidos=self.agrupador.fila.qsize(), tarefas_longas_em_andamento=self.tarefas_longas,
+                    cache=self.cache.estatisticas())
+
+    def encerrar(self):
+        self.executor.shutdown(cancel_futures=True)
+
+class _Manipulador(BaseHTTPRequestHandler):
+    rotas_post = {'/avaliar': 'avaliar', '/otimizar': 'otimizar', '/sensibilidade': 'sensibilidade'}
+
+    def _responder(self, codigo, corpo):
+        dados = json.dumps(_json(corpo), ensure_ascii=False).encode()
+        self.send_response(codigo)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(dados)))
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def do_GET(self):
+        if self.path == '/metricas':
+            self._responder(200, self.server.servico.estado())
+        elif self.path == '/saude':
+            self._responder(200, dict(ok=True))
+        else:
+            self._responder(404, dict(erro=f"rota desconhecida: {self.path}"))
+
+    def do_POST(self):
+        if self.path not in self.rotas_post:
+            self._responder(404, dict(erro=f"rota desconhecida: {self.path}"))
+            return
+        inicio = time.perf_counter()
+        erro = True
+        try:
+            corpo = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            resposta = getattr(self.server.servico, self.rotas_post[self.path])(corpo)
+            erro = False
+        except (KeyError, TypeError, ValueError) as excecao:
+            self._responder(400, dict(erro=f"{type(excecao).__name__}: {excecao}"))
+        except Exception as excecao:
+            self._responder(500, dict(erro=f"{type(excecao).__name__}: {excecao}"))
+        else:
+            self._responder(200, resposta)
+        finally:
+            self.server.servico.metricas.registrar(self.path, time.perf_counter() - inicio, erro)
+
+    def log_message(self, formato, *args):
+        # O acesso fica nas métricas; o log padrão por requisição atrapalharia os testes de carga
+        pass
+
+class _Servidor(ThreadingHTTPServer):
+    daemon_threads = True
+    # Fila de conexões do socket: a padrão (5) recusa conexões sob carga concorrente
+    request_queue_size = 1024
+
+def criar_servidor(porta=8765, **opcoes):
+    """ThreadingHTTPServer em 127.0.0.1:porta com um ServicoQST (opções: workers, lote_max, espera)"""
+    servidor = _Servidor((HOST, porta), _Manipulador)
+    servidor.servico = ServicoQST(**opcoes)
+    return servidor
+
+# =============================================================================
+# TESTE DE CARGA
+# =============================================================================
+def teste_carga(porta=8765, requisicoes=1000, concorrencia=16, politicas_por_requisicao=1, seed=0):
+    """Dispara requisições /avaliar concorrentes contra o serviço local e resume vazão e latência"""
+    import urllib.request
+
+    # Corpos sorteados antes do disparo: parâmetros em ±10% de um caso base e políticas válidas ao acaso
+    rng = np.random.default_rng(seed)
+    base = np.array([3, 5, 2, 1, 2, 0.05, 0.8, 1, 10, 0.01, 0.1])
+    corpos = []
+    for _ in range(requisicoes):
+        parametros = dict(zip(PARAMETROS, (base * rng.uniform(0.9, 1.1, 11)).tolist()))
+        T = rng.uniform(0.5, 6, politicas_por_requisicao)
+        S = T * rng.random(politicas_por_requisicao)
+        politicas = np.column_stack([S * rng.random(len(S)), S, T]).tolist()
+        corpos.append(json.dumps(dict(parametros=parametros, politicas=politicas)).encode())
+
+    def uma(corpo):
+        pedido = urllib.request.Request(f'http://{HOST}:{porta}/avaliar', data=corpo,
+                                        headers={'Content-Type': 'application/json'})
+        inicio = time.perf_counter()
+        with urllib.request.urlopen(pedido) as resposta:
+            resposta.read()
+        return time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(concorrencia) as executor:
+        latencias = 1e3 * np.array(list(executor.map(uma, corpos)))
+    duracao = time.perf_counter() - inicio
+    return dict(requisicoes=requisicoes, duracao_s=duracao, requisicoes_por_s=requisicoes / duracao,
+                politicas_por_s=requisicoes * politicas_por_requisicao / duracao,
+                **{f'latencia_p{q}_ms': float(np.percentile(latencias, q)) for q in (50, 95, 99)})
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serviço HTTP/JSON local do modelo da política QST")
+    parser.add_argument('--porta', type=int, default=8765)
+    parser.add_argument('--workers', type=int, default=None, help="processos do pool (padrão: todos os núcleos)")
+    parser.add_argument('--lote-max', type=int, default=4096, help="máximo de políticas por lote de avaliação")
+    parser.add_argument('--espera-ms', type=float, default=2.0, help="espera máxima para completar um lote (ms)")
+    parser.add_argument('--teste-carga', action='store_true', help="em vez de servir, testa um serviço já no ar")
+    parser.add_argument('--requisicoes', type=int, default=1000)
+    parser.add_argument('--concorrencia', type=int, default=16)
+    parser.add_argument('--politicas', type=int, default=1, help="políticas por requisição no teste de carga")
+    args = parser.parse_args(argv)
+    if args.teste_carga:
+        print(json.dumps(teste_carga(args.porta, args.requisicoes, args.concorrencia, args.politicas), indent=2))
+        return
+    servidor = criar_servidor(args.porta, workers=args.workers, lote_max=args.lote_max, espera=args.espera_ms / 1e3)
+    print(f"Serviço QST em http://{HOST}:{args.porta} (POST /avaliar, /otimizar, /sensibilidade; GET /metricas)")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+        servidor.servico.encerrar()
+
+if __name__ == '__main__':
+    main()
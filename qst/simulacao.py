@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+Simulação de Monte Carlo (eventos discretos, vetorizada) dos ciclos de renovação
+da política QST, para conferir a decomposição analítica em cenários.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+from scipy.stats import norm, weibull_min
+
+# =============================================================================
+# SIMULAÇÃO DOS CICLOS
+# =============================================================================
+# Cada ciclo sorteia X (chegada do defeito), H (atraso até a falha) e o processo de
+# Poisson de oportunidades com taxa λ, e aplica as regras da política:
+#   - em [Q, S] as oportunidades são inspeções: as anteriores ao defeito custam Ci
+#     cada; a primeira depois do defeito o detecta (substituição oportuna, Co);
+#   - em [S, T] a primeira oportunidade leva à substituição oportuna, com ou sem defeito;
+#   - em T a substituição é preventiva (Cp); a falha em X + H encerra o ciclo (Cf).
+# Pela falta de memória do processo de Poisson, basta sortear o número de inspeções
+# negativas em [Q, a], com a = min(max(X, Q), S), e a primeira oportunidade depois de a.
+# Todos os ciclos de um bloco são simulados de uma vez com arrays.
+
+@dataclass
+class ResultadoSimulacao:
+    """Estimativas da simulação; ic_* são intervalos (inferior, superior) no nível de confiança pedido"""
+    n_ciclos: int
+    EC_ciclo: float
+    EL_ciclo: float
+    taxa_custo: float
+    ic_taxa_custo: tuple
+    MTBOF: float
+    ic_MTBOF: tuple
+    frequencias: np.ndarray
+    ic_frequencias: np.ndarray
+
+def simular_ciclos(Q, S, T, parametros, n, rng, amostrar_x=None, amostrar_h=None):
+    """Cenário (1 a 12), custo e duração de n ciclos simulados.
+
+    amostrar_x e amostrar_h, se dados, substituem as Weibull de X e H: recebem (rng, n)
+    e devolvem n tempos (em paralelo, precisam ser funções de módulo).
+    """
+    p = parametros
+    x = amostrar_x(rng, n) if amostrar_x else weibull_min.rvs(p['betax'], scale=p['etax'], size=n, random_state=rng)
+    h = amostrar_h(rng, n) if amostrar_h else weibull_min.rvs(p['betah'], scale=p['etah'], size=n, random_state=rng)
+    a = np.clip(x, Q, S)
+    n_inspecoes = rng.poisson(p['lambd'] * (a - Q))
+    oportunidade = a + (rng.exponential(1 / p['lambd'], n) if p['lambd'] > 0 else np.inf)
+    falha = x + h
+
+    preventiva = T <= np.minimum(oportunidade, falha)
+    oportuna = ~preventiva & (oportunidade < falha)
+    cenario = np.select(
+        [x >= S, x >= Q, falha < Q],
+        [np.select([preventiva, oportuna], [np.where(x >= T, 1, 2), np.where(oportunidade < x, 5, 6)], 9),
+         np.select([preventiva, oportuna], [3, 7], 10),
+         12],
+        np.select([preventiva, oportuna], [4, 8], 11))
+
+    custo = np.select([preventiva, oportuna], [p['Cp'], p['Co']], p['Cf']) + p['Ci'] * n_inspecoes
+    duracao = np.minimum(np.minimum(oportunidade, falha), T) + np.where(cenario <= 8, p['Dp'], p['Df'])
+    return cenario, custo, duracao
+
+def simular_bloco(Q, S, T, parametros, n, semente, amostrar_x=None, amostrar_h=None):
+    """Somas suficientes de um bloco de n ciclos, para agregar sem guardar os ciclos"""
+    cenario, C, L = simular_ciclos(Q, S, T, parametros, n, np.random.default_rng(semente), amostrar_x, amostrar_h)
+    F = (cenario >= 9).astype(float)
+    return dict(n=n, C=C.sum(), L=L.sum(), F=F.sum(), CC=C @ C, LL=L @ L, CL=C @ L, LF=L @ F,
+                contagens=np.bincount(cenario, minlength=13)[1:])
+
+def simular_politica(Q, S, T, parametros, n_ciclos=10**6, tamanho_bloco=2**20, workers=1, seed=None,
+                     confianca=0.95, amostrar_x=None, amostrar_h=None):
+    """Estima taxa de custo, MTBOF e frequências dos cenários por simulação, com intervalos de confiança.
+
+    Os ciclos são simulados em blocos de tamanho_bloco (memória limitada mesmo com 10^8
+    ciclos), cada um com sua semente derivada de seed; o resultado é o mesmo para qualquer
+    número de processos (workers > 1, ou -1 para todos os núcleos).
+    """
+    tamanhos = [min(tamanho_bloco, n_ciclos - i) for i in range(0, n_ciclos, tamanho_bloco)]
+    sementes = np.random.SeedSequence(seed).spawn(len(tamanhos))
+    args = ([Q] * len(tamanhos), [S] * len(tamanhos), [T] * len(tamanhos), [parametros] * len(tamanhos),
+            tamanhos, sementes, [amostrar_x] * len(tamanhos), [amostrar_h] * len(tamanhos))
+    n_processos = os.cpu_count() if workers == -1 else workers
+    if n_processos > 1:
+        with ProcessPoolExecutor(max_workers=n_processos) as executor:
+            blocos = list(executor.map(simular_bloco, *args))
+    else:
+        blocos = list(map(simular_bloco, *args))
+    soma = {k: sum(b[k] for b in blocos) for k in blocos[0]}
+
+    # Médias, covariâncias e razões (método delta para taxa = C/L e MTBOF = L/F)
+    n = soma['n']
+    C, L, F = soma['C'] / n, soma['L'] / n, soma['F'] / n
+    var_C = (soma['CC'] - n * C * C) / (n - 1)
+    var_L = (soma['LL'] - n * L * L) / (n - 1)
+    var_F = (soma['F'] - n * F * F) / (n - 1)
+    cov_CL = (soma['CL'] - n * C * L) / (n - 1)
+    cov_LF = (soma['LF'] - n * L * F) / (n - 1)
+    z = norm.ppf(0.5 + confianca / 2)
+    taxa = C / L
+    dp_taxa = np.sqrt(max(var_C - 2 * taxa * cov_CL + taxa ** 2 * var_L, 0) / n) / L
+    mtbof = L / F if F > 0 else np.inf
+    dp_mtbof = np.sqrt(max(var_L - 2 * mtbof * cov_LF + mtbof ** 2 * var_F, 0) / n) / F if F > 0 else np.inf
+    freq = soma['contagens'] / n
+    meia = z * np.sqrt(freq * (1 - freq) / n)
+    return ResultadoSimulacao(n, C, L, taxa, (taxa - z * dp_taxa, taxa + z * dp_taxa),
+                              mtbof, (mtbof - z * dp_mtbof, mtbof + z * dp_mtbof),
+                              freq, np.column_stack([freq - meia, freq + meia]))
@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""
+Aproximação de Chebyshev (produto tensorial) das integrais de base sobre a caixa
+da busca (pQ, pS, T), para consultas instantâneas com as distribuições fixas.
+"""
+
+import numpy as np
+from scipy.fft import dct
+from scipy.optimize import differential_evolution
+from scipy.stats import qmc
+
+from .avaliacao import PARAMETROS, avaliar_lote, avaliar_politica
+from .otimizacao import aceitar_polimento, limites, politica, polir_politica
+from .quadratura import integrais_base_lote
+
+# =============================================================================
+# GRANDEZAS APROXIMADAS
+# =============================================================================
+# A precificação só usa cinco somas das integrais de base (ver ciclos_lote): as
+# probabilidades dos ciclos que terminam em preventiva (cenários 1-4), oportuna
+# (5-8) e falha (9-12), a integral A do tempo sob inspeção oportuna e a duração L
+# sem parada. Elas dependem só de (betax, etax, betah, etah, lambd): aproximadas
+# essas cinco, a mesma aproximação atende a quaisquer custos e tempos de parada.
+# L é aproximada como L/T, limitada e longe de zero mesmo com T pequeno, para que
+# a taxa de custo (que cresce como 1/T perto de T = 0) mantenha o erro relativo.
+DISTRIBUICOES = PARAMETROS[:5]
+GRANDEZAS = ('P_preventiva', 'P_oportuna', 'P_falha', 'A', 'L_sobre_T')
+
+def grandezas_lote(Q, S, T, parametros):
+    """As cinco grandezas (lote, 5) pelo caminho reduzido exato"""
+    P, A, L = integrais_base_lote(Q, S, T, *(parametros[p] for p in DISTRIBUICOES))
+    return np.column_stack([P[:, :4].sum(axis=1), P[:, 4:8].sum(axis=1), P[:, 8:].sum(axis=1), A.sum(axis=1),
+                            L.sum(axis=1) / np.asarray(T, dtype=float)])
+
+def _precificar(G, T, parametros):
+    # Mesmas contas de ciclos_lote / precificar_lote, a partir das cinco grandezas
+    Pp, Po, Pf, A, L_T = G.T
+    p = {k: parametros[k] for k in PARAMETROS[4:]}
+    EC = p['Cp'] * Pp + p['Co'] * Po + p['Cf'] * Pf + p['lambd'] * p['Ci'] * A
+    EL = L_T * T + p['Dp'] * (Pp + Po) + p['Df'] * Pf
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return EC / EL, EL / Pf
+
+# =============================================================================
+# NÓS E COEFICIENTES
+# =============================================================================
+def nos_chebyshev(n):
+    """Nós de Chebyshev de primeira espécie em [-1, 1] (ordem decrescente)"""
+    return np.cos(np.pi * (np.arange(n) + 0.5) / n)
+
+def coeficientes_chebyshev(valores, eixos=(0, 1, 2)):
+    """Coeficientes da interpolação nos nós de primeira espécie, pela DCT-II em cada eixo"""
+    c = np.asarray(valores, dtype=float)
+    for eixo in eixos:
+        n = c.shape[eixo]
+        c = dct(c, type=2, axis=eixo) / n
+        c[(slice(None),) * eixo + (0,)] /= 2
+    return c
+
+def vandermonde_chebyshev(u, n):
+    """T_0..T_{n-1} de cada linha de u (d, m): array (d, m, n)"""
+    if np.all(np.abs(u) <= 1):
+        # Dentro do intervalo, T_k(u) = cos(k·arccos u) numa só operação
+        return np.cos(np.arccos(u)[..., None] * np.arange(n))
+    # Fora dele (extrapolação), pela recorrência T_k = 2u·T_{k-1} - T_{k-2}
+    V = np.empty(u.shape + (max(n, 2),))
+    V[..., 0] = 1
+    V[..., 1] = u
+    for k in range(2, n):
+        V[..., k] = 2 * u * V[..., k - 1] - V[..., k - 2]
+    return V[..., :n]
+
+def _caixa(parametros, T_min):
+    bounds = np.array(limites(parametros), dtype=float)
+    bounds[2, 0] = max(bounds[2, 0], T_min * bounds[2, 1])
+    return bounds
+
+# =============================================================================
+# SUBSTITUTO
+# =============================================================================
+class SubstitutoChebyshev:
+    """Taxa de custo e MTBOF aproximadas por polinômios de Chebyshev em x = [pQ, pS, T].
+
+    Tem a mesma assinatura de avaliar_lote (avaliar_lote(Q, S, T, parametros)) e pode
+    substituí-la onde só importa a forma da superfície. Os parâmetros de distribuição
+    precisam ser os do ajuste (ValueError, senão); custos e paradas são livres.
+    erro_validacao guarda os erros medidos contra o caminho exato em pontos de validação.
+    """
+
+    def __init__(self, distribuicoes, caixa, coeficientes, erro_validacao=None):
+        self.distribuicoes = {p: float(distribuicoes[p]) for p in DISTRIBUICOES}
+        self.caixa = np.asarray(caixa, dtype=float)
+        self.coeficientes = np.asarray(coeficientes, dtype=float)
+        self.erro_validacao = dict(erro_validacao or {})
+        # Coeficientes com o eixo de T à frente, para contrair T (o de mais nós) por produto de matrizes
+        nQ, nS, nT, g = self.coeficientes.shape
+        self._coeficientes_T = np.moveaxis(self.coeficientes, 2, 0).reshape(nT, nQ * nS * g)
+
+    @property
+    def graus(self):
+        return tuple(n - 1 for n in self.coeficientes.shape[:3])
+
+    def conferir(self, parametros):
+        """ValueError se os parâmetros de distribuição (escalares ou arrays) não forem os do ajuste"""
+        for p, v in self.distribuicoes.items():
+            valores = np.asarray(parametros[p], dtype=float).ravel()
+            diferentes = ~(np.abs(valores - v) <= 1e-12 * abs(v))
+            if diferentes.any():
+                raise ValueError(f"O substituto foi ajustado com {p} = {v:g}, não {valores[diferentes][0]:g}")
+
+    def grandezas(self, x, tamanho_bloco=2048):
+        """As cinco grandezas (lote, 5) nos pontos x = [pQ, pS, T] (3, lote), fora da caixa por extrapolação"""
+        x = np.asarray(x, dtype=float).reshape(3, -1)
+        a, b = self.caixa[:, :1], self.caixa[:, 1:]
+        u = (2 * x - (a + b)) / (b - a)
+        nQ, nS, nT, g = self.coeficientes.shape
+        G = np.empty((x.shape[1], g))
+        for i in range(0, x.shape[1], tamanho_bloco):
+            V = vandermonde_chebyshev(u[:, i:i + tamanho_bloco], max(nQ, nS, nT))
+            VQ, VS, VT = V[0, :, :nQ], V[1, :, :nS], V[2, :, :nT]
+            W = (VT @ self._coeficientes_T).reshape(-1, nQ, nS, g)
+            W = np.einsum('nqsg,ns->nqg', W, VS)
+            G[i:i + tamanho_bloco] = np.einsum('nqg,nq->ng', W, VQ)
+        return G
+
+    def avaliar_x(self, x, parametros):
+        """Taxa de custo e MTBOF nos pontos x = [pQ, pS, T] (3, lote)"""
+        self.conferir(parametros)
+        x = np.asarray(x, dtype=float).reshape(3, -1)
+        return _precificar(self.grandezas(x), x[2], parametros)
+
+    def avaliar_lote(self, Q, S, T, parametros):
+        """Taxa de custo e MTBOF das políticas (Q, S, T), com a assinatura de avaliacao.avaliar_lote"""
+        Q, S, T = np.broadcast_arrays(*(np.atleast_1d(np.asarray(v, dtype=float)) for v in (Q, S, T)))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pS = np.where(T > 0, S / T, 0.0)
+            pQ = np.where(S > 0, Q / S, 0.0)
+        return self.avaliar_x(np.stack([pQ.ravel(), pS.ravel(), T.ravel()]), parametros)
+
+    __call__ = avaliar_lote
+
+    def salvar(self, caminho):
+        """Grava o substituto num .npz compactado (coeficientes, caixa, distribuições e erros)"""
+        np.savez_compressed(caminho, coeficientes=self.coeficientes, caixa=self.caixa,
+                            distribuicoes=np.array([self.distribuicoes[p] for p in DISTRIBUICOES]),
+                            erro_nomes=np.array(list(self.erro_validacao), dtype=str),
+                            erro_valores=np.array(list(self.erro_validacao.values()), dtype=float))
+
+    @classmethod
+    def carregar(cls, caminho):
+        with np.load(caminho) as dados:
+            return cls(dict(zip(DISTRIBUICOES, dados['distribuicoes'])), dados['caixa'], dados['coeficientes'],
+                       dict(zip(dados['erro_nomes'].tolist(), dados['erro_valores'].tolist())))
+
+def validar_substituto(substituto, parametros, n=2000, seed=0):
+    """Erros máximos (absoluto e relativo) da taxa de custo e do MTBOF contra o caminho exato.
+
+    Os pontos de validação vêm de um hipercubo latino na caixa do substituto, com os
+    custos de `parametros`. Só entram pontos em que o valor exato é finito.
+    """
+    x = qmc.scale(qmc.LatinHypercube(d=3, seed=seed).random(n), *substituto.caixa.T).T
+    aproximado = substituto.avaliar_x(x, parametros)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        exato = avaliar_lote(*politica(x), parametros)
+    erros = {'pontos': float(n)}
+    for nome, a, e in zip(('taxa_custo', 'MTBOF'), aproximado, exato):
+        finito = np.isfinite(e)
+        diferenca = np.abs(a[finito] - e[finito])
+        erros[f'{nome}_abs'] = float(diferenca.max())
+        erros[f'{nome}_rel'] = float((diferenca / np.abs(e[finito])).max())
+    return erros
+
+def ajustar_substituto(parametros, n=(17, 17, 33), T_min=0.01, tol=None, n_max=(65, 65, 129), n_validacao=2000,
+                       seed=0, tamanho_lote=4096):
+    """Interpola as cinco grandezas na grade tensorial de n = (npQ, npS, nT) nós de Chebyshev.
+
+    A caixa é a da busca (limites), com T a partir de T_min·(etax + etah): perto de
+    T = 0 as grandezas deixam de ser suaves se betax < 1. Com `tol`, a grade é
+    refinada (cerca do dobro dos nós por eixo) até o erro relativo máximo de validação
+    da taxa de custo ficar abaixo de tol ou a grade passar de n_max. Os custos de
+    `parametros` só entram na validação. O custo do ajuste é o de npQ·npS·nT
+    avaliações exatas em lotes de tamanho_lote.
+    """
+    caixa = _caixa(parametros, T_min)
+    while True:
+        eixos = [(a + b) / 2 + (b - a) / 2 * nos_chebyshev(k) for (a, b), k in zip(caixa, n)]
+        X = np.array(np.meshgrid(*eixos, indexing='ij')).reshape(3, -1)
+        G = np.concatenate([grandezas_lote(*politica(X[:, i:i + tamanho_lote]), parametros)
+                            for i in range(0, X.shape[1], tamanho_lote)])
+        substituto = SubstitutoChebyshev(parametros, caixa, coeficientes_chebyshev(G.reshape(*n, len(GRANDEZAS))))
+        substituto.erro_validacao = validar_substituto(substituto, parametros, n_validacao, seed)
+        if tol is None or substituto.erro_validacao['taxa_custo_rel'] <= tol:
+            return substituto
+        proximo = tuple(min(2 * k - 1, m) for k, m in zip(n, n_max))
+        if proximo == tuple(n):
+            return substituto
+        n = proximo
+
+# =============================================================================
+# OTIMIZAÇÃO COM O SUBSTITUTO
+# =============================================================================
+def otimizar_politica_substituto(substituto, parametros, popsize=20, maxiter=300, tol=1e-8, polimento=True, **opcoes):
+    """DE sobre o substituto (lotes instantâneos) e conferência pelas integrais exatas.
+
+    O DE pode usar população e gerações grandes porque cada geração custa uma
+    avaliação polinomial. Com polimento=True, o ótimo aproximado é refinado por
+    polir_politica sobre a taxa exata (gradiente analítico). Devolve o resultado
+    (com fun_substituto, a taxa aproximada no ótimo do DE) e a avaliação exata da
+    política, como otimizar_politica.
+    """
+    substituto.conferir(parametros)
+    resultado = differential_evolution(lambda x: substituto.avaliar_x(x, parametros)[0], bounds=substituto.caixa,
+                                       popsize=popsize, maxiter=maxiter, tol=tol, vectorized=True,
+                                       updating='deferred', polish=False, **opcoes)
+    resultado.fun_substituto = resultado.fun
+    if polimento:
+        busca = polir_politica(resultado.x, parametros)
+        resultado.nfev_exato = busca.nfev
+        aceitar_polimento(resultado, busca, parametros)
+    else:
+        resultado.fun = float(avaliar_lote(*politica(resultado.x.reshape(3, 1)), parametros)[0][0])
+    return resultado, avaliar_politica(*politica(resultado.x), parametros, metodo='compilado')
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""
+Mapa da taxa de custo e do MTBOF numa grade de políticas (duas coordenadas
+variando, a terceira fixa), com refinamento em torno do mínimo e arrays em disco.
+"""
+
+import json
+import os
+from dataclasses import dataclass
+
+import numpy as np
+
+from .avaliacao import avaliar_lote
+from .otimizacao import politica
+
+# =============================================================================
+# COORDENADAS DA GRADE
+# =============================================================================
+# A grade usa as coordenadas da política (Q, S, T) ou as da busca (pQ, pS, T), em
+# que Q = pQ·S e S = pS·T (ver otimizacao.politica). Nas primeiras, os pontos com
+# Q > S ou S > T não são políticas válidas e ficam com NaN.
+COORDENADAS = {'direta': ('Q', 'S', 'T'), 'relativa': ('pQ', 'pS', 'T')}
+
+def faixa_padrao(eixo, parametros):
+    """Faixa de uma coordenada, a mesma da busca: [0, 1] para pQ e pS e [0, etax + etah] para as demais"""
+    return (0.0, 1.0) if eixo in ('pQ', 'pS') else (0.0, parametros['etax'] + parametros['etah'])
+
+def _sistema(eixo_x, eixo_y, fixos):
+    nomes = {eixo_x, eixo_y, *fixos}
+    for sistema, coordenadas in COORDENADAS.items():
+        if eixo_x != eixo_y and nomes == set(coordenadas):
+            return sistema
+    raise ValueError(f"Os eixos ({eixo_x}, {eixo_y}) e os valores fixos {sorted(fixos)} precisam formar "
+                     "exatamente (Q, S, T) ou (pQ, pS, T)")
+
+def politicas_grade(eixo_x, x, eixo_y, y, fixos):
+    """Políticas (Q, S, T) da grade y × x, arrays (len(y), len(x)), e a máscara das válidas"""
+    valores = dict(fixos)
+    valores[eixo_x] = np.asarray(x, dtype=float)[None, :]
+    valores[eixo_y] = np.asarray(y, dtype=float)[:, None]
+    forma = (len(y), len(x))
+    if _sistema(eixo_x, eixo_y, fixos) == 'relativa':
+        Q, S, T = (np.broadcast_to(v, forma) for v in politica((valores['pQ'], valores['pS'], valores['T'])))
+        return Q, S, T, np.ones(forma, dtype=bool)
+    Q, S, T = (np.broadcast_to(valores[c], forma) for c in COORDENADAS['direta'])
+    return Q, S, T, (0 <= Q) & (Q <= S) & (S <= T)
+
+# =============================================================================
+# AVALIAÇÃO EM LOTE E ARMAZENAMENTO
+# =============================================================================
+@dataclass
+class Superficie:
+    """Taxa de custo e MTBOF na grade y × x (arrays (len(y), len(x)), NaN fora das políticas válidas)"""
+    eixo_x: str
+    eixo_y: str
+    x: np.ndarray
+    y: np.ndarray
+    fixos: dict
+    taxa_custo: np.ndarray
+    MTBOF: np.ndarray
+    nivel: int = 0
+
+    @property
+    def minimo(self):
+        """(x, y, taxa de custo) do menor ponto da grade"""
+        i, j = np.unravel_index(np.nanargmin(self.taxa_custo), self.taxa_custo.shape)
+        return self.x[j], self.y[i], self.taxa_custo[i, j]
+
+def _array(caminho, nome, forma):
+    # Em disco (np.memmap no formato .npy), a grade não precisa caber na memória
+    if caminho is None:
+        return np.full(forma, np.nan)
+    array = np.lib.format.open_memmap(os.path.join(caminho, f'{nome}.npy'), mode='w+', dtype=float, shape=forma)
+    array[:] = np.nan
+    return array
+
+def avaliar_grade(eixo_x, x, eixo_y, y, fixos, parametros, caminho=None, nivel=0, tamanho_lote=2048, callback=None,
+                  avaliador=avaliar_lote):
+    """Avalia a grade y × x em lotes de até tamanho_lote políticas pelo caminho reduzido.
+
+    avaliador(Q, S, T, parametros) -> (taxa de custo, MTBOF) pode trocar o caminho
+    reduzido por outro com a mesma assinatura (p. ex. um SubstitutoChebyshev).
+
+    Com `caminho` (um diretório), taxa de custo, MTBOF e eixos são gravados em
+    arquivos .npy do nível e a Superficie devolvida os lê por memmap.
+    callback(feitos, total), se dado, é chamado após cada lote de linhas.
+    """
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    _sistema(eixo_x, eixo_y, fixos)
+    forma = (len(y), len(x))
+    if caminho is not None:
+        os.makedirs(caminho, exist_ok=True)
+        np.save(os.path.join(caminho, f'x_{nivel}.npy'), x)
+        np.save(os.path.join(caminho, f'y_{nivel}.npy'), y)
+        with open(os.path.join(caminho, f'superficie_{nivel}.json'), 'w', encoding='utf-8') as f:
+            json.dump(dict(eixo_x=eixo_x, eixo_y=eixo_y, fixos={k: float(v) for k, v in fixos.items()}, nivel=nivel), f)
+    taxa = _array(caminho, f'taxa_custo_{nivel}', forma)
+    mtbof = _array(caminho, f'MTBOF_{nivel}', forma)
+
+    # Blocos de linhas inteiras: as coordenadas do bloco são geradas só quando ele é avaliado
+    linhas = max(1, tamanho_lote // len(x))
+    for i in range(0, len(y), linhas):
+        Q, S, T, valido = politicas_grade(eixo_x, x, eixo_y, y[i:i + linhas], fixos)
+        if valido.any():
+            taxa_bloco, mtbof_bloco = avaliador(Q[valido], S[valido], T[valido], parametros)
+            taxa[i:i + linhas][valido] = taxa_bloco
+            mtbof[i:i + linhas][valido] = mtbof_bloco
+        if callback is not None:
+            callback(min(i + linhas, len(y)) * len(x), taxa.size)
+    if caminho is not None:
+        taxa.flush()
+        mtbof.flush()
+    return Superficie(eixo_x, eixo_y, x, y, dict(fixos), taxa, mtbof, nivel)
+
+def carregar_superficie(caminho, nivel=0):
+    """Superficie gravada por avaliar_grade, com os arrays abertos por memmap (só leitura)"""
+    with open(os.path.join(caminho, f'superficie_{nivel}.json'), encoding='utf-8') as f:
+        meta = json.load(f)
+    ler = lambda nome: np.load(os.path.join(caminho, f'{nome}_{nivel}.npy'), mmap_mode='r')
+    return Superficie(meta['eixo_x'], meta['eixo_y'], ler('x'), ler('y'), meta['fixos'],
+                      ler('taxa_custo'), ler('MTBOF'), nivel)
+
+# =============================================================================
+# REFINAMENTO ADAPTATIVO E JANELA DE TOLERÂNCIA
+# =============================================================================
+def mapear_superficie(parametros, eixo_x, eixo_y, fixos, faixa_x=None, faixa_y=None, n=(101, 101), refinamentos=0,
+                      janela=5, caminho=None, tamanho_lote=2048, callback=None, avaliador=avaliar_lote):
+    """Grade n = (nx, ny) sobre as faixas e `refinamentos` grades mais finas em torno do mínimo.
+
+    Cada refinamento cobre `janela` células da grade anterior de cada lado do mínimo
+    (dentro da faixa original) com a mesma quantidade de pontos, o que multiplica a
+    resolução por (n - 1) / (2·janela). Devolve a lista de Superficie, da mais
+    grossa à mais fina. callback(nivel, feitos, total) acompanha o progresso; avaliador
+    como em avaliar_grade.
+    """
+    faixa_x = faixa_x or faixa_padrao(eixo_x, parametros)
+    faixa_y = faixa_y or faixa_padrao(eixo_y, parametros)
+    nx, ny = n
+    x, y = np.linspace(*faixa_x, nx), np.linspace(*faixa_y, ny)
+    superficies = []
+    for nivel in range(refinamentos + 1):
+        progresso = None if callback is None else (lambda feitos, total, nivel=nivel: callback(nivel, feitos, total))
+        superficie = avaliar_grade(eixo_x, x, eixo_y, y, fixos, parametros, caminho, nivel, tamanho_lote, progresso,
+                                   avaliador)
+        superficies.append(superficie)
+        if np.isnan(superficie.taxa_custo).all():
+            break
+        i, j = np.unravel_index(np.nanargmin(superficie.taxa_custo), superficie.taxa_custo.shape)
+        x = np.linspace(x[max(j - janela, 0)], x[min(j + janela, nx - 1)], nx)
+        y = np.linspace(y[max(i - janela, 0)], y[min(i + janela, ny - 1)], ny)
+    return superficies
+
+def janela_tolerancia(superficie, tolerancia=0.01):
+    """Pontos com taxa de custo até (1 + tolerancia) vezes a mínima e a faixa que eles cobrem em cada eixo.
+
+    Devolve (máscara (len(y), len(x)), (x_min, x_max), (y_min, y_max)): a janela de
+    políticas que custam no máximo `tolerancia` a mais que a ótima da grade.
+    """
+    taxa = np.asarray(superficie.taxa_custo)
+    with np.errstate(invalid='ignore'):
+        mascara = taxa <= (1 + tolerancia) * np.nanmin(taxa)
+    colunas, linhas = mascara.any(axis=0), mascara.any(axis=1)
+    return (mascara, (superficie.x[colunas].min(), superficie.x[colunas].max()),
+            (superficie.y[linhas].min(), superficie.y[linhas].max()))
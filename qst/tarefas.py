@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+Execução de tarefas longas (otimização, análise de sensibilidade) em segundo plano,
+num pool de processos compartilhado, com progresso, cancelamento e resultado por id.
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+
+from .instrumentacao import perfilar
+from .otimizacao import otimizar_politica, otimizar_politica_dinkelbach
+from .pareto import otimizar_pareto
+from .sensibilidade import analise_sensibilidade_lote
+
+# Situações de uma tarefa
+NA_FILA, EXECUTANDO, CONCLUIDA, CANCELADA, ERRO = 'na fila', 'executando', 'concluída', 'cancelada', 'erro'
+
+class TarefaCancelada(Exception):
+    """A tarefa parou a pedido do usuário; o resultado parcial é descartado"""
+
+# =============================================================================
+# PROGRESSO E CANCELAMENTO
+# =============================================================================
+# O progresso e os pedidos de cancelamento ficam em dicionários de um
+# multiprocessing.Manager, visíveis do processo da interface e dos processos do
+# pool. A tarefa informa o andamento por Progresso.atualizar e consulta
+# Progresso.cancelado nos pontos em que pode parar (fim de geração, de lote).
+class Progresso:
+    """Canal de progresso e cancelamento de uma tarefa (passado ao processo que a executa)"""
+
+    def __init__(self, id_tarefa, andamento, cancelamentos):
+        self.id_tarefa = id_tarefa
+        self._andamento = andamento
+        self._cancelamentos = cancelamentos
+
+    def atualizar(self, feito, total=None):
+        self._andamento[self.id_tarefa] = (feito, total, time.time())
+
+    def cancelado(self):
+        return self.id_tarefa in self._cancelamentos
+
+def _executar(progresso, funcao, args, kwargs):
+    progresso.atualizar(0)
+    resultado = funcao(progresso, *args, **kwargs)
+    if progresso.cancelado():
+        raise TarefaCancelada(progresso.id_tarefa)
+    return resultado
+
+# =============================================================================
+# TAREFAS
+# =============================================================================
+def tarefa_otimizacao(progresso, parametros, algoritmo='de', perfil=False, **opcoes):
+    """Otimização ('de' ou 'dinkelbach') com progresso por geração ou iteração.
+
+    Devolve o par (resultado, avaliação da política ótima) dos otimizadores e o
+    Perfil da execução (None se perfil=False).
+    """
+    total = opcoes.get('maxiter', 50) if algoritmo == 'de' else opcoes.get('max_iter', 30)
+
+    def callback(intermediate_result):
+        progresso.atualizar(intermediate_result.nit, total)
+        return progresso.cancelado()
+
+    otimizador = otimizar_politica if algoritmo == 'de' else otimizar_politica_dinkelbach
+    with (perfilar() if perfil else nullcontext()) as coletado:
+        resultado = otimizador(parametros, callback=callback, **opcoes)
+    return resultado, coletado
+
+def tarefa_pareto(progresso, parametros, **opcoes):
+    """Fronteira de Pareto custo × MTBOF (otimizar_pareto) com progresso por geração"""
+    total = opcoes.get('geracoes', 100)
+
+    def callback(intermediate_result):
+        progresso.atualizar(intermediate_result.nit, total)
+        return progresso.cancelado()
+
+    return otimizar_pareto(parametros, callback=callback, **opcoes)
+
+def tarefa_sensibilidade(progresso, Q, S, T, parametros_base, n_max, **opcoes):
+    """analise_sensibilidade_lote com progresso pelo número de amostras avaliadas"""
+    def callback(n):
+        progresso.atualizar(n, n_max)
+        return progresso.cancelado()
+
+    return analise_sensibilidade_lote(Q, S, T, parametros_base, n_max, callback=callback, **opcoes)
+
+# =============================================================================
+# GERENCIADOR DE TAREFAS
+# =============================================================================
+class GerenciadorTarefas:
+    """Pool de processos compartilhado que executa tarefas em segundo plano.
+
+    submeter devolve um id; estado, cancelar, resultado e descartar operam sobre ele.
+    Um único gerenciador pode atender várias sessões: as tarefas dividem os núcleos
+    da máquina (max_workers, por padrão todos). Os processos são criados com 'spawn',
+    seguro num servidor com várias threads.
+    """
+
+    def __init__(self, max_workers=None):
+        contexto = multiprocessing.get_context('spawn')
+        self._gerente = contexto.Manager()
+        self._andamento = self._gerente.dict()
+        self._cancelamentos = self._gerente.dict()
+        self._executor = ProcessPoolExecutor(max_workers=max_workers or os.cpu_count(), mp_context=contexto)
+        self._tarefas = {}
+        self._trava = threading.Lock()
+
+    def submeter(self, funcao, *args, descricao='', **kwargs):
+        """Agenda funcao(progresso, *args, **kwargs) e devolve o id da tarefa"""
+        id_tarefa = uuid.uuid4().hex[:12]
+        progresso = Progresso(id_tarefa, self._andamento, self._cancelamentos)
+        with self._trava:
+            futuro = self._executor.submit(_executar, progresso, funcao, args, kwargs)
+            self._tarefas[id_tarefa] = dict(futuro=futuro, descricao=descricao, criada=time.time())
+        return id_tarefa
+
+    def estado(self, id_tarefa):
+        """Situação, progresso (feito, total), tempo decorrido e erro da tarefa"""
+        tarefa = self._tarefas[id_tarefa]
+        futuro = tarefa['futuro']
+        feito, total, _ = self._andamento.get(id_tarefa, (0, None, None))
+        erro = None
+        if futuro.cancelled():
+            situacao = CANCELADA
+        elif futuro.done():
+            excecao = futuro.exception()
+            situacao = CONCLUIDA if excecao is None else CANCELADA if isinstance(excecao, TarefaCancelada) else ERRO
+            erro = None if situacao != ERRO else f"{type(excecao).__name__}: {excecao}"
+        else:
+            situacao = EXECUTANDO if id_tarefa in self._andamento else NA_FILA
+        return dict(id=id_tarefa, descricao=tarefa['descricao'], situacao=situacao, feito=feito, total=total,
+                    decorrido_s=time.time() - tarefa['criada'], erro=erro)
+
+    def cancelar(self, id_tarefa):
+        """Tira a tarefa da fila ou pede que ela pare no próximo ponto de verificação"""
+        if not self._tarefas[id_tarefa]['futuro'].cancel():
+            self._cancelamentos[id_tarefa] = True
+
+    def resultado(self, id_tarefa, timeout=None):
+        """Resultado da tarefa (espera até `timeout` segundos; reergue o erro, se houve)"""
+        return self._tarefas[id_tarefa]['futuro'].result(timeout)
+
+    def descartar(self, id_tarefa):
+        """Esquece a tarefa (cancelando-a, se ainda não terminou)"""
+        futuro = self._tarefas[id_tarefa]['futuro']
+        if futuro.done():
+            self._limpar(id_tarefa)
+        else:
+            # O pedido de cancelamento precisa durar até a tarefa o ver e parar
+            self.cancelar(id_tarefa)
+            futuro.add_done_callback(lambda _: self._limpar(id_tarefa))
+        with self._trava:
+            del self._tarefas[id_tarefa]
+
+    def _limpar(self, id_tarefa):
+        self._andamento.pop(id_tarefa, None)
+        self._cancelamentos.pop(id_tarefa, None)
+
+    def encerrar(self):
+        self._executor.shutdown(cancel_futures=True)
+        self._gerente.shutdown()
@@ -6,15 +6,82 @@ Created on Sat Apr  5 10:09:19 2025
 """
 
 import io
-import time
-import numpy as np
+import shutil
+import tempfile
+from contextlib import nullcontext
+
+import altair as alt
 import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
-from scipy.stats import weibull_min
-from scipy.integrate import quad, dblquad
-from scipy.optimize import minimize
-from scipy.optimize import differential_evolution
 import streamlit as st
+
+from qst import PARAMETROS, avaliar_lote
+from qst.cache import CacheResultados, avaliar_politica_cache, chave_otimizacao
+from qst.estimacao import COLUNAS as COLUNAS_HISTORICO, ajustar_historico
+from qst.frota import ler_componentes, otimizar_componentes
+from qst.indice import IndicePoliticas, partida_quente
+from qst.instrumentacao import perfilar
+from qst.sensibilidade import varredura_uma_a_uma
+from qst.simulacao import simular_politica
+from qst.substituto import SubstitutoChebyshev, ajustar_substituto, otimizar_politica_substituto
+from qst.superficie import janela_tolerancia, mapear_superficie
+from qst.tarefas import (NA_FILA, EXECUTANDO, CONCLUIDA, CANCELADA, GerenciadorTarefas, tarefa_otimizacao, tarefa_pareto,
+                        tarefa_sensibilidade)
+
+# Cache de resultados compartilhado entre reexecuções e sessões (persistido em disco)
+@st.cache_resource
+def cache_resultados():
+    return CacheResultados(capacidade=1024, caminho=".qst_cache.sqlite")
+
+# Otimizações anteriores (parâmetros -> política ótima) para dar partida quente ao DE
+@st.cache_resource
+def indice_politicas():
+    return IndicePoliticas(caminho=".qst_indice.sqlite")
+
+# Pool de processos compartilhado entre as sessões: otimização e análise de sensibilidade
+# rodam em segundo plano e a página continua respondendo; cada sessão guarda os ids das suas tarefas
+@st.cache_resource
+def gerenciador_tarefas():
+    return GerenciadorTarefas()
+
+def iniciar_tarefa(nome, funcao, *args, **kwargs):
+    """Submete a tarefa e guarda seu id em st.session_state[nome] (substituindo a anterior, se houver)"""
+    if nome in st.session_state:
+        gerenciador_tarefas().descartar(st.session_state[nome]['id'])
+    st.session_state[nome] = dict(kwargs.pop('contexto', {}), id=gerenciador_tarefas().submeter(funcao, *args, **kwargs))
+
+@st.fragment(run_every=1.0)
+def acompanhar_tarefa(nome, rotulo, ao_concluir):
+    """Progresso e cancelamento da tarefa em segundo plano; ao terminar, entrega o resultado e recarrega a página"""
+    tarefa = st.session_state[nome]
+    try:
+        estado = gerenciador_tarefas().estado(tarefa['id'])
+    except KeyError:
+        # O servidor foi reiniciado e a tarefa se perdeu
+        estado = dict(situacao=CANCELADA)
+    if estado['situacao'] in (NA_FILA, EXECUTANDO):
+        feito, total = estado['feito'], estado['total']
+        texto = f"{rotulo}: {estado['situacao']}" + (f" – {feito} de {total}" if total else "")
+        st.progress(min(feito / total, 1.0) if total else 0.0, text=f"{texto} ({estado['decorrido_s']:.0f} s)")
+        if st.button("✖️ Cancelar", key=f"cancelar_{nome}"):
+            gerenciador_tarefas().cancelar(tarefa['id'])
+        return
+    if estado['situacao'] == CONCLUIDA:
+        ao_concluir(tarefa, gerenciador_tarefas().resultado(tarefa['id']))
+    else:
+        st.session_state[f'{nome}_aviso'] = f"{rotulo}: {estado['situacao']}" + (f" ({estado['erro']})" if estado.get('erro') else "")
+    if 'id' in estado:
+        gerenciador_tarefas().descartar(tarefa['id'])
+    del st.session_state[nome]
+    st.rerun()
+
+def mostrar_tarefa(nome, rotulo, ao_concluir):
+    """Acompanha a tarefa `nome`, se houver, e mostra o aviso de cancelamento ou erro da última"""
+    if f'{nome}_aviso' in st.session_state:
+        st.warning(st.session_state.pop(f'{nome}_aviso'))
+    if nome in st.session_state:
+        acompanhar_tarefa(nome, rotulo, ao_concluir)
 # =============================================================================
 # Layout Superior – Cabeçalho com logo e título
 # =============================================================================
@@ -36,405 +103,96 @@ with col2:
 # =============================================================================
 st.header("📥 Parâmetros do Modelo")
 
+with st.expander("📂 Estimar X e H a partir de um histórico de manutenção"):
+    st.markdown("Arquivo CSV ou Parquet com uma linha por componente: idade em que o defeito foi encontrado "
+                "(ou em que o componente saiu sem defeito, censura) e atraso do defeito até a falha (ou até a "
+                "substituição antes da falha, censura), cada um com uma coluna 0/1 indicando se o evento foi observado. "
+                "O ajuste por máxima verossimilhança lê o arquivo em blocos e preenche betax, etax, betah e etah, "
+                "e a imprecisão de cada um (IC 95%) na análise de sensibilidade.")
+    arquivo_historico = st.file_uploader("Histórico de manutenção", type=["csv", "parquet"])
+    cols_hist = st.columns(4)
+    colunas_historico = {
+        'X': (cols_hist[0].text_input("Coluna do tempo de X", COLUNAS_HISTORICO['X'][0]),
+              cols_hist[1].text_input("Coluna do evento de X (1 = defeito)", COLUNAS_HISTORICO['X'][1])),
+        'H': (cols_hist[2].text_input("Coluna do tempo de H", COLUNAS_HISTORICO['H'][0]),
+              cols_hist[3].text_input("Coluna do evento de H (1 = falha)", COLUNAS_HISTORICO['H'][1])),
+    }
+    if arquivo_historico is not None and st.button("📐 Ajustar distribuições"):
+        with st.spinner("Ajustando as Weibull de X e H..."):
+            ajustes_hist, parametros_hist = ajustar_historico(arquivo_historico, colunas_historico)
+        st.session_state.update(parametros_hist)
+        for v, sufixo in (('X', 'x'), ('H', 'h')):
+            for param, relativa in zip((f'beta{sufixo}', f'eta{sufixo}'), ajustes_hist[v].imprecisao()):
+                st.session_state[f'imprecisao_{param}'] = int(min(max(round(100 * relativa), 1), 100))
+        st.session_state['ajustes_historico'] = ajustes_hist
+        st.rerun()
+    if 'ajustes_historico' in st.session_state:
+        linhas_hist = []
+        for v, a in st.session_state['ajustes_historico'].items():
+            (b_inf, b_sup), (e_inf, e_sup) = a.intervalo()
+            linhas_hist.append((v, a.beta, a.ep_beta, b_inf, b_sup, a.eta, a.ep_eta, e_inf, e_sup, a.eventos, a.n))
+        st.dataframe(pd.DataFrame(linhas_hist, columns=["Variável", "β", "EP β", "β IC 95% inf.", "β IC 95% sup.", "η", "EP η",
+                                                        "η IC 95% inf.", "η IC 95% sup.", "Eventos", "Registros"]))
+
 col1, col2 = st.columns(2)
 
 with col1:
-    betax = st.number_input("Tempo até a chegada do defeito (X) – parâmetro de forma (Weibull)", format="%.7f", step=0.0000001)
-    etax = st.number_input("Tempo até a chegada do defeito (X) – parâmetro de escala (Weibull)", format="%.7f", step=0.0000001)
+    betax = st.number_input("Tempo até a chegada do defeito (X) – parâmetro de forma (Weibull)", format="%.7f", step=0.0000001, key='betax')
+    etax = st.number_input("Tempo até a chegada do defeito (X) – parâmetro de escala (Weibull)", format="%.7f", step=0.0000001, key='etax')
     lambd = st.number_input("Taxa de chegada de oportunidades (λ)", format="%.7f", step=0.0000001)
     Cp = st.number_input("Custo de substituição preventiva programada (Cp)", format="%.7f", step=0.0000001)
     Co = st.number_input("Custo de substituição preventiva em oportunidade (Co)", format="%.7f", step=0.0000001)
     Dp = st.number_input("Tempo de parada para substituição preventiva programada (Dp)", format="%.7f", step=0.0000001)
 
 with col2:
-    betah = st.number_input("Tempo entre a chegada do defeito e a falha (H) – parâmetro de forma (Weibull)", format="%.7f", step=0.0000001)
-    etah = st.number_input("Tempo entre a chegada do defeito e a falha (H) – parâmetro de escala (Weibull)", format="%.7f", step=0.0000001)
+    betah = st.number_input("Tempo entre a chegada do defeito e a falha (H) – parâmetro de forma (Weibull)", format="%.7f", step=0.0000001, key='betah')
+    etah = st.number_input("Tempo entre a chegada do defeito e a falha (H) – parâmetro de escala (Weibull)", format="%.7f", step=0.0000001, key='etah')
     Cf = st.number_input("Custo de substituição corretiva (Cf)", format="%.7f", step=0.0000001)
     Ci = st.number_input("Custo de inspeção (Ci)", format="%.7f", step=0.0000001)
     Df = st.number_input("Tempo de parada para substituição corretiva (Df)", format="%.7f", step=0.0000001)
         
 # =============================================================================
-# FUNÇÕES DE DISTRIBUIÇÃO
+# MODO SUBSTITUTO (APROXIMAÇÃO DE CHEBYSHEV)
 # =============================================================================
-def fx(t, betax, etax):
-    return ((betax / etax) * ((t / etax) ** (betax - 1))) * np.exp(-((t / etax) ** betax))
-
-def Rx(t, betax, etax):
-    return np.exp(-((t / etax) ** betax))
-
-def Fx(t, betax, etax):
-    return 1 - Rx(t, betax, etax)
-
-def fh(t, betah, etah):
-    return ((betah / etah) * ((t / etah) ** (betah - 1))) * np.exp(-((t / etah) ** betah))
-
-def Rh(t, betah, etah):
-    return np.exp(-((t / etah) ** betah))
-
-def Fh(t, betah, etah):
-    return 1 - Rh(t, betah, etah)
-
-def fw(t, lambd):
-    return lambd * np.exp(-lambd * t)
-
-def Rw(t,lambd):
-    return np.exp(-lambd * t)
-
-def FW(t, lambd):
-    return 1 - Rw(t, lambd)
-
-# =============================================================================
-# FUNÇÕES DOS CENÁRIOS
-# =============================================================================
-#cenário1
-def P1(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
-    """Probabilidade de ocorrência do Cenário 1"""
-    return Rx(T, betax, etax) * Rw((T - S), lambd)
-
-def EC1(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
-    """Cálculo do custo esperado do Cenário 1"""
-    prob = P1(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
-    return prob * (Cp + lambd * (S-Q) * Ci)
-
-def EL1(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
-    """Cálculo da duração esperada do ciclo do Cenário 1"""
-    prob = P1(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
-    return prob * (T + Dp)
-
-#cenário2
-def P2(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
-    """Probabilidade de ocorrência do Cenário 2"""
-    integral, _ = quad(lambda x: fx(x, betax, etax) * Rh((T - x), betah, etah) * Rw((T - S), lambd), S, T)
-    return integral
-
-def EC2(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
-    """Custo esperado do Cenário 2"""
-    prob = P2(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
-    return prob * (Cp + lambd * (S-Q) * Ci)
-
-def EL2(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
-    """Duração esperada do ciclo do Cenário 2"""
-    prob = P2(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
-    return prob * (T + Dp)
-
-#cenário3
-def P3(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
-    """Probabilidade de ocorrência do Cenário 3"""
-    integral, _ = quad(lambda x: fx(x, betax, etax) * Rh((T - x), betah, etah) * Rw((T - x), lambd), Q, S)
-    return integral
-
-def EC3(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
-    """Custo esperado do Cenário 3"""
-    integral, _ = quad(lambda x: (Cp + lambd * (x-Q) * Ci) * fx(x, betax, etax) * Rh((T - x), betah, etah) * Rw((T - x), lambd), Q, S)
-    return integral
-
-def EL3(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
-    """Duração esperada do ciclo do Cenário 3"""
-    prob = P3(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
-    return prob*(T + Dp)
-
-#cenário4
-def P4(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
-    """Probabilidade de ocorrência do Cenário 4 (novo)"""
-    integral, _ = quad(lambda x: fx(x, betax, etax) * Rh((T - x), betah, etah) * Rw((T - Q), lambd), 0, Q)
-    return integral
-
-def EC4(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
-    """Custo esperado do Cenário 4 (novo)"""
-    prob = P4(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
-    return prob*Cp
-
-def EL4(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
-    """Duração esperada do ciclo do Cenário 4(novo)"""
-    prob = P4(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
-    return prob*(T + Dp)
-
-#cenário5
-def P5(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
-    """Probabilidade de ocorrência do Cenário 5"""
-    integral, _ = quad(lambda w: fw(w, lambd) * Rx((S + w), betax, etax), 0, T - S)
-    return integral
-
-def EC5(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
-    """Custo esperado do Cenário 5"""
-    prob = P5(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
-    return prob * (Co + lambd * (S-Q) * Ci)
-
-def EL5(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
-    """Duração esperada do ciclo do Cenário 5"""
-    integral, _ = quad(lambda w: fw(w, lambd) * Rx((S + w), betax, etax) * (S + w + Dp), 0, T - S)
-    return integral
-
-## CENÁRIO 6 (antigo cenário 5)
-
-def P6(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
-    """Probabilidade de ocorrência do Cenário 6"""
-    integral, _ = dblquad(
-        lambda x, w: fw(w, lambd) * fx(x, betax, etax) * Rh((S + w - x), betah, etah),
-        0, T - S,
-        lambda w: S,
-        lambda w: S + w
-    )
-    return integral
-
-def EC6(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
-    """Custo esperado do Cenário 6"""
-    prob = P6(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
-    return prob * (Co + lambd * (S-Q) * Ci)
-
-def EL6(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
-    """Duração esperada do ciclo do Cenário 6"""
-    integral, _ = dblquad(
-        lambda x, w: (S + w + Dp) * fw(w, lambd) * fx(x, betax, etax) * Rh((S + w - x), betah, etah),
-        0, T - S,
-        lambda w: S,
-        lambda w: S + w
-    )
-    return integral
-
-# CENÁRIO 7 (antigo cenário 6)
-
-def P7(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
-    """Probabilidade de ocorrência do Cenário 7"""
-    integral, _ = dblquad(
-        lambda w, x: fx(x, betax, etax) * fw(w, lambd) * Rh(w, betah, etah),
-        Q, S,
-        lambda x: 0,
-        lambda x: T - x
-    )
-    return integral
-
-def EC7(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
-    """Custo esperado do Cenário 7"""
-    integral, _ = dblquad(
-        lambda w, x: (Co + lambd * (x-Q) * Ci) * fx(x, betax, etax) * fw(w, lambd) * Rh(w, betah, etah),
-        Q, S,
-        lambda x: 0,
-        lambda x: T - x
-    )
-    return integral
-
-def EL7(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
-    """Duração esperada do ciclo do Cenário 6"""
-    integral, _ = dblquad(
-        lambda w, x: (x + w + Dp) * fx(x, betax, etax) * fw(w, lambd) * Rh(w, betah, etah),
-        Q, S,
-        lambda x: 0,
-        lambda x: T - x
-    )
-    return integral
-
-########################################
-# CENÁRIO 8 (NOVO)
-
-def P8(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
-    """Probabilidade de ocorrência do Cenário 8"""
-    integral, _ = dblquad(
-        lambda w, x: fx(x, betax, etax) * fw(w, lambd) * Rh((Q+w-x), betah, etah),
-        0, Q,
-        lambda x: 0,
-        lambda x: T-Q
-    )
-    return integral
-
-def EC8(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
-    prob = P8(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
-    return prob*Co
-
-def EL8(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
-    """Duração esperada do ciclo do Cenário 8"""
-    integral, _ = dblquad(
-        lambda w, x: (x + w + Dp) * fx(x, betax, etax) * fw(w, lambd) * Rh((Q+w-x), betah, etah),
-        0, Q,
-        lambda x: 0,
-        lambda x: T-Q
-    )
-    return integral
-
-##############################
-# CENÁRIO 9 (antigo cenário 7)
-
-def P9(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
-    """Probabilidade de ocorrência do Cenário 7"""
-    integral, _ = dblquad(
-        lambda h, x: fx(x, betax, etax) * fh(h, betah, etah) * Rw(x + h - S, lambd),
-        S, T,
-        lambda x: 0,
-        lambda x: T - x
-    )
-    return integral
-
-def EC9(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
-    """Custo esperado do Cenário 7"""
-    prob = P9(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
-    return prob * (Cf + lambd * (S-Q) * Ci)
-
-def EL9(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
-    """Duração esperada do ciclo do Cenário 7"""
-    integral, _ = dblquad(
-        lambda h, x: (x + h + Df) * fx(x, betax, etax) * fh(h, betah, etah) * Rw(x + h - S, lambd),
-        S, T,
-        lambda x: 0,
-        lambda x: T - x
-    )
-    return integral
-
-########################
-# CENÁRIO 10 - antigo cenário 8
-
-
-def P10(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
-    """Probabilidade de ocorrência do Cenário 8"""
-    integral, _ = dblquad(
-        lambda h, x: fx(x, betax, etax) * fh(h, betah, etah) * Rw(h, lambd),
-        Q, S,
-        lambda x: 0,
-        lambda x: T - x
-    )
-    return integral
-
-def EC10(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
-    """Custo esperado do Cenário 8"""
-    integral, _ = dblquad(
-        lambda h, x: (Cf + lambd * (x-Q) * Ci) * fx(x, betax, etax) * fh(h, betah, etah) * Rw(h, lambd),
-        Q, S,
-        lambda x: 0,
-        lambda x: T - x
-    )
-    return integral
-
-def EL10(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
-    """Duração esperada do ciclo do Cenário 8"""
-    integral, _ = dblquad(
-        lambda h, x: (x + h + Df) * fx(x, betax, etax) * fh(h, betah, etah) * Rw(h, lambd),
-        Q, S,
-        lambda x: 0,
-        lambda x: T - x
-    )
-    return integral
-
-################################################
-###### CENÁRIO 11 (NOVO)
-
-def P11(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
-    """Probabilidade de ocorrência do Cenário 8"""
-    integral, _ = dblquad(
-        lambda h, x: fx(x, betax, etax) * fh(h, betah, etah) * Rw((x+h-Q), lambd),
-        0, Q,
-        lambda x: Q - x,
-        lambda x: T - x
-    )
-    return integral
-
-def EC11(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
-    prob = P11(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
-    return Cf*prob
-
-def EL11(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
-    """Duração esperada do ciclo do Cenário 8"""
-    integral, _ = dblquad(
-        lambda h, x: (x + h + Df) * fx(x, betax, etax) * fh(h, betah, etah) * Rw((x+h-Q), lambd),
-        0, Q,
-        lambda x: Q - x,
-        lambda x: T - x
-    )
-    return integral
-
-##############################################
-# CENÁRIO 12 (NOVO)
-
-def P12(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
-    """Probabilidade de ocorrência do Cenário 8"""
-    integral, _ = dblquad(
-        lambda h, x: fx(x, betax, etax) * fh(h, betah, etah),
-        0, Q,
-        lambda x: 0,
-        lambda x: Q - x
-    )
-    return integral
-
-def EC12(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
-    prob = P12(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
-    return Cf*prob
-
-def EL12(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
-    """Duração esperada do ciclo do Cenário 8"""
-    integral, _ = dblquad(
-        lambda h, x: (x + h + Df) * fx(x, betax, etax) * fh(h, betah, etah),
-        0, Q,
-        lambda x: 0,
-        lambda x: Q - x
-    )
-    return integral
-
-# =============================================================================
-# CÁLCULOS
-# =============================================================================
-def P_total (Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
-    p_total = 0
-    p_total = p_total + P1(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
-    p_total = p_total + P2(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
-    p_total = p_total + P3(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
-    p_total = p_total + P4(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
-    p_total = p_total + P5(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
-    p_total = p_total + P6(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
-    p_total = p_total + P7(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
-    p_total = p_total + P8(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
-    p_total = p_total + P9(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
-    p_total = p_total + P10(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
-    p_total = p_total + P11(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
-    p_total = p_total + P12(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
-    return p_total
-
-def P_falha(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
-    p_falha = 0
-    p_falha = p_falha + P9(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
-    p_falha = p_falha + P10(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
-    p_falha = p_falha + P11(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
-    p_falha = p_falha + P12(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
-    return p_falha
-    
-def EC_ciclo (Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
-    EC = 0
-    EC = EC + EC1(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
-    EC = EC + EC2(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
-    EC = EC + EC3(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
-    EC = EC + EC4(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
-    EC = EC + EC5(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
-    EC = EC + EC6(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
-    EC = EC + EC7(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
-    EC = EC + EC8(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
-    EC = EC + EC9(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
-    EC = EC + EC10(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
-    EC = EC + EC11(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
-    EC = EC + EC12(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
-    return EC
-
-def EL_ciclo (Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
-    EL = 0
-    EL = EL + EL1(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
-    EL = EL + EL2(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
-    EL = EL + EL3(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
-    EL = EL + EL4(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
-    EL = EL + EL5(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
-    EL = EL + EL6(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
-    EL = EL + EL7(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
-    EL = EL + EL8(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
-    EL = EL + EL9(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
-    EL = EL + EL10(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
-    EL = EL + EL11(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
-    EL = EL + EL12(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
-    return EL
-
-def taxa_custo(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
-    EC_ = EC_ciclo (Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
-    EL_ = EL_ciclo (Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
-    return (EC_/EL_)
-
-def MTBOF(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df):
-    EL_ = EL_ciclo (Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
-    pf_ = P_falha(Q, S, T, betax,  etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
-    return (EL_/pf_)
+# Com as distribuições fixas, a taxa de custo e o MTBOF são aproximados por
+# polinômios sobre a caixa da busca; avaliações manuais, a superfície e o DE usam
+# a aproximação, e o ótimo do DE é refinado e conferido com as integrais exatas.
+GRADES_SUBSTITUTO = {"rápida (9 × 9 × 17 nós)": (9, 9, 17), "padrão (17 × 17 × 33 nós)": (17, 17, 33),
+                     "fina (33 × 33 × 65 nós)": (33, 33, 65)}
+
+with st.expander("⚡ Modo substituto: respostas instantâneas por aproximação de Chebyshev"):
+    st.caption("Ajustado uma vez para os parâmetros de X, H e λ atuais; custos e tempos de parada podem mudar "
+               "sem novo ajuste. O erro é medido contra as integrais exatas em 2000 políticas de validação.")
+    usar_substituto = st.checkbox("Usar o substituto na avaliação manual, na superfície e na otimização (DE)")
+    grade_substituto = st.selectbox("Grade de interpolação", list(GRADES_SUBSTITUTO), index=1)
+    cols_subst = st.columns(2)
+    if cols_subst[0].button("⚡ Ajustar substituto"):
+        parametros_subst = dict(zip(PARAMETROS, (betax, etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)))
+        with st.spinner("Avaliando a grade de interpolação..."):
+            st.session_state['substituto'] = ajustar_substituto(parametros_subst, n=GRADES_SUBSTITUTO[grade_substituto])
+    arquivo_substituto = cols_subst[1].file_uploader("Carregar substituto salvo (.npz)", type=["npz"])
+    if arquivo_substituto is not None and st.session_state.get('substituto_arquivo') != arquivo_substituto.file_id:
+        st.session_state['substituto'] = SubstitutoChebyshev.carregar(arquivo_substituto)
+        st.session_state['substituto_arquivo'] = arquivo_substituto.file_id
+
+    substituto_ativo = None
+    if 'substituto' in st.session_state:
+        substituto = st.session_state['substituto']
+        erros = substituto.erro_validacao
+        st.markdown(f"Graus {substituto.graus}; erro relativo máximo na validação: taxa de custo "
+                    f"**{erros.get('taxa_custo_rel', float('nan')):.2e}**, MTBOF **{erros.get('MTBOF_rel', float('nan')):.2e}**.")
+        buf_subst = io.BytesIO()
+        substituto.salvar(buf_subst)
+        st.download_button("💾 Baixar substituto (.npz)", buf_subst.getvalue(), "substituto_qst.npz",
+                           "application/octet-stream")
+        try:
+            substituto.conferir(dict(zip(PARAMETROS, (betax, etax, betah, etah, lambd))))
+        except ValueError as erro:
+            st.warning(f"{erro}: ajuste um novo substituto para os parâmetros atuais.")
+        else:
+            substituto_ativo = substituto if usar_substituto else None
+    elif usar_substituto:
+        st.info("Ajuste ou carregue um substituto para usar o modo.")
 
 # =============================================================================
 # OTIMIZAÇÃO COM DIFFERENTIAL EVOLUTION
@@ -445,57 +203,260 @@ if 'Q_opt' not in st.session_state:
     st.session_state['S_opt'] = None
     st.session_state['T_opt'] = None
     
+coletar_perfil = st.checkbox("⏱️ Coletar perfil de desempenho ao otimizar e avaliar (tempo e integrais por cenário)")
+
+with st.expander("⚙️ Opções da otimização"):
+    algoritmo_opt = st.radio("Método de otimização", ["Evolução diferencial", "Dinkelbach (programação fracionária)"])
+    popsize_de = st.number_input("Tamanho da população (popsize)", min_value=5, max_value=200, value=6, step=1)
+    maxiter_de = st.number_input("Número máximo de gerações (maxiter)", min_value=10, max_value=2000, value=20, step=10)
+    tol_de = st.number_input("Tolerância de convergência (tol)", min_value=1e-8, max_value=1.0, value=0.1, format="%.8f")
+    vetorizado_de = st.checkbox("Avaliar cada geração em lote (vetorizado)", value=True)
+    workers_de = st.number_input("Número de processos (-1 = todos os núcleos)", min_value=-1, max_value=256, value=1, step=1)
+    polimento_de = st.checkbox("Refinar o resultado do DE com gradiente analítico (L-BFGS-B)", value=True)
+    multifidelidade_de = st.checkbox("Quadratura grosseira na exploração (multifidelidade)", value=True)
+    partida_quente_de = st.checkbox("Partir dos ótimos de parâmetros semelhantes já otimizados (partida quente)", value=True)
+
+def concluir_otimizacao(tarefa, resultado):
+    (resultado_busca, resultado_opt), perfil = resultado
+    cache_resultados().guardar(tarefa['chave'], (resultado_busca, resultado_opt))
+    indice_politicas().adicionar(tarefa['parametros'], resultado_busca.x, resultado_opt.taxa_custo)
+    st.session_state['resultado_otimizacao'] = resultado_opt
+    if perfil:
+        st.session_state['perfil'] = ("Otimizar", perfil)
+
 if st.button("🚀 Otimizar"):
-    
-    cenarios = [(betax, etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)]
-    matriz_resultados = [[None]*5 for _ in range(len(cenarios))]
-    
-    # Iteração sobre os cenários 
-    for i in range(len(cenarios)):
-        betax_i, etax_i, betah_i, etah_i, lambd_i, Ci_i, Co_i, Cp_i, Cf_i, Dp_i, Df_i = cenarios[i]
-        
-        # Função objetivo: mapeia x = [pQ, pS, T] para Q, S e calcula a taxa de custo
-        def objetivo(x):
-            pQ, pS, T_val = x
-            S_val = T_val * pS
-            Q_val = S_val * pQ
-            return taxa_custo(Q_val, S_val, T_val, betax_i, etax_i, betah_i, etah_i, lambd_i, Ci_i, Co_i, Cp_i, Cf_i, Dp_i, Df_i)
-        
-        # Chute inicial e limites:
-        # pQ e pS variam entre 0 e 1; T varia entre 0 e (etax+etah)
-        x0 = [0.5, 0.5, etax_i]
-        bounds = [(0,1), (0,1), (0, etax_i+etah_i)]
-        
-        with st.spinner("⏳ Otimizando a política QST... Aguarde..."):
-            resultado = differential_evolution(objetivo, bounds=bounds, popsize=10, maxiter=50, tol=0.1)
-        
-        pQ, pS, T_opt = resultado.x
-        S_opt = T_opt * pS
-        Q_opt = S_opt * pQ
-        
-        st.session_state['Q_opt'] = Q_opt
-        st.session_state['S_opt'] = S_opt
-        st.session_state['T_opt'] = T_opt
-        
-        taxa_ot = taxa_custo(Q_opt, S_opt, T_opt, betax_i, etax_i, betah_i, etah_i, lambd_i, Ci_i, Co_i, Cp_i, Cf_i, Dp_i, Df_i)
-        MTBOF_opt = MTBOF(Q_opt, S_opt, T_opt, betax_i, etax_i, betah_i, etah_i, lambd_i, Ci_i, Co_i, Cp_i, Cf_i, Dp_i, Df_i)
-        
-        # Armazena os resultados
-        matriz_resultados[i][0] = Q_opt
-        matriz_resultados[i][1] = S_opt
-        matriz_resultados[i][2] = T_opt
-        matriz_resultados[i][3] = taxa_ot
-        matriz_resultados[i][4] = MTBOF_opt
-        
-        # Exibe os resultados para este cenário
-        st.success("Otimização concluída!")
-        st.markdown("### 🔍 Resultados Otimizados")
-        col_res1, col_res2, col_res3, col_res4, col_res5 = st.columns(5)
-        col_res1.metric(label="🕒 Q otimizado", value=f"{Q_opt:.2f}")
-        col_res2.metric(label="🕒 S otimizado", value=f"{S_opt:.2f}")
-        col_res3.metric(label="⏱️ T otimizado", value=f"{T_opt:.2f}")
-        col_res4.metric(label="💰 Custo Mínimo", value=f"{taxa_ot:.4f}")
-        col_res5.metric(label="📈 MTBOF", value=f"{MTBOF_opt:.2f}")
+    parametros_i = dict(zip(PARAMETROS, (betax, etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)))
+
+    # Busca em x = [pQ, pS, T] (ver qst.otimizacao); a política ótima é reavaliada com metodo='compilado'
+    if algoritmo_opt == "Evolução diferencial":
+        algoritmo, opcoes = 'de', dict(popsize=popsize_de, maxiter=maxiter_de, tol=tol_de, vetorizado=vetorizado_de,
+                                       workers=workers_de, polimento=polimento_de, multifidelidade=multifidelidade_de)
+    else:
+        algoritmo, opcoes = 'dinkelbach', {}
+    k = chave_otimizacao(parametros_i, algoritmo, **opcoes)
+    guardado = cache_resultados().obter(k)
+    if substituto_ativo is not None and algoritmo == 'de':
+        # Cada geração custa uma avaliação polinomial: roda aqui mesmo, e o ótimo é polido com as integrais exatas
+        with st.spinner("Otimizando sobre o substituto..."):
+            resultado_busca, resultado_opt = otimizar_politica_substituto(substituto_ativo, parametros_i)
+        indice_politicas().adicionar(parametros_i, resultado_busca.x, resultado_opt.taxa_custo)
+        st.session_state['resultado_otimizacao'] = resultado_opt
+        st.session_state['conferencia_substituto'] = (resultado_busca.fun_substituto, resultado_opt.taxa_custo)
+    elif guardado is not None:
+        st.session_state['resultado_otimizacao'] = guardado[1]
+    else:
+        # A partida quente muda só o caminho da busca, não o problema: fica fora da chave do cache
+        if algoritmo == 'de' and partida_quente_de:
+            opcoes.update(partida_quente(indice_politicas(), parametros_i))
+        # Roda em segundo plano: a página continua respondendo e mudar um campo não interrompe a busca
+        iniciar_tarefa('tarefa_otimizacao', tarefa_otimizacao, parametros_i, algoritmo, perfil=coletar_perfil,
+                       descricao="Otimização", contexto=dict(chave=k, parametros=parametros_i), **opcoes)
+
+mostrar_tarefa('tarefa_otimizacao', "⏳ Otimização da política QST", concluir_otimizacao)
+
+if 'resultado_otimizacao' in st.session_state:
+    resultado_opt = st.session_state['resultado_otimizacao']
+    Q_opt, S_opt, T_opt = resultado_opt.Q, resultado_opt.S, resultado_opt.T
+
+    st.session_state['Q_opt'] = Q_opt
+    st.session_state['S_opt'] = S_opt
+    st.session_state['T_opt'] = T_opt
+
+    taxa_ot = resultado_opt.taxa_custo
+    MTBOF_opt = resultado_opt.MTBOF
+
+    # Exibe os resultados
+    st.success("Otimização concluída!")
+    st.markdown("### 🔍 Resultados Otimizados")
+    col_res1, col_res2, col_res3, col_res4, col_res5 = st.columns(5)
+    col_res1.metric(label="🕒 Q otimizado", value=f"{Q_opt:.2f}")
+    col_res2.metric(label="🕒 S otimizado", value=f"{S_opt:.2f}")
+    col_res3.metric(label="⏱️ T otimizado", value=f"{T_opt:.2f}")
+    col_res4.metric(label="💰 Custo Mínimo", value=f"{taxa_ot:.4f}")
+    col_res5.metric(label="📈 MTBOF", value=f"{MTBOF_opt:.2f}")
+    if 'conferencia_substituto' in st.session_state:
+        taxa_aprox, taxa_exata = st.session_state.pop('conferencia_substituto')
+        st.caption(f"Busca feita sobre o substituto (taxa aproximada no ótimo do DE: {taxa_aprox:.6f}); "
+                   f"política refinada e conferida com as integrais exatas: {taxa_exata:.6f}.")
+
+# =============================================================================
+# FRONTEIRA DE PARETO CUSTO × MTBOF
+# =============================================================================
+def concluir_pareto(tarefa, resultado):
+    st.session_state['fronteira_pareto'] = resultado
+
+with st.expander("🎯 Fronteira de Pareto: taxa de custo × MTBOF"):
+    cols_par = st.columns(3)
+    tamanho_par = cols_par[0].number_input("Tamanho da população", min_value=20, max_value=1000, value=100, step=10)
+    geracoes_par = cols_par[1].number_input("Número de gerações", min_value=5, max_value=2000, value=100, step=10)
+    workers_par = cols_par[2].number_input("Processos da busca (-1 = todos os núcleos)", min_value=-1, max_value=256,
+                                           value=1, step=1)
+
+    if st.button("🎯 Calcular fronteira"):
+        parametros_par = dict(zip(PARAMETROS, (betax, etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)))
+        # A política de custo mínimo, se já otimizada, entra na população inicial
+        iniciais = None
+        if 'resultado_otimizacao' in st.session_state:
+            r_opt = st.session_state['resultado_otimizacao']
+            if r_opt.S > 0 and r_opt.T > 0:
+                iniciais = [r_opt.Q / r_opt.S, r_opt.S / r_opt.T, r_opt.T]
+        iniciar_tarefa('tarefa_pareto', tarefa_pareto, parametros_par, tamanho=int(tamanho_par),
+                       geracoes=int(geracoes_par), workers=int(workers_par), seed=0, iniciais=iniciais,
+                       descricao="Fronteira de Pareto")
+
+    mostrar_tarefa('tarefa_pareto', "⏳ Fronteira de Pareto", concluir_pareto)
+
+    if 'fronteira_pareto' in st.session_state:
+        fronteira = st.session_state['fronteira_pareto']
+        tabela_par = fronteira.tabela()
+        st.caption(f"{len(tabela_par)} políticas não dominadas entre {fronteira.avaliacoes} avaliadas "
+                   f"em {fronteira.geracoes} gerações.")
+        custo_max_par = st.slider("Mostrar políticas com custo até (× custo mínimo)", 1.05, 10.0, 2.0, 0.05)
+        visiveis = tabela_par[tabela_par['taxa_custo'] <= custo_max_par * tabela_par['taxa_custo'].min()]
+        mtbof_alvo = st.number_input("MTBOF mínimo desejado", min_value=0.0,
+                                     value=float(visiveis['MTBOF'].median()), format="%.4f")
+        k_par = fronteira.escolher(mtbof_alvo)
+
+        pontos = alt.Chart(visiveis).mark_circle(size=30).encode(
+            x=alt.X('MTBOF', scale=alt.Scale(type='log'), title="MTBOF"),
+            y=alt.Y('taxa_custo', scale=alt.Scale(zero=False), title="Taxa de custo"),
+            tooltip=['Q', 'S', 'T', alt.Tooltip('taxa_custo', format='.6f'), alt.Tooltip('MTBOF', format='.4f')])
+        grafico = pontos
+        if k_par is not None:
+            grafico += alt.Chart(tabela_par.iloc[[k_par]]).mark_point(size=200, color='red', shape='diamond').encode(
+                x='MTBOF', y='taxa_custo')
+        st.altair_chart(grafico.interactive(), use_container_width=True)
+
+        if k_par is None:
+            st.warning("Nenhuma política da fronteira alcança esse MTBOF.")
+        else:
+            escolhida = tabela_par.iloc[k_par]
+            col_par1, col_par2, col_par3, col_par4, col_par5 = st.columns(5)
+            col_par1.metric(label="🕒 Q", value=f"{escolhida['Q']:.4f}")
+            col_par2.metric(label="🕒 S", value=f"{escolhida['S']:.4f}")
+            col_par3.metric(label="⏱️ T", value=f"{escolhida['T']:.4f}")
+            col_par4.metric(label="💰 Taxa de custo", value=f"{escolhida['taxa_custo']:.4f}",
+                            delta=f"{100 * (escolhida['taxa_custo'] / tabela_par['taxa_custo'].iloc[0] - 1):.2f}% acima do mínimo",
+                            delta_color="off")
+            col_par5.metric(label="📈 MTBOF", value=f"{escolhida['MTBOF']:.2f}")
+        st.download_button("💾 Baixar fronteira (CSV)", tabela_par.to_csv(index=False), "fronteira_pareto.csv", "text/csv")
+
+# =============================================================================
+# SUPERFÍCIE DA TAXA DE CUSTO
+# =============================================================================
+# Grade avaliada em lote, com os arrays em arquivos temporários (memmap); as bandas de
+# custo adicional mostram o quanto se pode afastar do ótimo pagando até a tolerância
+PLANOS_SUPERFICIE = {"S × T (Q fixo)": ('S', 'T', 'Q'), "pQ × pS (T fixo)": ('pQ', 'pS', 'T'),
+                     "Q × S (T fixo)": ('Q', 'S', 'T'), "pS × T (pQ fixo)": ('pS', 'T', 'pQ')}
+
+def figura_superficie(superficie, tolerancia):
+    x, y = superficie.x, superficie.y
+    taxa = np.ma.masked_invalid(superficie.taxa_custo)
+    mtbof = np.ma.masked_invalid(superficie.MTBOF)
+    x_min, y_min, taxa_min = superficie.minimo
+    excesso = 100 * (taxa / taxa_min - 1)
+    bandas = 100 * tolerancia * np.array([0, 1, 2, 5, 10])
+
+    fig, ax = plt.subplots(1, 3, figsize=(18, 5))
+    for eixo, valores, titulo in ((ax[0], taxa, "Taxa de custo"), (ax[2], mtbof, "MTBOF")):
+        mapa = eixo.pcolormesh(x, y, valores, shading='auto', cmap='viridis')
+        fig.colorbar(mapa, ax=eixo)
+        eixo.contour(x, y, valores, levels=10, colors='white', linewidths=0.6)
+        eixo.set_title(titulo, loc='left', fontsize=12)
+    faixas = ax[1].contourf(x, y, excesso, levels=bandas, cmap='RdYlGn_r', extend='max')
+    fig.colorbar(faixas, ax=ax[1], label="Custo adicional em relação ao mínimo (%)")
+    ax[1].set_title("Bandas de custo adicional", loc='left', fontsize=12)
+    for eixo in ax:
+        eixo.contour(x, y, excesso, levels=[100 * tolerancia], colors='red', linewidths=2)
+        eixo.plot(x_min, y_min, marker='*', color='red', markersize=14)
+        eixo.set_xlabel(superficie.eixo_x)
+        eixo.set_ylabel(superficie.eixo_y)
+    fig.tight_layout()
+    return fig
+
+with st.expander("🗺️ Superfície da taxa de custo em torno do ótimo"):
+    plano = st.selectbox("Plano da grade", list(PLANOS_SUPERFICIE))
+    eixo_x_sup, eixo_y_sup, eixo_fixo_sup = PLANOS_SUPERFICIE[plano]
+    sugerido = 0.0
+    if 'resultado_otimizacao' in st.session_state:
+        r_opt = st.session_state['resultado_otimizacao']
+        sugerido = dict(Q=r_opt.Q, S=r_opt.S, T=r_opt.T, pQ=r_opt.Q / r_opt.S if r_opt.S else 0.0,
+                        pS=r_opt.S / r_opt.T if r_opt.T else 0.0)[eixo_fixo_sup]
+    valor_fixo_sup = st.number_input(f"Valor fixo de {eixo_fixo_sup} (padrão: o da política otimizada)",
+                                     value=float(sugerido), format="%.7f", step=0.0000001)
+    cols_sup = st.columns(3)
+    pontos_sup = cols_sup[0].number_input("Pontos por eixo", min_value=11, max_value=2001, value=101, step=10)
+    refinamentos_sup = cols_sup[1].number_input("Refinamentos em torno do mínimo", min_value=0, max_value=6, value=2, step=1)
+    tolerancia_sup = cols_sup[2].number_input("Tolerância de custo (%)", min_value=0.01, max_value=50.0, value=1.0,
+                                              step=0.5, format="%.2f") / 100
+
+    if st.button("🗺️ Mapear superfície"):
+        parametros_sup = dict(zip(PARAMETROS, (betax, etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)))
+        if 'superficies' in st.session_state:
+            shutil.rmtree(st.session_state.pop('superficies')[0], ignore_errors=True)
+        diretorio_sup = tempfile.mkdtemp(prefix='qst_superficie_')
+        barra_sup = st.progress(0.0)
+        niveis_sup = int(refinamentos_sup) + 1
+        superficies = mapear_superficie(
+            parametros_sup, eixo_x_sup, eixo_y_sup, {eixo_fixo_sup: valor_fixo_sup}, n=(int(pontos_sup), int(pontos_sup)),
+            refinamentos=int(refinamentos_sup), caminho=diretorio_sup,
+            avaliador=substituto_ativo.avaliar_lote if substituto_ativo is not None else avaliar_lote,
+            callback=lambda nivel, feitos, total: barra_sup.progress((nivel + feitos / total) / niveis_sup,
+                                                                     text=f"Nível {nivel}: {feitos} de {total} políticas"))
+        st.session_state['superficies'] = (diretorio_sup, superficies)
+
+    if 'superficies' in st.session_state:
+        _, superficies = st.session_state['superficies']
+        nivel_sup = st.radio("Nível de refinamento", range(len(superficies)), horizontal=True,
+                             format_func=lambda k: "grade inicial" if k == 0 else f"refinamento {k}")
+        superficie = superficies[nivel_sup]
+        x_min, y_min, taxa_min = superficie.minimo
+        (nome_fixo, valor_fixo), = superficie.fixos.items()
+        _, (x_ini, x_fim), (y_ini, y_fim) = janela_tolerancia(superficie, tolerancia_sup)
+        st.markdown(f"Mínimo da grade: **{superficie.eixo_x} = {x_min:.4f}**, **{superficie.eixo_y} = {y_min:.4f}**, "
+                    f"taxa de custo **{taxa_min:.6f}** ({nome_fixo} = {valor_fixo:.4f}).")
+        st.markdown(f"Janela de tolerância ({100 * tolerancia_sup:.2f}% acima do mínimo): "
+                    f"{superficie.eixo_x} ∈ [{x_ini:.4f}, {x_fim:.4f}], {superficie.eixo_y} ∈ [{y_ini:.4f}, {y_fim:.4f}]"
+                    + (" (toca a borda da grade: veja um nível mais grosso)" if nivel_sup and
+                       (x_ini == superficie.x[0] or x_fim == superficie.x[-1] or
+                        y_ini == superficie.y[0] or y_fim == superficie.y[-1]) else ""))
+        fig = figura_superficie(superficie, tolerancia_sup)
+        buf = io.BytesIO()
+        fig.savefig(buf, format="png")
+        plt.close(fig)
+        buf.seek(0)
+        st.image(buf)
+
+# =============================================================================
+# OTIMIZAÇÃO EM LOTE (FROTA)
+# =============================================================================
+# Resultados guardados por id: um clique após interrupção retoma de onde parou
+if 'frota_resultados' not in st.session_state:
+    st.session_state['frota_resultados'] = {}
+
+with st.expander("🏭 Otimização em lote para um cadastro de componentes"):
+    st.markdown("Arquivo CSV ou Parquet com as colunas " + ", ".join(PARAMETROS) + " e, opcionalmente, id.")
+    arquivo_frota = st.file_uploader("Cadastro de componentes", type=["csv", "parquet"])
+    workers_frota = st.number_input("Número de processos para o lote (-1 = todos os núcleos)", min_value=-1, max_value=256, value=-1, step=1)
+
+    if arquivo_frota is not None and st.button("🚀 Otimizar cadastro"):
+        componentes = ler_componentes(arquivo_frota)
+        resultados_frota = st.session_state['frota_resultados']
+        progresso = st.progress(0.0)
+        for resultado in otimizar_componentes(componentes, workers_frota, set(resultados_frota),
+                                              indice_politicas() if partida_quente_de else None,
+                                              popsize=popsize_de, maxiter=maxiter_de, tol=tol_de):
+            resultados_frota[resultado['id']] = resultado
+            progresso.progress(min(len(resultados_frota) / len(componentes), 1.0))
+        st.success("Otimização do cadastro concluída!")
+        com_erro = [r['id'] for r in resultados_frota.values() if 'erro' in r]
+        if com_erro:
+            st.warning(f"{len(com_erro)} componente(s) não otimizado(s) (ver coluna 'erro'): {', '.join(com_erro[:20])}")
+
+    if st.session_state['frota_resultados']:
+        tabela_frota = pd.DataFrame(list(st.session_state['frota_resultados'].values()))
+        st.dataframe(tabela_frota)
+        st.download_button("💾 Baixar resultados (CSV)", tabela_frota.to_csv(index=False), "resultados_frota.csv", "text/csv")
 
 # =============================================================================
 # AVALIAR POLÍTICA DEFINIDA MANUALMENTE
@@ -515,9 +476,17 @@ T_manual = st.number_input("Valor de T (substituição programada)", format="%.7
 
 # Botão para calcular o desempenho da política manual
 if st.button("📊 Avaliar política pré-definida"):
-    with st.spinner("🔍 Calculando desempenho da política..."):
-        taxa_manual = taxa_custo(Q_manual, S_manual, T_manual, betax, etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
-        MTBOF_manual = MTBOF(Q_manual, S_manual, T_manual, betax, etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)
+    with st.spinner("🔍 Calculando desempenho da política..."), (perfilar() if coletar_perfil else nullcontext()) as perfil:
+        parametros_manual = dict(zip(PARAMETROS, (betax, etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)))
+        if substituto_ativo is not None:
+            (taxa_manual,), (MTBOF_manual,) = substituto_ativo(Q_manual, S_manual, T_manual, parametros_manual)
+        else:
+            resultado_manual = avaliar_politica_cache(Q_manual, S_manual, T_manual, parametros_manual, metodo='compilado',
+                                                      cache=cache_resultados())
+            taxa_manual = resultado_manual.taxa_custo
+            MTBOF_manual = resultado_manual.MTBOF
+    if perfil:
+        st.session_state['perfil'] = ("Avaliar", perfil)
     
     st.session_state['Q_manual'] = Q_manual
     st.session_state['S_manual'] = S_manual
@@ -527,47 +496,40 @@ if st.button("📊 Avaliar política pré-definida"):
     colm1, colm2 = st.columns(2)
     colm1.metric(label="💰 Taxa de Custo", value=f"{taxa_manual:.4f}")
     colm2.metric(label="📈 MTBOF", value=f"{MTBOF_manual:.2f}")
-
-# =============================================================================
-# FUNÇÃO DA ANÁLISE DE SENSIBILIDADE (com MTBOF incluído)
-# =============================================================================
-def analise_sensibilidade(Q, S, T, parametros_base, n_simulacoes, variacoes_parametros=None, parametros_alvo=None):
-    if parametros_alvo is None:
-        parametros_alvo = list(parametros_base.keys())
-
-    if variacoes_parametros is None:
-        variacoes_parametros = {param: 0.1 for param in parametros_alvo}
-
-    resultados = []
-    parametros_iniciais = {param: parametros_base[param] for param in parametros_alvo}
-    parametros_finais = {param: [] for param in parametros_alvo}
-
-    for _ in range(n_simulacoes):
-        parametros_simulados = parametros_base.copy()
-        for param in parametros_alvo:
-            variacao = variacoes_parametros.get(param, 0.1)
-            perturbacao = np.random.uniform(1 - variacao, 1 + variacao)
-            parametros_simulados[param] *= perturbacao
-            parametros_finais[param].append(parametros_simulados[param])
-
-        custo = taxa_custo(Q, S, T, **parametros_simulados)
-        mtbof = MTBOF(Q, S, T, **parametros_simulados)
-
-        resultados.append({'Custo': custo, 'MTBOF': mtbof})
-
-    df_resultados = pd.DataFrame(resultados)
-    estatisticas = df_resultados.agg(['mean', 'std']).T
-    estatisticas.columns = ['Média', 'Desvio Padrão']
-
-    parametros_finais = {param: np.mean(valores) for param, valores in parametros_finais.items()}
-
-    return df_resultados, estatisticas, parametros_iniciais, parametros_finais
+    if substituto_ativo is not None:
+        st.caption("Valores do substituto (erro relativo máximo na validação: "
+                   f"{substituto_ativo.erro_validacao.get('taxa_custo_rel', float('nan')):.1e} na taxa de custo); "
+                   "desmarque o modo substituto para o cálculo exato.")
+
+with st.expander("🎲 Verificação da política pré-definida por simulação"):
+    n_ciclos_sim = st.number_input("Número de ciclos simulados", min_value=10_000, max_value=100_000_000,
+                                   value=1_000_000, step=100_000)
+    workers_sim = st.number_input("Processos da simulação (-1 = todos os núcleos)", min_value=-1, max_value=256,
+                                  value=1, step=1)
+    semente_sim = st.number_input("Semente", min_value=0, value=0, step=1)
+    if st.button("🎲 Simular política"):
+        with st.spinner("Simulando ciclos de renovação..."):
+            parametros_sim = dict(zip(PARAMETROS, (betax, etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)))
+            analitico = avaliar_politica_cache(Q_manual, S_manual, T_manual, parametros_sim, metodo='compilado',
+                                               cache=cache_resultados())
+            simulado = simular_politica(Q_manual, S_manual, T_manual, parametros_sim, n_ciclos=int(n_ciclos_sim),
+                                        workers=int(workers_sim), seed=int(semente_sim))
+        linhas = [("Taxa de custo", analitico.taxa_custo, simulado.taxa_custo, *simulado.ic_taxa_custo),
+                  ("MTBOF", analitico.MTBOF, simulado.MTBOF, *simulado.ic_MTBOF)]
+        linhas += [(f"P{k + 1}", analitico.P[k], simulado.frequencias[k], *simulado.ic_frequencias[k]) for k in range(12)]
+        comparacao = pd.DataFrame(linhas, columns=["Medida", "Analítico", "Simulado", "IC 95% inferior", "IC 95% superior"])
+        comparacao["Dentro do IC"] = comparacao["Analítico"].between(comparacao["IC 95% inferior"], comparacao["IC 95% superior"])
+        st.dataframe(comparacao)
 
 # =============================================================================
 # ANÁLISE DE SENSIBILIDADE - INTERFACE (com MTBOF incluído)
 # =============================================================================
 st.subheader("📉 Análise de Sensibilidade para política pré-definida.")
-n_simulacoes = st.number_input("Tamanho da amostra", min_value=100, max_value=500, value=100, step=100)
+n_simulacoes = st.number_input("Tamanho máximo da amostra", min_value=100, max_value=100000, value=1000, step=100)
+amostragem = st.selectbox("Amostragem", ["uniforme", "sobol", "lhs"],
+                          format_func={"uniforme": "Monte Carlo", "sobol": "Sobol (quasi-Monte Carlo)", "lhs": "Hipercubo latino"}.get)
+largura_ic = st.number_input("Parar quando o IC 95% da média tiver largura relativa de (0 = usar toda a amostra)",
+                             min_value=0.0, max_value=1.0, value=0.0, step=0.001, format="%.3f")
 
 # Seleção dos parâmetros a serem variáveis
 st.markdown("### Selecione os Parâmetros com imprecisão na estimativa (%)")
@@ -579,7 +541,9 @@ for param in parametros_disponiveis:
     with col1:
         incluir = st.checkbox(f"{param}", value=True)
     with col2:
-        variacao = st.slider(f"Nível de imprecisão para {param}", 1, 100, 10, 1) / 100 if incluir else 0
+        # O padrão de 10% é substituído pela imprecisão estimada do histórico, se houver
+        st.session_state.setdefault(f'imprecisao_{param}', 10)
+        variacao = st.slider(f"Nível de imprecisão para {param}", 1, 100, step=1, key=f'imprecisao_{param}') / 100 if incluir else 0
         variacoes_parametros[param] = variacao
 
 # Valores ótimos da política pré-definida
@@ -587,65 +551,142 @@ Q_usado = st.session_state['Q_manual']
 S_usado = st.session_state['S_manual']
 T_usado = st.session_state['T_manual']
 
+def concluir_sensibilidade(tarefa, resultado):
+    df_resultados, estatisticas, parametros_iniciais, parametros_finais = resultado
+    st.session_state['resultado_sensibilidade'] = (df_resultados, estatisticas)
+
 if st.button("🚀 Iniciar Análise de Sensibilidade"):
-    with st.spinner("⏳ Executando a análise de sensibilidade..."):
-        parametros_base = {
-            'betax': betax, 'etax': etax, 'betah': betah, 'etah': etah,
-            'lambd': lambd, 'Ci': Ci, 'Co': Co, 'Cp': Cp, 'Cf': Cf, 'Dp': Dp, 'Df': Df
-        }
-
-        #GARANTIR DOWNTIME MÍNIMO
-        downtime_minimo = 1e-6
-        parametros_base['Dp'] = max(parametros_base['Dp'], downtime_minimo)
-        parametros_base['Df'] = max(parametros_base['Df'], downtime_minimo)
-
-        df_resultados, estatisticas, parametros_iniciais, parametros_finais = analise_sensibilidade(
-            Q_usado, S_usado, T_usado,
-            parametros_base,
-            n_simulacoes=n_simulacoes,
-            variacoes_parametros=variacoes_parametros,
-            parametros_alvo=parametros_disponiveis
-        )
-
-        # Renomear coluna se necessário
-        estatisticas.rename(columns={"Desvio Padrão": "Desvio-padrão", "Desvio": "Desvio-padrão"}, inplace=True)
-
-        st.subheader("Box-plots dos Resultados")
-
-        fig, ax = plt.subplots(1, 2, figsize=(12, 5))
-
-        # Boxplot da Taxa de Custo
-        ax[0].boxplot(df_resultados['Custo'], vert=False, patch_artist=True, boxprops=dict(facecolor='skyblue'))
-        media_custo = df_resultados['Custo'].mean()
-        std_custo = df_resultados['Custo'].std()
-        ax[0].set_title('Box-plot para taxa de custo', loc='left', fontsize=12, color='black')
-        ax[0].text(0.01, 1.25,
-                   f"Média = {media_custo:.4f}\nDesvio-padrão = {std_custo:.4f}",
-                   transform=ax[0].transAxes,
-                   fontsize=10,
-                   color='black',
-                   verticalalignment='top',
-                   horizontalalignment='left')
-
-        # Boxplot do MTBOF
-        ax[1].boxplot(df_resultados['MTBOF'], vert=False, patch_artist=True, boxprops=dict(facecolor='lightgreen'))
-        media_mtbof = df_resultados['MTBOF'].mean()
-        std_mtbof = df_resultados['MTBOF'].std()
-        ax[1].set_title('Box-plot para tempo médio entre eventos de falha', loc='left', fontsize=12, color='black')
-        ax[1].text(0.01, 1.25,
-                   f"Média = {media_mtbof:.4f}\nDesvio-padrão = {std_mtbof:.4f}",
-                   transform=ax[1].transAxes,
-                   fontsize=10,
-                   color='black',
-                   verticalalignment='top',
-                   horizontalalignment='left')
+    parametros_base = {
+        'betax': betax, 'etax': etax, 'betah': betah, 'etah': etah,
+        'lambd': lambd, 'Ci': Ci, 'Co': Co, 'Cp': Cp, 'Cf': Cf, 'Dp': Dp, 'Df': Df
+    }
+
+    #GARANTIR DOWNTIME MÍNIMO
+    downtime_minimo = 1e-6
+    parametros_base['Dp'] = max(parametros_base['Dp'], downtime_minimo)
+    parametros_base['Df'] = max(parametros_base['Df'], downtime_minimo)
+
+    iniciar_tarefa('tarefa_sensibilidade', tarefa_sensibilidade,
+        Q_usado, S_usado, T_usado,
+        parametros_base,
+        n_simulacoes,
+        variacoes_parametros=variacoes_parametros,
+        parametros_alvo=parametros_disponiveis,
+        amostragem=amostragem,
+        largura_ic=largura_ic or None,
+        descricao="Análise de sensibilidade"
+    )
+
+mostrar_tarefa('tarefa_sensibilidade', "⏳ Análise de sensibilidade", concluir_sensibilidade)
+
+if 'resultado_sensibilidade' in st.session_state:
+    df_resultados, estatisticas = st.session_state['resultado_sensibilidade']
+    st.caption(f"Amostra avaliada: {len(df_resultados)} simulações")
+
+    # Renomear coluna se necessário
+    estatisticas.rename(columns={"Desvio Padrão": "Desvio-padrão", "Desvio": "Desvio-padrão"}, inplace=True)
+
+    st.subheader("Box-plots dos Resultados")
+
+    fig, ax = plt.subplots(1, 2, figsize=(12, 5))
+
+    # Boxplot da Taxa de Custo
+    ax[0].boxplot(df_resultados['Custo'], vert=False, patch_artist=True, boxprops=dict(facecolor='skyblue'))
+    media_custo = df_resultados['Custo'].mean()
+    std_custo = df_resultados['Custo'].std()
+    ax[0].set_title('Box-plot para taxa de custo', loc='left', fontsize=12, color='black')
+    ax[0].text(0.01, 1.25,
+               f"Média = {media_custo:.4f}\nDesvio-padrão = {std_custo:.4f}",
+               transform=ax[0].transAxes,
+               fontsize=10,
+               color='black',
+               verticalalignment='top',
+               horizontalalignment='left')
+
+    # Boxplot do MTBOF
+    ax[1].boxplot(df_resultados['MTBOF'], vert=False, patch_artist=True, boxprops=dict(facecolor='lightgreen'))
+    media_mtbof = df_resultados['MTBOF'].mean()
+    std_mtbof = df_resultados['MTBOF'].std()
+    ax[1].set_title('Box-plot para tempo médio entre eventos de falha', loc='left', fontsize=12, color='black')
+    ax[1].text(0.01, 1.25,
+               f"Média = {media_mtbof:.4f}\nDesvio-padrão = {std_mtbof:.4f}",
+               transform=ax[1].transAxes,
+               fontsize=10,
+               color='black',
+               verticalalignment='top',
+               horizontalalignment='left')
+
+    fig.tight_layout()
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png")
+    plt.close(fig)
+    buf.seek(0)
+    st.image(buf)
+    st.dataframe(estatisticas)
 
+# =============================================================================
+# VARREDURA UM PARÂMETRO DE CADA VEZ (TORNADO)
+# =============================================================================
+st.markdown("### 🌪️ Varredura um parâmetro de cada vez")
+st.caption("Cada parâmetro selecionado acima varia sozinho na sua faixa de imprecisão, com os demais no valor "
+           "base; todos os pontos são avaliados num só lote. Elasticidade: variação percentual da medida por 1% "
+           "de variação do parâmetro, no ponto base.")
+n_pontos_varredura = st.number_input("Pontos por parâmetro", min_value=3, max_value=51, value=5, step=2)
+
+if st.button("🌪️ Executar varredura"):
+    parametros_base = dict(zip(PARAMETROS, (betax, etax, betah, etah, lambd, Ci, Co, Cp, Cf, Dp, Df)))
+    parametros_base['Dp'] = max(parametros_base['Dp'], 1e-6)
+    parametros_base['Df'] = max(parametros_base['Df'], 1e-6)
+    with st.spinner("Avaliando a varredura..."):
+        st.session_state['resultado_tornado'] = varredura_uma_a_uma(
+            Q_usado, S_usado, T_usado, parametros_base, variacoes_parametros, parametros_disponiveis,
+            n_pontos=int(n_pontos_varredura))
+
+if 'resultado_tornado' in st.session_state:
+    pontos_tornado, tornado = st.session_state['resultado_tornado']
+    if tornado.empty:
+        st.info("Nenhum parâmetro selecionado para a varredura.")
+    else:
+        fig, ax = plt.subplots(1, 2, figsize=(12, 0.45 * len(tornado) + 1.5))
+        for eixo, medida, titulo in ((ax[0], 'Custo', 'Taxa de custo'), (ax[1], 'MTBOF', 'MTBOF')):
+            # Cada medida em ordem da própria amplitude, a maior no topo
+            ordem = tornado.sort_values(f'Amplitude {medida}')
+            base_medida = tornado.attrs['base'][medida]
+            posicoes = np.arange(len(ordem))
+            eixo.barh(posicoes, ordem[f'{medida} no mínimo'] - base_medida, left=base_medida, color='tab:blue',
+                      label='parâmetro no mínimo da faixa')
+            eixo.barh(posicoes, ordem[f'{medida} no máximo'] - base_medida, left=base_medida, color='tab:orange',
+                      alpha=0.8, label='parâmetro no máximo da faixa')
+            eixo.axvline(base_medida, color='black', linewidth=1)
+            eixo.set_yticks(posicoes, ordem.index)
+            eixo.set_title(f'{titulo} (base = {base_medida:.4g})', loc='left', fontsize=12)
+        ax[0].legend(loc='lower right', fontsize=8)
         fig.tight_layout()
         buf = io.BytesIO()
         fig.savefig(buf, format="png")
         plt.close(fig)
         buf.seek(0)
         st.image(buf)
+        st.dataframe(tornado)
+        with st.expander("Pontos da varredura"):
+            st.dataframe(pontos_tornado)
+
+if 'perfil' in st.session_state:
+    with st.expander("⏱️ Perfil de desempenho"):
+        origem_perfil, perfil = st.session_state['perfil']
+        st.caption(f"Última execução perfilada: {origem_perfil}. Tempos inclusivos por seção; avaliações do integrando "
+                   "contadas nas integrais adaptativas (resultados vindos do cache não fazem integrais).")
+        st.dataframe(perfil.tabela())
+        for nome, secao in perfil.como_dict().items():
+            for aviso in secao['avisos']:
+                st.warning(f"{nome}: {aviso}")
+        st.download_button("💾 Baixar perfil (JSON)", perfil.para_json(), "perfil_qst.json", "application/json")
+
+with st.expander("🗄️ Estatísticas do cache de resultados"):
+    st.json(cache_resultados().estatisticas())
+    st.caption(f"Otimizações no índice de partida quente: {len(indice_politicas())}")
+    if st.button("Limpar cache"):
+        cache_resultados().limpar()
 
 # =============================================================================
 # Rodapé
@@ -0,0 +1,65 @@
+"""Chave canônica e CacheResultados (LRU em memória e persistência em SQLite)."""
+import numpy as np
+
+from qst import PARAMETROS, CacheResultados, avaliar_politica_cache, canonico, chave, chave_otimizacao
+
+PARAMETROS_ = dict(zip(PARAMETROS, [3, 3, 2, 1, 1, .05, .8, 1, 10, .01, .1]))
+
+def test_chave_canonica():
+    # Tipos numéricos diferentes e ordem das opções não mudam a chave
+    k = chave('avaliacao', PARAMETROS_, (1, 2, 3), metodo='reduzido', n=10)
+    parametros_np = {p: np.float64(v) for p, v in reversed(list(PARAMETROS_.items()))}
+    assert chave('avaliacao', parametros_np, np.array([1.0, 2.0, 3.0]), n=10.0, metodo='reduzido') == k
+    assert chave('avaliacao', PARAMETROS_, (1, 2, 3.001), metodo='reduzido', n=10) != k
+    assert chave('avaliacao', PARAMETROS_, (1, 2, 3), metodo='quad', n=10) != k
+    assert chave('otimizacao', PARAMETROS_, (1, 2, 3), metodo='reduzido', n=10) != k
+    assert chave('avaliacao', dict(PARAMETROS_, Cf=11), (1, 2, 3), metodo='reduzido', n=10) != k
+
+def test_chave_otimizacao_ignora_workers():
+    assert chave_otimizacao(PARAMETROS_, 'de', seed=1, workers=4) == chave_otimizacao(PARAMETROS_, 'de', seed=1)
+    assert chave_otimizacao(PARAMETROS_, 'de', seed=1) != chave_otimizacao(PARAMETROS_, 'de', seed=2)
+
+def test_despejo_lru():
+    cache = CacheResultados(capacidade=2)
+    cache.guardar('a', 1)
+    cache.guardar('b', 2)
+    assert cache.obter('a') == 1  # 'a' passa a ser o mais recente
+    cache.guardar('c', 3)
+    assert cache.obter('b') is None
+    assert cache.obter('a') == 1 and cache.obter('c') == 3
+    e = cache.estatisticas()
+    assert (e['acertos_memoria'], e['faltas'], e['itens_memoria']) == (3, 1, 2)
+
+def test_persistencia_sqlite(tmp_path):
+    caminho = str(tmp_path / 'cache.sqlite')
+    cache = CacheResultados(caminho=caminho)
+    resultado = avaliar_politica_cache(0.5, 1.5, 2.5, PARAMETROS_, metodo='reduzido', cache=cache)
+    cache.banco.close()
+
+    # Nova sessão: o resultado volta do disco, igual ao original
+    reaberto = CacheResultados(caminho=caminho)
+    k = chave('avaliacao', PARAMETROS_, (0.5, 1.5, 2.5), metodo='reduzido')
+    lido = reaberto.obter(k)
+    assert lido.taxa_custo == resultado.taxa_custo
+    np.testing.assert_array_equal(lido.EC, resultado.EC)
+    assert reaberto.estatisticas()['acertos_disco'] == 1
+    assert reaberto.obter(k) is lido  # promovido à memória
+    assert reaberto.estatisticas()['acertos_memoria'] == 1
+
+def test_despejo_disco(tmp_path):
+    cache = CacheResultados(capacidade=1, caminho=str(tmp_path / 'cache.sqlite'), capacidade_disco=2)
+    for i, k in enumerate('abc'):
+        cache.guardar(k, i)
+    assert cache.estatisticas()['itens_disco'] == 2
+    assert cache.obter('a') is None
+    assert cache.obter('b') == 1
+    cache.limpar()
+    assert cache.estatisticas()['itens_disco'] == 0
+
+def test_chave_com_listas():
+    # Opções em listas (iniciais, limites_busca) vindas do JSON ou de arrays dão a mesma chave
+    k = chave_otimizacao(PARAMETROS_, 'de', iniciais=[[0.4, 0.8, 1.9]], limites_busca=[[0, 1], [0, 1], [0.5, 3]])
+    assert chave_otimizacao(PARAMETROS_, 'de', iniciais=np.array([[0.4, 0.8, 1.9]]),
+                            limites_busca=[(0.0, 1.0), (0, 1), (np.float64(0.5), 3)]) == k
+    assert chave_otimizacao(PARAMETROS_, 'de', iniciais=[[0.4, 0.8, 2.0]], limites_busca=[[0, 1], [0, 1], [0.5, 3]]) != k
+    assert canonico({'b': (1, 2), 'a': {'y': None, 'x': '1'}}) == [('a', [('x', '1'), ('y', None)]), ('b', [1.0, 2.0])]
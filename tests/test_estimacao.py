@@ -0,0 +1,70 @@
+"""Máxima verossimilhança da Weibull com censura à direita, em blocos, sobre dados sintéticos."""
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.optimize import minimize
+
+from qst.estimacao import ajustar_historico, ajustar_weibull
+
+def historico(n=20000, betax=3.0, etax=2.0, betah=0.8, etah=0.5, seed=0):
+    """Defeitos X e atrasos H Weibull, censurados por tempos de saída exponenciais"""
+    rng = np.random.default_rng(seed)
+    X = etax * rng.weibull(betax, n)
+    saida = rng.exponential(2 * etax, n)
+    defeito = X <= saida
+    H = etah * rng.weibull(betah, n)
+    substituicao = rng.exponential(2 * etah, n)
+    return pd.DataFrame({
+        'tempo_defeito': np.minimum(X, saida),
+        'defeito_observado': defeito.astype(int),
+        'atraso_falha': np.where(defeito, np.minimum(H, substituicao), np.nan),
+        'falha_observada': np.where(defeito, H <= substituicao, 0).astype(int),
+    })
+
+def mle_direto(t, evento):
+    """Máximo da log-verossimilhança censurada por otimização direta em (ln β, ln η)"""
+    def menos_ell(u):
+        beta, eta = np.exp(u)
+        z = t / eta
+        return -(np.sum(np.log(beta / eta) + (beta - 1) * np.log(z[evento])) - np.sum(z**beta))
+    return np.exp(minimize(menos_ell, [0.0, np.log(t.mean())], method='BFGS', options={'gtol': 1e-8}).x)
+
+@pytest.fixture(scope='module')
+def dados():
+    return historico()
+
+def test_igual_ao_mle_direto(dados):
+    ajustes = ajustar_weibull(lambda: [dados])
+    for v, (tempo, evento) in {'X': ('tempo_defeito', 'defeito_observado'),
+                               'H': ('atraso_falha', 'falha_observada')}.items():
+        validas = dados[tempo] > 0
+        beta, eta = mle_direto(dados[tempo][validas].to_numpy(), dados[evento][validas].to_numpy() > 0)
+        assert ajustes[v].convergiu
+        assert ajustes[v].beta == pytest.approx(beta, rel=1e-6)
+        assert ajustes[v].eta == pytest.approx(eta, rel=1e-6)
+
+def test_recupera_parametros_verdadeiros(dados):
+    ajustes = ajustar_weibull(lambda: [dados])
+    for v, (beta, eta) in {'X': (3.0, 2.0), 'H': (0.8, 0.5)}.items():
+        a = ajustes[v]
+        assert abs(a.beta - beta) < 4 * a.ep_beta and abs(a.eta - eta) < 4 * a.ep_eta
+        (b_inf, b_sup), (e_inf, e_sup) = a.intervalo(0.9999)
+        assert b_inf < beta < b_sup and e_inf < eta < e_sup
+    assert ajustes['X'].n == len(dados) and ajustes['X'].eventos == dados['defeito_observado'].sum()
+    assert ajustes['H'].n == dados['defeito_observado'].sum()
+
+def test_blocos_iguais_a_um_bloco(dados, tmp_path):
+    caminho = tmp_path / 'historico.csv'
+    dados.to_csv(caminho, index=False)
+    inteiro = ajustar_weibull(lambda: [dados])
+    ajustes, parametros = ajustar_historico(str(caminho), tamanho_bloco=3000)
+    for v in ('X', 'H'):
+        assert ajustes[v].beta == pytest.approx(inteiro[v].beta, rel=1e-9)
+        assert ajustes[v].eta == pytest.approx(inteiro[v].eta, rel=1e-9)
+    assert parametros == pytest.approx({'betax': inteiro['X'].beta, 'etax': inteiro['X'].eta,
+                                        'betah': inteiro['H'].beta, 'etah': inteiro['H'].eta})
+
+def test_sem_eventos():
+    dados = pd.DataFrame({'tempo_defeito': [1.0, 2.0], 'defeito_observado': [0, 0]})
+    with pytest.raises(ValueError):
+        ajustar_weibull(lambda: [dados], {'X': ('tempo_defeito', 'defeito_observado')})
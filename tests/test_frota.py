@@ -0,0 +1,101 @@
+"""Otimização da frota com gravação contínua e retomada após interrupção."""
+import csv
+import io
+
+import pytest
+
+from qst import PARAMETROS, otimizar_frota
+from qst.frota import COLUNAS_SAIDA, SUFIXO_ERROS, ler_concluidos
+
+OPCOES = dict(popsize=5, maxiter=5, seed=0)
+
+def escrever_cadastro(caminho, n=3):
+    with open(caminho, 'w', newline='') as arquivo:
+        escritor = csv.writer(arquivo)
+        escritor.writerow(['id', *PARAMETROS])
+        for i in range(n):
+            escritor.writerow([f'c{i}', 2 + i / 2, 3, 2, 1, 1, .05, .8, 1, 10, .01, .1])
+
+def ler_saida(caminho):
+    with open(caminho, newline='') as arquivo:
+        return list(csv.DictReader(arquivo))
+
+@pytest.fixture
+def cadastro(tmp_path):
+    caminho = tmp_path / 'componentes.csv'
+    escrever_cadastro(caminho)
+    return str(caminho)
+
+def test_retomada_refaz_so_o_que_falta(cadastro, tmp_path):
+    saida = str(tmp_path / 'resultados.csv')
+    assert otimizar_frota(cadastro, saida, **OPCOES) == 3
+    assert otimizar_frota(cadastro, saida, **OPCOES) == 0
+    linhas = ler_saida(saida)
+    assert sorted(l['id'] for l in linhas) == ['c0', 'c1', 'c2']
+    assert all(float(l['taxa_custo']) > 0 for l in linhas)
+
+def test_retomada_apos_linha_cortada(cadastro, tmp_path):
+    saida = str(tmp_path / 'resultados.csv')
+    otimizar_frota(cadastro, saida, **OPCOES)
+    with open(saida, newline='') as arquivo:
+        texto = arquivo.read()
+    # Interrupção no meio do último número: todas as colunas presentes, sem quebra de linha
+    cortado = texto.rstrip('\r\n')[:-2]
+    with open(saida, 'w', newline='') as arquivo:
+        arquivo.write(cortado)
+    ultimo = cortado.splitlines()[-1].split(',')[0]
+
+    assert otimizar_frota(cadastro, saida, **OPCOES) == 1
+    linhas = ler_saida(saida)
+    assert sorted(l['id'] for l in linhas) == ['c0', 'c1', 'c2']
+    assert all(None not in l and len(l) == len(COLUNAS_SAIDA) for l in linhas)
+    refeita = next(l for l in linhas if l['id'] == ultimo)
+    original = {l['id']: l for l in csv.DictReader(io.StringIO(texto))}[ultimo]
+    assert float(refeita['MTBOF']) == pytest.approx(float(original['MTBOF']))
+
+def test_ler_concluidos_descarta_linhas_incompletas(tmp_path):
+    saida = tmp_path / 'resultados.csv'
+    saida.write_text('id,Q,S,T,taxa_custo,MTBOF\r\n'
+                     'a,0.1,0.2,1,1.5,10\r\n'
+                     'b,0.1,0.2\r\n'
+                     'c,0.1,0.2,1,1.5,10,d,0.1\r\n'
+                     'e,0.1,0.2,1,1.5,1', newline='')
+    assert ler_concluidos(str(saida)) == {'a'}
+    assert saida.read_text() == 'id,Q,S,T,taxa_custo,MTBOF\n' 'a,0.1,0.2,1,1.5,10\n'
+    assert ler_concluidos(str(saida)) == {'a'}
+
+def test_ler_concluidos_cabecalho_cortado(tmp_path):
+    saida = tmp_path / 'resultados.csv'
+    saida.write_text('id,Q,S')
+    assert ler_concluidos(str(saida)) == set()
+    assert saida.read_text().splitlines() == [','.join(COLUNAS_SAIDA)]
+
+def test_linha_invalida_nao_interrompe_o_lote(tmp_path):
+    cadastro = tmp_path / 'componentes.csv'
+    escrever_cadastro(cadastro)
+    linhas = cadastro.read_text().splitlines()
+    campos = linhas[2].split(',')
+    campos[1 + PARAMETROS.index('etax')] = ''
+    linhas[2] = ','.join(campos)
+    cadastro.write_text('\n'.join(linhas) + '\n')
+    saida = str(tmp_path / 'resultados.csv')
+
+    assert otimizar_frota(str(cadastro), saida, **OPCOES) == 2
+    assert sorted(l['id'] for l in ler_saida(saida)) == ['c0', 'c2']
+    erros = ler_saida(saida + SUFIXO_ERROS)
+    assert [l['id'] for l in erros] == ['c1'] and 'etax' in erros[0]['erro']
+    # A retomada pula o componente com erro em vez de parar nele de novo
+    assert otimizar_frota(str(cadastro), saida, **OPCOES) == 0
+    assert len(ler_saida(saida + SUFIXO_ERROS)) == 1
+
+def test_falha_na_otimizacao_vira_linha_de_erro(cadastro, tmp_path):
+    saida = str(tmp_path / 'resultados.csv')
+    # iniciais com forma errada: otimizar_politica levanta exceção no processo do pool
+    assert otimizar_frota(cadastro, saida, iniciais=[[0.5, 0.5]], **OPCOES) == 0
+    assert sorted(l['id'] for l in ler_saida(saida + SUFIXO_ERROS)) == ['c0', 'c1', 'c2']
+    assert ler_saida(saida) == []
+
+def test_sem_erros_sem_arquivo_de_erros(cadastro, tmp_path):
+    saida = str(tmp_path / 'resultados.csv')
+    otimizar_frota(cadastro, saida, **OPCOES)
+    assert not (tmp_path / ('resultados.csv' + SUFIXO_ERROS)).exists()
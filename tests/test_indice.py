@@ -0,0 +1,74 @@
+"""Índice de políticas ótimas: vizinhos mais próximos, persistência e partida quente."""
+import numpy as np
+import pytest
+
+from qst import PARAMETROS, IndicePoliticas, partida_quente
+
+BASE = dict(zip(PARAMETROS, [3, 3, 2, 1, 1, .05, .8, 1, 10, .01, .1]))
+
+def variantes(n, seed=0):
+    """n conjuntos de parâmetros perto de BASE, cada um com um ótimo fictício"""
+    rng = np.random.default_rng(seed)
+    for i in range(n):
+        parametros = {p: v * np.exp(rng.normal(0, 0.3)) for p, v in BASE.items()}
+        yield parametros, [rng.random(), rng.random(), rng.random() * (parametros['etax'] + parametros['etah'])], i
+
+@pytest.fixture
+def indice():
+    indice = IndicePoliticas()
+    for parametros, x, taxa in variantes(40):
+        indice.adicionar(parametros, x, taxa)
+    return indice
+
+def test_vizinhos_iguais_a_forca_bruta(indice):
+    consulta = dict(BASE, Cf=12)
+    encontrados = indice.vizinhos(consulta, k=5, distancia_max=np.inf)
+
+    P = np.array(indice.parametros)
+    escala = np.median(np.abs(P), axis=0)
+    ponto = np.array([consulta[p] for p in PARAMETROS])
+    distancias = np.linalg.norm(np.arcsinh(P / escala) - np.arcsinh(ponto / escala), axis=1)
+    esperados = np.argsort(distancias)[:5]
+    assert [taxa for _, _, taxa in encontrados] == [indice.taxas[i] for i in esperados]
+    np.testing.assert_allclose([d for d, _, _ in encontrados], distancias[esperados])
+
+def test_vizinho_na_escala_de_tempo_da_consulta():
+    indice = IndicePoliticas()
+    indice.adicionar(BASE, [0.2, 0.7, 2.0], 1.0)
+    # Mesmos parâmetros com o dobro das escalas de tempo: T do vizinho dobra, pQ e pS não
+    (d, x, taxa), = indice.vizinhos(dict(BASE, etax=6, etah=2), distancia_max=np.inf)
+    np.testing.assert_allclose(x, [0.2, 0.7, 4.0])
+    assert d > 0 and taxa == 1.0
+
+def test_distancia_max_e_substituicao(indice):
+    assert indice.vizinhos(dict(BASE, etax=1e6), distancia_max=0.5) == []
+    n = len(indice)
+    indice.adicionar(BASE, [0.1, 0.5, 1.0], -1.0)
+    indice.adicionar(BASE, [0.3, 0.6, 1.5], -2.0)
+    assert len(indice) == n + 1
+    d, x, taxa = indice.vizinhos(BASE, k=1)[0]
+    assert d == 0 and taxa == -2.0
+    np.testing.assert_allclose(x, [0.3, 0.6, 1.5])
+
+def test_persistencia(tmp_path):
+    caminho = str(tmp_path / 'indice.sqlite')
+    indice = IndicePoliticas(caminho)
+    for parametros, x, taxa in variantes(10):
+        indice.adicionar(parametros, x, taxa)
+    reaberto = IndicePoliticas(caminho)
+    assert len(reaberto) == 10
+    lidos, originais = (i.vizinhos(BASE, k=3, distancia_max=np.inf) for i in (reaberto, indice))
+    assert len(lidos) == 3
+    assert len(originais) == 3
+    for (d1, x1, taxa1), (d2, x2, taxa2) in zip(lidos, originais):
+        assert (d1, taxa1) == pytest.approx((d2, taxa2))
+        np.testing.assert_allclose(x1, x2)
+
+def test_partida_quente(indice):
+    assert partida_quente(None, BASE) == {} and partida_quente(IndicePoliticas(), BASE) == {}
+    opcoes = partida_quente(indice, BASE, k=4, distancia_max=np.inf)
+    X = opcoes['iniciais']
+    assert X.shape == (4, 3)
+    T_max = BASE['etax'] + BASE['etah']
+    for (inferior, superior), completo, coluna in zip(opcoes['limites_busca'], [(0, 1), (0, 1), (0, T_max)], X.T):
+        assert completo[0] <= inferior <= coluna.min() and coluna.max() <= superior <= completo[1]
@@ -0,0 +1,51 @@
+"""Otimização da política: polimento por L-BFGS-B, aceitação do ponto polido e Dinkelbach contra o DE."""
+import numpy as np
+import pytest
+from scipy.optimize import OptimizeResult
+
+from qst import PARAMETROS, aceitar_polimento, objetivo, otimizar_politica, otimizar_politica_dinkelbach
+
+PARAMETROS_ = dict(zip(PARAMETROS, [2.5, 4, 0.8, 2, 0.5, .05, .8, 1, 10, .01, .1]))
+# Mínimo da taxa para PARAMETROS_ (DE com polimento próprio, polir_politica e Dinkelbach concordam)
+TAXA_OTIMA = 0.6809144880954
+
+def resultados(x_de, x_polido, success):
+    resultado = OptimizeResult(x=np.array(x_de), fun=0.0)
+    busca = OptimizeResult(x=np.array(x_polido), fun=0.0, jac=np.zeros(3), success=success)
+    return resultado, busca
+
+def test_aceita_ponto_melhor_sem_success():
+    # L-BFGS-B termina como ABNORMAL (success=False) já no mínimo: o ponto vale pela taxa exata
+    resultado, busca = resultados([0.43, 0.74, 2.25], [0.5085, 0.7225, 2.249], success=False)
+    aceitar_polimento(resultado, busca, PARAMETROS_)
+    np.testing.assert_array_equal(resultado.x, busca.x)
+    assert resultado.fun == objetivo(busca.x, PARAMETROS_)
+
+@pytest.mark.parametrize('x_polido', [[0.9, 0.1, 0.5], [np.nan, 0.7, 2.2]])
+def test_recusa_ponto_pior_ou_nao_finito(x_polido):
+    resultado, busca = resultados([0.5085, 0.7225, 2.249], x_polido, success=True)
+    aceitar_polimento(resultado, busca, PARAMETROS_)
+    np.testing.assert_array_equal(resultado.x, [0.5085, 0.7225, 2.249])
+    # fun passa a ser a taxa exata do ponto do DE, mesmo sem troca
+    assert resultado.fun == objetivo(resultado.x, PARAMETROS_)
+
+def test_polimento_nao_piora_o_de():
+    com, otimo = otimizar_politica(PARAMETROS_, seed=1)
+    sem, _ = otimizar_politica(PARAMETROS_, seed=1, polimento=False)
+    assert com.fun == pytest.approx(TAXA_OTIMA, rel=1e-9)
+    assert com.fun <= sem.fun + 1e-12
+    assert otimo.taxa_custo == pytest.approx(TAXA_OTIMA, rel=1e-6)
+
+@pytest.mark.parametrize('valores', [
+    [2.5, 4, 0.8, 2, 0.5, .05, .8, 1, 10, .01, .1],
+    [3, 5, 2, 1, 2, .05, .8, 1, 10, .01, .1],
+    [0.7, 5, 0.8, 1, 0.5, .05, .8, 1, 10, .01, .1],
+    [1.2, 3, 2.5, 1, 1, 0, .8, 1, 10, 0, 0],
+])
+def test_dinkelbach_igual_ao_de_com_menos_avaliacoes(valores):
+    parametros = dict(zip(PARAMETROS, valores))
+    de, _ = otimizar_politica(parametros, seed=1)
+    dinkelbach, _ = otimizar_politica_dinkelbach(parametros)
+    assert dinkelbach.success
+    assert dinkelbach.fun == pytest.approx(de.fun, rel=1e-9)
+    assert dinkelbach.nfev < de.nfev
@@ -0,0 +1,47 @@
+"""NSGA-II: ordenação por não dominância, distância de aglomeração e fronteira de (taxa, MTBOF)."""
+import numpy as np
+
+from qst import PARAMETROS, aglomeracao, camadas, nao_dominados, otimizar_pareto
+
+def domina(a, b):
+    return bool(np.all(a <= b) and np.any(a < b))
+
+def test_nao_dominados_igual_a_forca_bruta():
+    F = np.random.default_rng(0).random((200, 2))
+    esperados = [i for i in range(len(F)) if not any(domina(F[j], F[i]) for j in range(len(F)))]
+    indices = nao_dominados(F)
+    assert sorted(indices) == esperados
+    assert np.all(np.diff(F[indices, 0]) > 0)
+
+def test_nao_dominados_empate_no_primeiro_objetivo():
+    F = np.array([[1.0, 3.0], [1.0, 2.0], [2.0, 1.0], [2.0, 2.0]])
+    assert list(nao_dominados(F)) == [1, 2]
+
+def test_camadas():
+    F = np.random.default_rng(1).random((100, 2))
+    F[[3, 7]] = np.inf
+    nivel = camadas(F)
+    assert list(nivel[[3, 7]]) == [len(F)] * 2
+    finitos = np.flatnonzero(np.isfinite(F).all(axis=1))
+    for i in finitos:
+        # Ninguém do mesmo nível ou acima domina i; no nível anterior, alguém domina
+        assert not any(domina(F[j], F[i]) for j in finitos if nivel[j] >= nivel[i])
+        if nivel[i] > 0:
+            assert any(domina(F[j], F[i]) for j in finitos if nivel[j] == nivel[i] - 1)
+
+def test_aglomeracao():
+    F = np.array([[0.0, 4.0], [1.0, 3.0], [3.0, 1.0], [4.0, 0.0]])
+    distancia = aglomeracao(F)
+    assert np.isinf(distancia[[0, 3]]).all()
+    # Vizinhos a 3/4 da amplitude em cada objetivo
+    np.testing.assert_allclose(distancia[1:3], [3 / 4 + 3 / 4, 3 / 4 + 3 / 4])
+    assert np.isinf(aglomeracao(F[:2])).all()
+
+def test_fronteira_sem_pontos_dominados():
+    parametros = dict(zip(PARAMETROS, [3, 3, 2, 1, 1, .05, .8, 1, 10, .01, .1]))
+    fronteira = otimizar_pareto(parametros, tamanho=20, geracoes=5, seed=0)
+    assert fronteira.geracoes == 5 and len(fronteira.taxa_custo) > 1
+    assert np.all(np.diff(fronteira.taxa_custo) > 0) and np.all(np.diff(fronteira.MTBOF) > 0)
+    i = fronteira.escolher(fronteira.MTBOF[-1])
+    assert i == len(fronteira.MTBOF) - 1
+    assert fronteira.escolher(fronteira.MTBOF[-1] * 2) is None
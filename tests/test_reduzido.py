@@ -0,0 +1,43 @@
+"""Caminho reduzido (integrais_base_lote) contra quad/dblquad, cenário a cenário.
+
+Tolerância: |reduzido - quad| <= 1e-6 em P, A, L e EL e <= 1e-6·max(custos) em EC. Com a
+regra de N_NOS nós a diferença fica perto de 1e-7 para β < 1 (densidade infinita em 0),
+perto de 1e-9 para 1 < β < 2 (t^{β-1} não é suave em 0) e no arredondamento para β >= 2.
+"""
+import numpy as np
+import pytest
+
+from qst import PARAMETROS, avaliar_politica, integrais_base
+
+TOL = 1e-6
+
+CASOS = {
+    'beta<1': [0.7, 5, 0.8, 1, 0.5, .05, .8, 1, 10, .01, .1],
+    'beta=1': [1, 4, 1, 2, 0.3, .05, .8, 1, 10, .01, .1],
+    '1<beta<2': [1.2, 3, 2.5, 1, 1, .05, .8, 1, 10, .01, .1],
+    'beta>1': [3, 3, 2, 1, 1, .05, .8, 1, 10, .01, .1],
+}
+
+# Política interior, Q = 0 (sem inspeção oportuna) e Q = S (janela vazia)
+POLITICAS = [(0.5, 1.5, 2.5), (0.0, 1.0, 3.0), (1.0, 1.0, 2.0)]
+
+@pytest.mark.parametrize('politica', POLITICAS)
+@pytest.mark.parametrize('caso', CASOS)
+def test_integrais_base(caso, politica):
+    distribuicoes = CASOS[caso][:5]
+    quad = integrais_base(*politica, *distribuicoes, metodo='quad')
+    reduzido = integrais_base(*politica, *distribuicoes, metodo='reduzido')
+    for nome in ('P', 'A', 'L'):
+        np.testing.assert_allclose(getattr(reduzido, nome), getattr(quad, nome), rtol=0, atol=TOL, err_msg=nome)
+
+@pytest.mark.parametrize('politica', POLITICAS)
+@pytest.mark.parametrize('caso', CASOS)
+def test_cenarios(caso, politica):
+    parametros = dict(zip(PARAMETROS, CASOS[caso]))
+    quad = avaliar_politica(*politica, parametros, metodo='quad')
+    reduzido = avaliar_politica(*politica, parametros, metodo='reduzido')
+    escala_custo = max(parametros[p] for p in ('Ci', 'Co', 'Cp', 'Cf'))
+    np.testing.assert_allclose(reduzido.P, quad.P, rtol=0, atol=TOL)
+    np.testing.assert_allclose(reduzido.EC, quad.EC, rtol=0, atol=TOL * escala_custo)
+    np.testing.assert_allclose(reduzido.EL, quad.EL, rtol=0, atol=TOL)
+    assert reduzido.P_total == pytest.approx(1, abs=TOL)
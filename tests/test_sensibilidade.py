@@ -0,0 +1,36 @@
+"""Varredura um parâmetro de cada vez: tornado, elasticidades e caso sem variação."""
+import numpy as np
+import pytest
+
+from qst import PARAMETROS, avaliar_lote, avaliar_politica, varredura_uma_a_uma
+from qst.sensibilidade import COLUNAS_TORNADO
+
+BASE = dict(zip(PARAMETROS, [3, 3, 2, 1, 1, .05, .8, 1, 10, .01, .1]))
+POLITICA = (0.8, 1.5, 2.2)
+
+@pytest.mark.parametrize('alvos, variacoes', [([], {}), (['Cf', 'etax'], {'Cf': 0, 'etax': 0})])
+def test_sem_variacao(alvos, variacoes):
+    pontos, tornado = varredura_uma_a_uma(*POLITICA, BASE, variacoes, alvos)
+    assert tornado.empty and list(tornado.columns) == COLUNAS_TORNADO
+    assert pontos.empty
+    base = avaliar_politica(*POLITICA, BASE, metodo='reduzido')
+    assert tornado.attrs['base']['Custo'] == pytest.approx(base.taxa_custo)
+
+def test_ordem_extremos_e_elasticidades():
+    variacoes = {'Cf': 0.2, 'etax': 0.2, 'Ci': 0.2, 'Dp': 0.1}
+    pontos, tornado = varredura_uma_a_uma(*POLITICA, BASE, variacoes, list(variacoes), n_pontos=5)
+    assert set(tornado.index) == set(variacoes)
+    assert np.all(np.diff(tornado['Amplitude Custo'].to_numpy()) <= 0)
+    assert len(pontos) == 5 * len(variacoes)
+
+    # Extremos da faixa iguais à avaliação direta com o parâmetro em (1 ± v)·base
+    for p, v in variacoes.items():
+        for fator, coluna in ((1 - v, 'Custo no mínimo'), (1 + v, 'Custo no máximo')):
+            taxa, _ = avaliar_lote(*POLITICA, dict(BASE, **{p: BASE[p] * fator}))
+            assert tornado.loc[p, coluna] == pytest.approx(taxa[0], rel=1e-12)
+
+    # A taxa é linear em Cf: elasticidade exata Cf·P_falha/EC; o MTBOF não depende de Cf
+    base = avaliar_politica(*POLITICA, BASE, metodo='reduzido')
+    assert tornado.loc['Cf', 'Elasticidade Custo'] == pytest.approx(BASE['Cf'] * base.P_falha / base.EC_ciclo, rel=1e-9)
+    assert tornado.loc['Cf', 'Elasticidade MTBOF'] == pytest.approx(0, abs=1e-12)
+    assert tornado.loc['Cf', 'Amplitude MTBOF'] == pytest.approx(0, abs=1e-12)
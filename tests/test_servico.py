@@ -0,0 +1,80 @@
+"""Serviço HTTP/JSON local: avaliação em lote, respostas 400 e métricas."""
+import json
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from qst import PARAMETROS, avaliar_lote, criar_servidor
+
+PARAMETROS_ = dict(zip(PARAMETROS, [3, 5, 2, 1, 2, .05, .8, 1, 10, .01, .1]))
+POLITICAS = [[0.5, 1.5, 2.5], [1.0, 2.0, 3.0], [0.0, 1.0, 4.0]]
+
+@pytest.fixture(scope='module')
+def url():
+    servidor = criar_servidor(0, workers=1, espera=0.05)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    yield f'http://127.0.0.1:{servidor.server_address[1]}'
+    servidor.shutdown()
+    servidor.server_close()
+    servidor.servico.encerrar()
+
+def pedir(url, rota, corpo=None):
+    """(código HTTP, resposta JSON) de um GET (corpo None) ou POST"""
+    dados = None if corpo is None else json.dumps(corpo).encode()
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url + rota, data=dados)) as resposta:
+            return resposta.status, json.loads(resposta.read())
+    except urllib.error.HTTPError as erro:
+        return erro.code, json.loads(erro.read())
+
+def test_avaliar_em_lote(url):
+    # Pedidos concorrentes, um por política, são reunidos e voltam iguais à avaliação direta
+    with ThreadPoolExecutor(len(POLITICAS)) as executor:
+        respostas = list(executor.map(lambda q: pedir(url, '/avaliar', dict(parametros=PARAMETROS_, politicas=[q])),
+                                      POLITICAS))
+    taxa, mtbof = avaliar_lote(*np.array(POLITICAS).T, PARAMETROS_)
+    for i, (codigo, resposta) in enumerate(respostas):
+        assert codigo == 200
+        assert resposta['taxa_custo'] == pytest.approx([taxa[i]], rel=1e-12)
+        assert resposta['MTBOF'] == pytest.approx([mtbof[i]], rel=1e-12)
+
+    codigo, resposta = pedir(url, '/avaliar', dict(parametros=PARAMETROS_, politicas=POLITICAS))
+    assert codigo == 200
+    assert resposta['taxa_custo'] == pytest.approx(taxa.tolist(), rel=1e-12)
+
+@pytest.mark.parametrize('corpo', [
+    dict(parametros=PARAMETROS_, politicas=[[3, 2, 1]]),
+    dict(parametros=PARAMETROS_, politicas=[[0.5, 1.5, 2.5], [-0.1, 1, 2]]),
+    dict(parametros=PARAMETROS_, politicas=[[0.5, 2.5, 1.5]]),
+    dict(parametros=PARAMETROS_, politicas=[]),
+    dict(parametros=PARAMETROS_, politicas=[[0.5, 1.5]]),
+    dict(parametros=PARAMETROS_, politicas=[[0.5, 1.5, 2.5]], metodo='exato'),
+    dict(parametros=dict(PARAMETROS_, etax=-1), politicas=[[0.5, 1.5, 2.5]]),
+    dict(parametros={'betax': 3}, politicas=[[0.5, 1.5, 2.5]]),
+    dict(politicas=[[0.5, 1.5, 2.5]]),
+])
+def test_avaliar_invalido(url, corpo):
+    codigo, resposta = pedir(url, '/avaliar', corpo)
+    assert codigo == 400 and 'erro' in resposta
+
+def test_rota_desconhecida(url):
+    assert pedir(url, '/nada')[0] == 404
+    assert pedir(url, '/nada', {})[0] == 404
+
+def test_metricas(url):
+    antes = pedir(url, '/metricas')[1]
+    pedir(url, '/avaliar', dict(parametros=PARAMETROS_, politicas=POLITICAS))
+    pedir(url, '/avaliar', dict(parametros=PARAMETROS_, politicas=[[3, 2, 1]]))
+    codigo, depois = pedir(url, '/metricas')
+    assert codigo == 200 and depois['workers'] == 1
+    rota, rota_antes = depois['rotas']['/avaliar'], antes['rotas'].get('/avaliar', dict(requisicoes=0, erros=0))
+    assert rota['requisicoes'] == rota_antes['requisicoes'] + 2
+    assert rota['erros'] == rota_antes['erros'] + 1
+    assert rota['latencia_p50_ms'] <= rota['latencia_max_ms']
+    # Só a requisição válida vira lote; o maior lote tem pelo menos as 3 políticas dela
+    assert depois['lotes'] == antes['lotes'] + 1
+    assert depois['maior_lote'] >= len(POLITICAS)
@@ -0,0 +1,32 @@
+"""Decomposição analítica em cenários contra a simulação de Monte Carlo dos ciclos."""
+import numpy as np
+import pytest
+
+from qst import PARAMETROS, avaliar_politica, simular_ciclos, simular_politica
+
+CASOS = [
+    ([3, 3, 2, 1, 1, .05, .8, 1, 10, .01, .1], (1.5, 2.0, 2.5)),
+    ([0.7, 5, 0.8, 1, 0.5, .05, .8, 1, 10, .01, .1], (2.0, 3.0, 4.0)),
+    ([1.5, 2, 1, 1, 2, .05, .8, 1, 5, .01, .1], (1.0, 1.5, 2.5)),
+]
+
+@pytest.mark.parametrize('valores, politica', CASOS)
+def test_cenarios_contra_simulacao(valores, politica):
+    # P e EL de cada cenário dentro de 5 erros-padrão das médias simuladas
+    parametros = dict(zip(PARAMETROS, valores))
+    n = 4 * 10**5
+    cenario, _, duracao = simular_ciclos(*politica, parametros, n, np.random.default_rng(0))
+    analitico = avaliar_politica(*politica, parametros, metodo='reduzido')
+    for k in range(1, 13):
+        ocorre = cenario == k
+        for esperado, amostra in ((analitico.P[k - 1], ocorre), (analitico.EL[k - 1], duracao * ocorre)):
+            erro_padrao = amostra.std() / np.sqrt(n)
+            assert abs(esperado - amostra.mean()) <= 5 * erro_padrao + 1e-12, k
+
+def test_taxa_no_intervalo():
+    valores, politica = CASOS[0]
+    parametros = dict(zip(PARAMETROS, valores))
+    simulado = simular_politica(*politica, parametros, n_ciclos=10**6, seed=0, confianca=0.999)
+    analitico = avaliar_politica(*politica, parametros, metodo='reduzido')
+    assert simulado.ic_taxa_custo[0] < analitico.taxa_custo < simulado.ic_taxa_custo[1]
+    assert simulado.ic_MTBOF[0] < analitico.MTBOF < simulado.ic_MTBOF[1]
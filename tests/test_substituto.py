@@ -0,0 +1,60 @@
+"""Substituto de Chebyshev: ajuste, validação contra o caminho exato, conferência e persistência."""
+import numpy as np
+import pytest
+from scipy.stats import qmc
+
+from qst import PARAMETROS, SubstitutoChebyshev, ajustar_substituto, avaliar_lote, politica, validar_substituto
+
+PARAMETROS_ = dict(zip(PARAMETROS, [3, 5, 2, 1, 2, .05, .8, 1, 10, .01, .1]))
+
+@pytest.fixture(scope='module')
+def substituto():
+    return ajustar_substituto(PARAMETROS_, n=(17, 17, 33), n_validacao=500)
+
+def test_ajuste(substituto):
+    assert substituto.graus == (16, 16, 32)
+    assert substituto.erro_validacao['pontos'] == 500
+    assert substituto.erro_validacao['taxa_custo_rel'] < 1e-5
+    # Custos e paradas são livres: outra precificação das mesmas grandezas segue a exata
+    custos = dict(PARAMETROS_, Cf=20, Dp=0.2)
+    Q, S, T = np.array([0.5, 1.0, 0.2]), np.array([1.5, 2.0, 1.0]), np.array([2.5, 3.0, 4.0])
+    np.testing.assert_allclose(substituto.avaliar_lote(Q, S, T, custos)[0], avaliar_lote(Q, S, T, custos)[0], rtol=1e-4)
+
+def test_refinamento_ate_tol():
+    grosso = ajustar_substituto(PARAMETROS_, n=(5, 5, 9), n_validacao=200)
+    refinado = ajustar_substituto(PARAMETROS_, n=(5, 5, 9), tol=1e-4, n_validacao=200)
+    assert grosso.erro_validacao['taxa_custo_rel'] > 1e-4
+    assert refinado.erro_validacao['taxa_custo_rel'] <= 1e-4
+    assert all(g > h for g, h in zip(refinado.graus, grosso.graus))
+
+def test_validacao_igual_a_conta_direta(substituto):
+    custos = dict(PARAMETROS_, Cf=20)
+    erros = validar_substituto(substituto, custos, n=300, seed=3)
+    x = qmc.scale(qmc.LatinHypercube(d=3, seed=3).random(300), *substituto.caixa.T).T
+    aproximado, exato = substituto.avaliar_x(x, custos)[0], avaliar_lote(*politica(x), custos)[0]
+    diferenca = np.abs(aproximado - exato)
+    assert erros['pontos'] == 300
+    assert erros['taxa_custo_abs'] == pytest.approx(diferenca.max(), rel=1e-12)
+    assert erros['taxa_custo_rel'] == pytest.approx((diferenca / exato).max(), rel=1e-12)
+
+def test_conferir(substituto):
+    substituto.conferir(dict(PARAMETROS_, Cf=50))
+    substituto.conferir({p: np.full(4, v) for p, v in PARAMETROS_.items()})
+    for diferente in (dict(PARAMETROS_, etax=5.1), dict(PARAMETROS_, betah=np.array([2, 2.5])),
+                      dict(PARAMETROS_, lambd=np.nan)):
+        with pytest.raises(ValueError):
+            substituto.conferir(diferente)
+    with pytest.raises(ValueError):
+        substituto.avaliar_lote(1.0, 2.0, 3.0, dict(PARAMETROS_, etax=5.1))
+
+def test_salvar_carregar(substituto, tmp_path):
+    caminho = tmp_path / 'substituto.npz'
+    substituto.salvar(caminho)
+    lido = SubstitutoChebyshev.carregar(caminho)
+    assert lido.distribuicoes == substituto.distribuicoes
+    assert lido.erro_validacao == substituto.erro_validacao
+    np.testing.assert_array_equal(lido.caixa, substituto.caixa)
+    np.testing.assert_array_equal(lido.coeficientes, substituto.coeficientes)
+    Q, S, T = np.array([0.5, 0.0]), np.array([1.5, 1.0]), np.array([2.5, 3.0])
+    for a, b in zip(lido.avaliar_lote(Q, S, T, PARAMETROS_), substituto.avaliar_lote(Q, S, T, PARAMETROS_)):
+        np.testing.assert_array_equal(a, b)